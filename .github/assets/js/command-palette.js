@@ -126,32 +126,6 @@ function renderSections(sections, container) {
 
 // Initialization function to set up command palette when DOM is loaded
 function initCommandPalette() {
-  // Ensure search database is preloaded for command palette search functionality
-  // Try to prefetch the search database if it exists
-  fetch('/assets/js/search_db.json').then(response => {
-    if (response.ok) {
-      return response.json();
-    }
-    throw new Error('Search database not found');
-  }).then(data => {
-    console.log('Search database prefetched for command palette');
-    window.searchData = data;
-    
-    // Initialize Fuse.js with weighted keys
-    window.searchFuse = new Fuse(data, {
-      keys: [
-        { name: 'title', weight: 0.7 },
-        { name: 'content', weight: 0.2 },
-        { name: 'tags', weight: 0.1 },
-        { name: 'categories', weight: 0.1 }
-      ],
-      includeScore: true,
-      threshold: 0.4
-    });
-  }).catch(err => {
-    console.warn('Could not prefetch search database for command palette:', err.message);
-  });
-
   // Set up backdrop click to close
   const backdrop = document.querySelector('.simple-command-palette-backdrop');
   if (backdrop) {
@@ -271,42 +245,117 @@ document.addEventListener('DOMContentLoaded', function() {
 window.renderCommandResults = renderCommandResults;
 window.renderSections = renderSections;
 
+// Prebuilt search index, generated by generate_docs.py (see build_search_index()).
+// Only the manifest and the shards of the typed prefixes are fetched, so the cost of
+// a search does not grow with the number of documented pages.
+const SEARCH_INDEX_URL = '/assets/js/search/';
+const searchIndex = { manifest: null, shards: {}, docs: {} };
+
+// Fetch a file of the search index, caching the pending promise
+function fetchSearchIndexFile(cache, key, name) {
+  if (!cache[key]) {
+    cache[key] = fetch(SEARCH_INDEX_URL + name).then(response => {
+      if (!response.ok) {
+        throw new Error(`Search index file ${name} not found (${response.status})`);
+      }
+      return response.json();
+    }).catch(err => {
+      delete cache[key];
+      throw err;
+    });
+  }
+  return cache[key];
+}
+
+function loadSearchManifest() {
+  return fetchSearchIndexFile(searchIndex, 'manifest', 'manifest.json');
+}
+
+// Terms are lowercase ASCII words, as in SEARCH_TERM_PATTERN of generate_docs.py
+function tokenizeSearchQuery(query, minLength) {
+  return (query.toLowerCase().match(/[a-z0-9_]+/g) || []).filter(term => term.length >= minLength);
+}
+
+// Priority of a record, from the id ranges listed in the manifest
+function searchDocPriority(manifest, docId) {
+  let priority = 5;
+  manifest.priorities.forEach(([rangePriority, firstDocId]) => {
+    if (docId >= firstDocId) {
+      priority = rangePriority;
+    }
+  });
+  return priority;
+}
+
 // Function to search the database with priority sorting
 window.searchDatabaseForCommandPalette = async function(query) {
-  if (!window.searchFuse) {
+  // Only perform search if query is at least 3 characters long
+  if (!query || query.length < 3) {
     return [];
   }
   
   try {
-    const results = window.searchFuse.search(query);
+    const manifest = await loadSearchManifest();
+    const terms = tokenizeSearchQuery(query, manifest.prefixLength);
+    if (terms.length === 0) {
+      return [];
+    }
     
-    // Sort results by priority first, then by Fuse.js score
-    // Lower priority number = higher priority (1 is highest, 5 is lowest)
-    const sortedResults = results.sort((a, b) => {
-      // First compare by priority
-      const priorityA = a.item.priority || 5; // Default to lowest priority if not specified
-      const priorityB = b.item.priority || 5;
+    // Score every record containing all the terms (each term matches as a prefix)
+    let scores = null;
+    for (const term of terms) {
+      const prefix = term.slice(0, manifest.prefixLength);
+      const shard = manifest.shards.includes(prefix) ?
+        await fetchSearchIndexFile(searchIndex.shards, prefix, `${prefix}.json`) : {};
       
-      if (priorityA !== priorityB) {
-        return priorityA - priorityB; // Lower priority number comes first
-      }
+      const termScores = new Map();
+      Object.keys(shard).forEach(indexedTerm => {
+        if (!indexedTerm.startsWith(term)) return;
+        const postings = shard[indexedTerm];
+        for (let i = 0; i < postings.length; i += 2) {
+          termScores.set(postings[i], Math.max(termScores.get(postings[i]) || 0, postings[i + 1]));
+        }
+      });
       
-      // If priorities are equal, use Fuse.js score (lower score = better match)
-      return a.score - b.score;
-    });
+      if (scores !== null) {
+        termScores.forEach((score, docId) => {
+          if (!scores.has(docId)) termScores.delete(docId);
+          else termScores.set(docId, score + scores.get(docId));
+        });
+      }
+      scores = termScores;
+      if (scores.size === 0) {
+        return [];
+      }
+    }
+    
+    // Sort results by priority first, then by score
+    // Lower priority number = higher priority (1 is highest, 5 is lowest)
+    const topResults = Array.from(scores.entries()).map(([docId, score]) => ({
+      docId: docId,
+      score: score,
+      priority: searchDocPriority(manifest, docId)
+    })).sort((a, b) => (a.priority - b.priority) || (b.score - a.score)).slice(0, 5);
+    
+    // Fetch the titles, URLs and excerpts of the results
+    const docs = await Promise.all(topResults.map(result => {
+      const chunk = Math.floor(result.docId / manifest.docsPerChunk);
+      return fetchSearchIndexFile(searchIndex.docs, chunk, `docs-${chunk}.json`).then(
+        chunkDocs => chunkDocs[result.docId % manifest.docsPerChunk]);
+    }));
     
     // Return at most 5 results
-    return sortedResults.slice(0, 5).map(result => ({
-      id: `search-result-${result.refIndex}`,
-      title: result.item.title || 'Untitled',
+    return topResults.map((result, index) => ({
+      id: `search-result-${result.docId}`,
+      title: docs[index].title || 'Untitled',
       handler: () => { 
-        if (result.item.url) {
-          window.location.href = result.item.url; 
+        if (docs[index].url) {
+          window.location.href = docs[index].url; 
         }
       },
       section: "Search Results",
       icon: '<i class="fa-solid fa-file-lines"></i>',
-      excerpt: result.item.excerpt || (result.item.content && result.item.content.substring(0, 100) + '...') || ''
+      excerpt: docs[index].excerpt || ''
     }));
   } catch (e) {
     console.error('Error searching database:', e);
@@ -0,0 +1,370 @@
+import os
+import sys
+import json
+import random
+import shutil
+import hashlib
+import argparse
+import platform
+import tempfile
+import contextlib
+import io
+import math
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import generate_docs
+from conftest import (RANDOM_SEED, create_synthetic_tree, install_stub_tools, synthetic_c_source,
+                      synthetic_config, synthetic_python_source)
+from generate_docs import DocsBuilder, DocsConfig
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPT_DIR.parent.parent
+RESULTS_PATH = REPO_ROOT / 'benchmark-results.json'  # Default file the results are written to
+DEFAULT_SCALES = (10, 100, 1000, 5000)  # Numbers of source files of the synthetic trees
+SCENARIOS = ('full', 'noop', 'edit')  # Full build, no-op rebuild and single-file-edit rebuild
+REGRESSION_THRESHOLD = 0.15  # Relative slowdown over the baseline reported as a regression
+MICRO_REPEAT = 5  # Timings of each micro-benchmark call; the fastest is kept
+MICRO_SCALING_FACTOR = 4  # Ratio of the input sizes compared to get the scaling exponent
+MIN_SCALING_SECONDS = 0.005  # Below this, timings are too noisy for the scaling exponent
+MAX_SCALING_EXPONENT = 1.5  # Time growing faster than size**1.5 is reported as superlinear
+
+
+def timed_build(config: DocsConfig, verbose: bool = False) -> float:
+    """
+    Run one build like a command line run would (validation, pandoc startup and
+    cleanup included) and return its wall time in seconds.
+
+    Raises:
+        RuntimeError: If the build fails.
+    """
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with output:
+        builder = DocsBuilder(config)
+        try:
+            succeeded = builder.start() and builder.build()
+        finally:
+            builder.close()
+    elapsed = time.perf_counter() - start
+    if not succeeded:
+        raise RuntimeError("documentation build failed")
+    return elapsed
+
+
+def benchmark_scale(work_dir: Path, file_count: int, repeat: int, options: Dict[str, Any],
+                    verbose: bool = False) -> Dict[str, float]:
+    """
+    Time the build scenarios on a synthetic tree of `file_count` source files.
+
+    Each repetition starts from an empty docs directory and times a full build, a
+    no-op rebuild, and a rebuild after appending a function to one source file.
+
+    Returns:
+        The median wall time in seconds of each scenario of SCENARIOS.
+    """
+    root = work_dir / f"tree-{file_count}"
+    source_files = create_synthetic_tree(root, file_count)
+    config = synthetic_config(root, **options)
+    edited_file = source_files[len(source_files) // 2]
+
+    timings = {scenario: [] for scenario in SCENARIOS}
+    for repetition in range(repeat):
+        shutil.rmtree(config.docs_dir, ignore_errors=True)
+        timings['full'].append(timed_build(config, verbose))
+        timings['noop'].append(timed_build(config, verbose))
+        with open(edited_file, 'a', encoding='utf-8') as f:
+            f.write(f"\n/**\n## Edit {repetition}\n\nAppended by the benchmark.\n*/\n"
+                    f"int edit_{repetition} = {repetition};\n")
+        timings['edit'].append(timed_build(config, verbose))
+
+    return {scenario: statistics.median(values) for scenario, values in timings.items()}
+
+
+def repeat_to_size(make_chunk: Callable[[int], str], size: int) -> str:
+    """Concatenate make_chunk(0), make_chunk(1), ... until the text is `size` characters long."""
+    chunks, length = [], 0
+    while length < size:
+        chunks.append(make_chunk(len(chunks)))
+        length += len(chunks[-1])
+    return ''.join(chunks)[:size]
+
+
+def micro_process_python_file(work_dir: Path, size: int, adversarial: bool) -> Tuple[Callable[[], Any], int]:
+    """process_python_file() on a Python file of `size` lines; adversarial: one unterminated docstring."""
+    rng = random.Random(RANDOM_SEED)
+    if adversarial:
+        lines = ['"""'] + [f"Docstring line {index} without a closing quote." for index in range(size - 1)]
+    else:
+        lines = repeat_to_size(lambda index: synthetic_python_source(rng, f"script-{index}.py"),
+                               size * 40).split('\n')[:size]
+    path = work_dir / f"micro-{size}.py"
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    return (lambda: generate_docs.process_python_file(path)), path.stat().st_size
+
+
+def micro_post_process_c_html(work_dir: Path, size: int, adversarial: bool) -> Tuple[Callable[[], Any], int]:
+    """
+    post_process_c_html() on `size` characters of literate C HTML; adversarial: a line of
+    `size` characters of numbers and whitespace without a closing </span>, which the
+    line-number rewrite tries to match at every whitespace.
+    """
+    root = work_dir / 'micro-repo'
+    (root / 'src-local').mkdir(parents=True, exist_ok=True)
+    (root / 'src-local' / 'module-0.h').write_text("int module;\n", encoding='utf-8')
+    if adversarial:
+        html = '<span>' + ' 1' * (size // 2) + '\n'
+    else:
+        html = repeat_to_size(lambda index: (
+            f'<h2 id="step-{index}">Step {index}</h2>\n<p>See <a href="module-{index % 3}.h">the header</a>.</p>\n'
+            f'<div class="sourceCode" id="cb{index}"><pre class="sourceCode c"><code class="sourceCode c">'
+            f'<span id="cb{index}-1"><a href="#cb{index}-1"></a><span class="pp">#include </span>'
+            f'<span class="im">&quot;module-{index % 3}.h&quot;</span></span>\n'
+            + ''.join(f'<span id="cb{index}-{line}"><a href="#cb{index}-{line}"></a>  u<span class="op">.</span>x'
+                      f'<span class="op">[]</span> <span class="op">+=</span> dt<span class="op">*</span>'
+                      f'<span class="fl">{line}.5</span><span class="op">;</span>   {line}</span>\n'
+                      for line in range(2, 30))
+            + '</code></pre></div>\n'), size)
+    source = root / 'testCases' / 'micro.c'
+    docs_dir = root / 'docs'
+    darcsit_dir = root / 'basilisk' / 'src' / 'darcsit'
+    return (lambda: generate_docs.post_process_c_html(html, source, root, darcsit_dir, docs_dir)), len(html.encode())
+
+
+def micro_convert_directory_tree_to_html(work_dir: Path, size: int, adversarial: bool) -> Tuple[Callable[[], Any], int]:
+    """
+    convert_directory_tree_to_html() on a README whose directory tree has `size` entries;
+    adversarial: `size` code blocks that start like a tree but never close it.
+    """
+    if adversarial:
+        readme = "# Project\n\n" + ''.join(f"```\n├── entry-{index}/\n```\n\n" for index in range(size))
+    else:
+        lines = []
+        for index in range(size):
+            depth = index % 4
+            lines.append('│   ' * depth + f"├── entry-{index}{'/' if depth < 3 else '.c'} Description of entry {index}")
+        readme = "# Project\n\n## Structure\n\n```\n" + '\n'.join(lines) + "\n└── last.c Last entry\n```\n"
+    return (lambda: generate_docs.convert_directory_tree_to_html(readme)), len(readme.encode())
+
+
+def micro_extract_seo_metadata(work_dir: Path, size: int, adversarial: bool) -> Tuple[Callable[[], Any], int]:
+    """
+    extract_seo_metadata() on `size` characters of page Markdown; adversarial: a header of
+    preprocessor lines and comments, with no line starting with a letter.
+    """
+    rng = random.Random(RANDOM_SEED)
+    if adversarial:
+        content = repeat_to_size(lambda index: f"#define PARAMETER_{index} {index}\n// Parameter {index}\n", size)
+    else:
+        content = repeat_to_size(lambda index: f"# Section {index}\n\n" + synthetic_c_source(
+            rng, f"case-{index}.c", ['module-0.h'], False), size)
+    return (lambda: generate_docs.extract_seo_metadata(Path('testCases/micro.c'), content)), len(content.encode())
+
+
+# Micro-benchmarks: function, input builder, and input size (lines, characters or entries)
+# of the typical and the adversarial input
+MICRO_BENCHMARKS = (
+    ('process_python_file', micro_process_python_file, 50000, 50000),
+    ('post_process_c_html', micro_post_process_c_html, 10_000_000, 8000),
+    ('convert_directory_tree_to_html', micro_convert_directory_tree_to_html, 20000, 200),
+    ('extract_seo_metadata', micro_extract_seo_metadata, 1_000_000, 40000),
+)
+
+
+def time_call(call: Callable[[], Any], repeat: int) -> float:
+    """Return the fastest of `repeat` timings of call(), in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_micro_benchmarks(work_dir: Path, repeat: int, scale: float = 1.0,
+                         names: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Time the per-page functions on large generated inputs.
+
+    Each function of MICRO_BENCHMARKS is timed on a typical and an adversarial input
+    (one built to make its regular expressions backtrack), at the full input size and
+    at 1/MICRO_SCALING_FACTOR of it. How the time grows with the input size gives the
+    scaling exponent (1 for linear time); a pattern that backtracks on its input shows
+    up as an exponent of 2 or more.
+
+    Args:
+        work_dir: Directory for the generated input files.
+        repeat: Timings of each call; the fastest is kept.
+        scale: Factor applied to the input sizes of MICRO_BENCHMARKS.
+        names: Functions to benchmark; defaults to all of them.
+
+    Returns:
+        For each "function[input]", the time in seconds, the input size in bytes, the
+        throughput in MB/s, and the scaling exponent.
+    """
+    results = {}
+    for name, build_input, typical_size, adversarial_size in MICRO_BENCHMARKS:
+        if names and name not in names:
+            continue
+        for kind, size in (('typical', typical_size), ('adversarial', adversarial_size)):
+            size = max(MICRO_SCALING_FACTOR, int(size * scale))
+            call, input_bytes = build_input(work_dir, size, kind == 'adversarial')
+            small_call, _ = build_input(work_dir, size // MICRO_SCALING_FACTOR, kind == 'adversarial')
+            seconds = time_call(call, repeat)
+            small_seconds = time_call(small_call, repeat)
+            exponent = (math.log(seconds / small_seconds) / math.log(MICRO_SCALING_FACTOR)
+                        if seconds >= MIN_SCALING_SECONDS and small_seconds > 0 else None)
+            results[f"{name}[{kind}]"] = {
+                'seconds': seconds,
+                'bytes': input_bytes,
+                'throughput': input_bytes / seconds / 1e6 if seconds > 0 else None,
+                'scaling': exponent,
+            }
+    return results
+
+
+def is_superlinear(benchmark: Dict[str, Any]) -> bool:
+    """Return whether a micro-benchmark's time grows faster than MAX_SCALING_EXPONENT allows."""
+    return benchmark.get('scaling') is not None and benchmark['scaling'] > MAX_SCALING_EXPONENT
+
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """
+    Compare benchmark results with a baseline run.
+
+    Returns:
+        A description of each scenario or micro-benchmark that got slower than the
+        baseline by more than `threshold` (relative), and of each micro-benchmark that
+        became superlinear, among those both runs measured.
+    """
+    compared = []
+    for scale, timings in results.get('timings', {}).items():
+        for scenario, seconds in timings.items():
+            compared.append((f"{scale} files, {scenario}", seconds,
+                             baseline.get('timings', {}).get(scale, {}).get(scenario)))
+    regressions = []
+    for name, benchmark in results.get('micro', {}).items():
+        baseline_benchmark = baseline.get('micro', {}).get(name)
+        if baseline_benchmark is None:
+            continue
+        compared.append((name, benchmark['seconds'], baseline_benchmark['seconds']))
+        if is_superlinear(benchmark) and not is_superlinear(baseline_benchmark):
+            regressions.append(f"{name}: time grows as size^{benchmark['scaling']:.1f} "
+                               f"(was size^{baseline_benchmark['scaling'] or 0:.1f})")
+
+    for name, seconds, baseline_seconds in compared:
+        if baseline_seconds and seconds > baseline_seconds * (1 + threshold):
+            regressions.append(f"{name}: {seconds:.3f}s vs {baseline_seconds:.3f}s "
+                               f"(+{seconds / baseline_seconds - 1:.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Benchmark the documentation generator on synthetic repositories.
+
+    For each scale, a synthetic repository is generated in a temporary directory
+    (see create_synthetic_tree()) and full builds, no-op rebuilds and single-file-edit
+    rebuilds are timed. Stand-ins for pandoc (in server and command mode), literate-c
+    and awk are put first on the PATH, so the benchmark runs offline and measures the
+    generator rather than the tools. With --micro, the per-page functions are timed on
+    large generated inputs instead (see run_micro_benchmarks()), and the ones whose
+    time grows superlinearly with their input are reported.
+    The results, with the hash of generate_docs.py, are written as JSON; with
+    --baseline, they are compared to an earlier results file and the exit status is 1
+    if a scenario got slower than the threshold.
+
+    Args:
+        argv: Command line arguments; defaults to sys.argv[1:].
+
+    Returns:
+        The exit status.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the documentation generator on synthetic trees')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help='Numbers of source files of the synthetic trees (default: %(default)s)')
+    parser.add_argument('--repeat', type=int,
+                        help='Repetitions of each scenario, of which the median is reported (default: 3), '
+                             f'or of each micro-benchmark, of which the fastest is reported (default: {MICRO_REPEAT})')
+    parser.add_argument('--jobs', type=int, default=DocsConfig.jobs, help='Pages rendered concurrently')
+    parser.add_argument('--pandoc-batch-size', type=int, default=DocsConfig.pandoc_batch_size,
+                        help='Pages per pandoc server request; 0 runs the pandoc stand-in once per page')
+    parser.add_argument('--micro', nargs='*', metavar='FUNCTION',
+                        choices=[name for name, *_ in MICRO_BENCHMARKS],
+                        help='Run the micro-benchmarks of the per-page functions (all of them, or the '
+                             'given ones) instead of the build scenarios')
+    parser.add_argument('--micro-scale', type=float, default=1.0,
+                        help='Factor applied to the micro-benchmark input sizes (default: %(default)s)')
+    parser.add_argument('--output', type=Path, default=RESULTS_PATH,
+                        help=f'Results file (default: {RESULTS_PATH.name})')
+    parser.add_argument('--baseline', type=Path,
+                        help='Earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Relative slowdown reported as a regression (default: %(default)s)')
+    parser.add_argument('--keep', action='store_true', help='Keep the synthetic trees')
+    parser.add_argument('--verbose', action='store_true', help='Show the output of the builds')
+    args = parser.parse_args(argv)
+    micro = args.micro is not None
+    repeat = args.repeat or (MICRO_REPEAT if micro else 3)
+
+    work_dir = Path(tempfile.mkdtemp(prefix='docs-benchmark-'))
+    bin_dir = work_dir / 'bin'
+    install_stub_tools(bin_dir)
+    os.environ['PATH'] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+
+    options = {'jobs': args.jobs, 'pandoc_batch_size': args.pandoc_batch_size}
+    results = {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'generator': hashlib.sha256(Path(generate_docs.__file__).read_bytes()).hexdigest(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+    }
+    try:
+        if micro:
+            results['micro_scale'] = args.micro_scale
+            results['micro'] = run_micro_benchmarks(work_dir, repeat, args.micro_scale, args.micro)
+            print(f"{'function[input]':<45} {'time (s)':>10} {'MB/s':>10} {'scaling':>8}")
+            for name, benchmark in results['micro'].items():
+                scaling = '-' if benchmark['scaling'] is None else f"{benchmark['scaling']:.2f}"
+                print(f"{name:<45} {benchmark['seconds']:>10.4f} {benchmark['throughput']:>10.2f} {scaling:>8}"
+                      + ('  superlinear' if is_superlinear(benchmark) else ''))
+        else:
+            results['options'] = options
+            results['timings'] = {}
+            print(f"{'files':>6} " + ' '.join(f"{scenario + ' (s)':>10}" for scenario in SCENARIOS))
+            for scale in args.scales:
+                timings = benchmark_scale(work_dir, scale, repeat, options, args.verbose)
+                results['timings'][str(scale)] = timings
+                print(f"{scale:>6} " + ' '.join(f"{timings[scenario]:>10.3f}" for scenario in SCENARIOS))
+    finally:
+        if args.keep:
+            print(f"Synthetic trees kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    args.output.write_text(json.dumps(results, indent=2) + "\n", encoding='utf-8')
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"Error reading baseline {args.baseline}: {e}")
+            return 1
+        regressions = compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
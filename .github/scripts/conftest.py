@@ -0,0 +1,267 @@
+"""
+Stand-ins for the tools the documentation generator runs (pandoc, darcsit's
+literate-c and awk) and synthetic repositories that use them, shared by the tests
+of generate_docs.py and by benchmark_docs.py.
+"""
+
+import contextlib
+import io
+import random
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List
+
+from generate_docs import DocsBuilder, DocsConfig
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPT_DIR.parent.parent
+RANDOM_SEED = 1  # Synthetic trees are the same on every run
+
+# Share of the synthetic source files in each source directory, with their extensions
+TREE_LAYOUT = (
+    ('src-local', ('.h',), 0.4),
+    ('testCases', ('.c',), 0.4),
+    ('postProcess', ('.py', '.c'), 0.2),
+)
+
+# Stand-in for pandoc: converts the Markdown subset the generator produces (headings,
+# paragraphs, fenced code blocks, with pandoc's markup for #include lines) and fills the
+# template, as a command or in server mode. STUB_PANDOC_SERVER_FAULT makes the server
+# fail: "unavailable" (exits at once), "ignore-template" (fails the template probe),
+# "error" (no output for documents containing FAIL) or "truncated" (drops the last
+# result of every batch but the probe).
+STUB_PANDOC = r'''#!/usr/bin/env python3
+import html, json, os, re, sys
+
+def highlight(code):
+    return re.sub(r'^#include "(.*)"', r'<span class="pp">#include </span><span class="im">"\1"</span>',
+                  html.escape(code, quote=False))
+
+def render(text, template, variables, standalone):
+    body, lines, language, blocks = [], [], None, 0
+    for line in text.split('\n'):
+        fence = re.match(r'^(```|~~~)\s*\{?\.?([\w-]*)', line)
+        if language is None and fence:
+            language, lines = fence.group(2) or 'text', []
+        elif language is not None and re.match(r'^(```|~~~)\s*$', line):
+            blocks += 1
+            spans = '\n'.join(f'<span id="cb{blocks}-{n}"><a href="#cb{blocks}-{n}" aria-hidden="true" '
+                              f'tabindex="-1"></a>{highlight(code)}</span>'
+                              for n, code in enumerate(lines, 1))
+            body.append(f'<div class="sourceCode" id="cb{blocks}"><pre\nclass="sourceCode {language}">'
+                        f'<code class="sourceCode {language}">{spans}</code></pre></div>')
+            language = None
+        elif language is not None:
+            lines.append(line)
+        elif re.match(r'^#+ ', line):
+            level, title = line.split(' ', 1)
+            slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+            body.append(f'<h{len(level)} id="{slug}">{html.escape(title)}</h{len(level)}>')
+        elif line.strip():
+            body.append(f'<p>{line}</p>')
+    output = '\n'.join(body)
+    if standalone and template is not None:
+        output = re.sub(r'\$if\((\w+)\)\$(.*?)(?:\$else\$(.*?))?\$endif\$',
+                        lambda m: m.group(2) if variables.get(m.group(1)) else (m.group(3) or ''),
+                        template, flags=re.S).replace('$body$', output)
+        output = re.sub(r'\$(\w+)\$', lambda m: variables.get(m.group(1), ''), output)
+    return output + '\n'
+
+args = sys.argv[1:]
+if args[:1] == ['--version']:
+    print('pandoc 0.0-stub')
+elif args[:1] == ['server']:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    fault = os.environ.get('STUB_PANDOC_SERVER_FAULT', '')
+    if fault == 'unavailable':
+        sys.exit(1)
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+        def reply(self, data):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        def do_GET(self):
+            self.reply(b'0.0-stub')
+        def do_POST(self):
+            requests = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            results = [{'output': render(r['text'], None if fault == 'ignore-template' else r.get('template'),
+                                         r.get('variables', {}), r.get('standalone')),
+                        'base64': False, 'messages': []} for r in requests]
+            if fault == 'error':
+                results = [{'error': 'stub failure'} if 'FAIL' in r['text'] else result
+                           for r, result in zip(requests, results)]
+            elif fault == 'truncated' and all(r['text'] != 'probe' for r in requests):
+                results.pop()
+            self.reply(json.dumps(results).encode())
+    ThreadingHTTPServer(('127.0.0.1', int(args[args.index('--port') + 1])), Handler).serve_forever()
+else:
+    template, variables, standalone = None, {}, '--standalone' in args
+    for flag, value in zip(args, args[1:]):
+        if flag == '--template':
+            template = open(value, encoding='utf-8').read()
+        elif flag == '-V':
+            name, _, value = value.partition('=')
+            variables[name] = value
+    sys.stdout.write(render(sys.stdin.read(), template, variables, standalone))
+'''
+
+# Stand-in for darcsit's literate-c: turns /** ... */ comments into Markdown and the
+# code between them into ~~~literatec blocks
+STUB_LITERATE_C = r'''#!/usr/bin/env python3
+import re, sys
+
+source = open(sys.argv[1], encoding='utf-8').read()
+output = []
+for part in re.split(r'(/\*\*.*?\*/)', source, flags=re.S):
+    if part.startswith('/**'):
+        output.append(part[3:-2].strip())
+    elif part.strip():
+        output.append('~~~literatec\n' + part.strip('\n') + '\n~~~')
+print('\n\n'.join(output))
+'''
+
+# Stand-in for awk: the declaration anchors pass copies the page through
+STUB_AWK = '#!/bin/sh\nexec cat\n'
+
+
+def write_executable(path: Path, content: str) -> None:
+    """Write a script and make it executable."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    path.chmod(0o755)
+
+
+def install_stub_tools(bin_dir: Path) -> None:
+    """Write the stand-ins for pandoc and awk to `bin_dir`, to be put first on PATH."""
+    write_executable(bin_dir / 'pandoc', STUB_PANDOC)
+    write_executable(bin_dir / 'awk', STUB_AWK)
+
+
+def synthetic_c_source(rng: random.Random, name: str, headers: List[str], is_header: bool) -> str:
+    """
+    Return a literate C file: a documented title, #include lines, and functions
+    with /** */ documentation comments between them.
+    """
+    parts = [f"/**\n# {name}\n\n"
+             f"Synthetic {'header' if is_header else 'test case'} for the documentation benchmark. "
+             "It solves the incompressible Navier-Stokes equations with a volume of fluid method "
+             "and adaptive mesh refinement.\n*/\n"]
+    if not is_header:
+        parts.append('#include "navier-stokes/centered.h"\n')
+    for header in rng.sample(headers, min(len(headers), rng.randint(1, 3))):
+        parts.append(f'#include "{header}"\n')
+    for index in range(rng.randint(3, 8)):
+        function = f"{name.split('.')[0].replace('-', '_')}_step{index}"
+        parts.append(f"\n/**\n## {function}\n\nAdvances the solution by one step of size $\\Delta t$ "
+                     f"and returns the maximum velocity. See [the header](../src-local/{rng.choice(headers)}).\n*/\n")
+        body = '\n'.join(f"    u.x[] += dt*(f.x[] - p[]*{rng.random():.3f});" for _ in range(rng.randint(5, 30)))
+        parts.append(f"double {function} (scalar f, vector u, double dt)\n{{\n  foreach() {{\n{body}\n  }}\n"
+                     f"  return normf(u.x).max;\n}}\n")
+    return ''.join(parts)
+
+
+def synthetic_python_source(rng: random.Random, name: str) -> str:
+    """Return a post-processing script with a module docstring and documented functions."""
+    parts = [f'"""\n# {name}\n\nSynthetic post-processing script for the documentation benchmark.\n'
+             'It reads simulation snapshots and plots the interface and the velocity field.\n"""\n\n'
+             'import numpy as np\nimport matplotlib.pyplot as plt\n']
+    for index in range(rng.randint(3, 8)):
+        body = '\n'.join(f"    data[{line}] = np.sqrt(data[{line}]**2 + {rng.random():.3f})"
+                         for line in range(rng.randint(5, 30)))
+        parts.append(f'\n\ndef process_{index}(data):\n    """\n    Process step {index}: normalize the '
+                     f'fields of a snapshot.\n    """\n{body}\n    return data\n')
+    return ''.join(parts)
+
+
+def create_synthetic_tree(root: Path, file_count: int, seed: int = RANDOM_SEED) -> List[Path]:
+    """
+    Create a synthetic repository with `file_count` source files under `root`.
+
+    The files are spread over src-local, testCases and postProcess following
+    TREE_LAYOUT. The tree gets a README.md and CNAME, a copy of the documentation
+    assets and template, and a basilisk/src/darcsit directory with a stand-in
+    literate-c script and decl_anchors.awk.
+
+    Args:
+        root: Directory to create the repository in.
+        file_count: Number of source files.
+        seed: Seed of the generated content.
+
+    Returns:
+        The source files, in creation order.
+    """
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / 'README.md').write_text("# Benchmark Documentation\n\nSynthetic repository.\n", encoding='utf-8')
+    (root / 'CNAME').write_text("benchmark.example.org\n", encoding='utf-8')
+    shutil.copytree(REPO_ROOT / '.github' / 'assets', root / '.github' / 'assets',
+                    ignore=shutil.ignore_patterns('*.temp.html'))
+    darcsit_dir = root / 'basilisk' / 'src' / 'darcsit'
+    write_executable(darcsit_dir / 'literate-c', STUB_LITERATE_C)
+    (darcsit_dir / 'decl_anchors.awk').write_text("{ print }\n", encoding='utf-8')
+
+    counts = [int(file_count * share) for _, _, share in TREE_LAYOUT]
+    counts[0] += file_count - sum(counts)
+    headers = [f"module-{index}.h" for index in range(max(1, counts[0]))]
+    source_files = []
+    for (directory, suffixes, _), count in zip(TREE_LAYOUT, counts):
+        for index in range(count):
+            suffix = suffixes[index % len(suffixes)]
+            name = headers[index] if directory == 'src-local' else f"case-{index}{suffix}"
+            path = root / directory / f"group-{index // 100}" / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if suffix == '.py':
+                content = synthetic_python_source(rng, name)
+            else:
+                content = synthetic_c_source(rng, name, headers, suffix == '.h')
+            path.write_text(content, encoding='utf-8')
+            source_files.append(path)
+    return source_files
+
+
+def synthetic_config(root: Path, **options: Any) -> DocsConfig:
+    """Return the build configuration of the synthetic repository at `root`."""
+    docs_dir = root / 'docs'
+    assets_dir = root / '.github' / 'assets'
+    darcsit_dir = root / 'basilisk' / 'src' / 'darcsit'
+    return DocsConfig(
+        repo_root=root, docs_dir=docs_dir, readme_path=root / 'README.md', index_path=docs_dir / 'index.html',
+        cname_path=root / 'CNAME', assets_dir=assets_dir, basilisk_dir=root / 'basilisk',
+        darcsit_dir=darcsit_dir, template_path=assets_dir / 'custom_template.html',
+        literate_c_script=darcsit_dir / 'literate-c', css_path=assets_dir / 'css' / 'custom_styles.css',
+        build_cache_path=docs_dir / '.build-cache.json', highlight_cache_path=docs_dir / '.highlight-cache.json',
+        search_db_path=docs_dir / 'assets' / 'js' / 'search_db.json',
+        search_index_dir=docs_dir / 'assets' / 'js' / 'search', **options)
+
+
+def create_repository(root: Path, sources: Dict[str, str]) -> None:
+    """
+    Create a synthetic repository under `root` (see create_synthetic_tree()) holding
+    only the given source files, given as paths relative to `root` mapped to their content.
+    """
+    create_synthetic_tree(root, 0)
+    for relative_path, content in sources.items():
+        (root / relative_path).parent.mkdir(parents=True, exist_ok=True)
+        (root / relative_path).write_text(content, encoding='utf-8')
+
+
+def run_build(config: DocsConfig) -> str:
+    """
+    Run one build like a command line run would and return its output.
+
+    Raises:
+        RuntimeError: If the build fails.
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        builder = DocsBuilder(config)
+        try:
+            succeeded = builder.start() and builder.build()
+        finally:
+            builder.close()
+    if not succeeded:
+        raise RuntimeError(f"documentation build failed:\n{output.getvalue()}")
+    return output.getvalue()
@@ -3,16 +3,56 @@ import subprocess
 import re
 import shutil
 import argparse
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
+import socket
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from html import unescape
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set, Any, Union
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Set, Any, Union
 
-# Parse command line arguments
-parser = argparse.ArgumentParser(description='Generate documentation from source files.')
-parser.add_argument('--debug', action='store_true', help='Enable debug output')
-args = parser.parse_args()
+try:
+    import fcntl
+except ImportError:  # Windows: reflinks are not available
+    fcntl = None
+
+# Optional minifiers used by --fingerprint-assets
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import resource
+except ImportError:  # Windows: subprocess CPU time is not reported
+    resource = None
+
+# Optional Brotli compressor used by --compress
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-# Global debug flag
-DEBUG = args.debug
+# Optional font subsetter used by --subset-fonts
+try:
+    from fontTools import subset as font_subset
+except ImportError:
+    font_subset = None
+
+# Global debug flag, set from the build configuration by DocsBuilder
+DEBUG = False
 
 def debug_print(message):
     """Print debug messages only if debug mode is enabled."""
@@ -55,15 +95,244 @@ DARCSIT_DIR = BASILISK_DIR / 'src' / 'darcsit'
 TEMPLATE_PATH = REPO_ROOT / '.github' / 'assets' / 'custom_template.html'  # Use the modified local template
 LITERATE_C_SCRIPT = DARCSIT_DIR / 'literate-c'  # Path to the literate-c script
 BASE_URL = "/"  # Relative base URL for links within the site
+CNAME_PATH = REPO_ROOT / 'CNAME'  # Domain of the published site
+DEFAULT_BASE_DOMAIN = "https://test.comphy-lab.org"  # Used when there is no CNAME file
 CSS_PATH = REPO_ROOT / '.github' / 'assets' / 'css' / 'custom_styles.css'  # Path to custom CSS
+BUILD_CACHE_PATH = DOCS_DIR / '.build-cache.json'  # Manifest used for incremental rebuilds
+HIGHLIGHT_CACHE_PATH = DOCS_DIR / '.highlight-cache.json'  # Highlighted code blocks kept by --highlight-cache
+ASSET_SYNC_MANIFEST = '.asset-sync.json'  # Assets placed in the docs directory by copy_assets()
+ASSET_LINK_MODES = ('copy', 'hardlink', 'reflink')
+ASSET_MANIFEST_PATH = 'assets/manifest.json'  # Fingerprinted asset names, relative to the docs directory
+ASSET_HASH_LENGTH = 8
+# Assets referenced by the template that --fingerprint-assets minifies and renames
+FINGERPRINTED_ASSETS = (
+    'css/vendor.css', 'css/styles.css', 'css/custom_styles.css', 'css/command-palette.css',
+    'js/command-palette.js', 'js/command-data.js', 'js/main.js', 'js/theme-toggle.js',
+)
+# Strings, comments, whitespace around punctuation, and other whitespace in CSS
+CSS_MINIFY_TOKEN_PATTERN = re.compile(
+    r'(?P<string>"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'
+    r'|(?P<comment>/\*[\s\S]*?\*/)'
+    r'|\s*(?P<punctuation>[{};,])\s*'
+    r'|\s+'
+)
+# Site stylesheets that --critical-css selects inline rules from and loads deferred
+CRITICAL_CSS_STYLESHEETS = ('css/vendor.css', 'css/styles.css', 'css/custom_styles.css')
+CRITICAL_CSS_PLACEHOLDER = '<!-- critical-css -->'
+CRITICAL_CSS_FOLD_CHARS = 16000  # Body markup considered above the fold
+# Pseudo-classes, pseudo-elements and attribute selectors, ignored when matching selectors
+CSS_SELECTOR_IGNORED_PATTERN = re.compile(r'::?[\w-]+(?:\([^)]*\))?|\[[^\]]*\]')
+# Icon font stylesheets whose fonts --subset-fonts subsets
+ICON_FONT_STYLESHEETS = ('css/fontello/css/fontello.css', 'css/academicons-1.7.0/css/academicons.min.css')
+FONT_SUBSET_STATE_PATH = 'assets/.font-subsets.json'  # Glyph sets of the subset fonts
+ICON_GLYPH_PATTERN = re.compile(r'\.([\w-]+):{1,2}before\s*\{[^}]*?content:\s*[\'"]\\([0-9a-fA-F]+)[\'"]')
+ICON_FONT_URL_PATTERN = re.compile(r'url\(\s*[\'"]?([^\'")?#]+\.(?:woff2?|ttf))')
+PROFILE_REPORT_PATH = REPO_ROOT / 'build-profile.json'  # Default --profile report
+PROFILE_TOP_N = 10  # Rows of each table of the --profile summary
+HIGHLIGHT_CACHE_MAX_ENTRIES = 20000  # Code blocks kept in the --highlight-cache file
+HIGHLIGHT_FENCE_PATTERN = re.compile(r'^(`{3,}|~{3,})[ \t]*[^`\s][^`]*$')  # Opening fence with a language
+HIGHLIGHT_SEPARATOR = 'HLCACHESEPARATOR'  # Paragraph between the code blocks highlighted together
+# Generated files that --compress writes .gz and .br siblings for
+COMPRESSED_SUFFIXES = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+ASSET_COPY_JOBS = 8  # Threads checking and copying asset files; the work is I/O bound
+FICLONE = 0x40049409  # Linux ioctl cloning a file's extents (copy-on-write "reflink")
+GENERATOR_VERSION = "1"  # Bump to invalidate every cached page when the output format changes
+PAGE_INPUT_FORMAT = 'markdown+smart+raw_html'  # Markdown with smart typography extension and raw HTML
+PANDOC_SERVER_TIMEOUT = 300  # Seconds pandoc server may spend on one batch
+SEARCH_DB_PATH = DOCS_DIR / 'assets' / 'js' / 'search_db.json'  # Search database loaded by the command palette
+SEARCH_EXCERPT_LENGTH = 160  # Characters of text shown under each search result
+SEARCH_INDEX_DIR = DOCS_DIR / 'assets' / 'js' / 'search'  # Sharded inverted index fetched by the command palette
+# Terms are sharded by this many leading characters (also the minimum term length). Shard files are
+# named by the raw prefix ('ab.json'), here and in command-palette.js; this is only safe below 3, as
+# longer prefixes such as con, aux, nul or prn (com1, lpt1 at 4) are reserved device names on Windows.
+SEARCH_PREFIX_LENGTH = 2
+SEARCH_DOCS_PER_CHUNK = 256  # Records per chunk of result titles, URLs and excerpts
+SEARCH_MAX_TERM_OCCURRENCES = 3  # Occurrences of a term counted per record field
+SEARCH_FIELD_WEIGHTS = {'title': 7, 'headings': 3, 'content': 2, 'tags': 1, 'categories': 1}
+LIVE_RELOAD_PATH = '/__livereload'  # Server-sent events endpoint of the --watch server
+LIVE_RELOAD_SCRIPT = f'<script>new EventSource("{LIVE_RELOAD_PATH}").onmessage = function() {{ location.reload(); }};</script>'
+
+# Patterns mirroring awk's default field splitting and decl_anchors.awk's line-number rule
+AWK_FIELD_SEPARATOR = re.compile(r'[ \t\n]+')
+AWK_LINE_NUMBER_PATTERN = re.compile(r' *[0-9]*')
+
+# Tokens rewritten by post_process_html(). Each pattern is compiled once and the HTML
+# is scanned a single time, instead of one regex pass per rewrite.
+_PRE_CODE_OPEN_TOKEN = r'(?P<pre_open>(?i:<pre[^>]*><code[^>]*>))'
+_PRE_CODE_CLOSE_TOKEN = r'(?P<pre_close>(?i:</code></pre>))'
+_SOURCE_DIV_TOKEN = r'(?P<source_div>(?i:<div class="sourceCode" id="cb\d+"[^>]*>))'
+_DOC_LINK_TOKEN = r'(?P<doc_link><a[^>]+href="[^"]+">[^<]+</a>)'
+# Line numbers left by literate-c before a closing </span>. Equivalent to
+# (\s*(?:<span class="[^"]*">\s*\d+\s*</span>|\s+\d+)\s*)+(\s*</span>) but without
+# the nested whitespace quantifiers that backtrack exponentially on long lines.
+_LINE_NUMBERS_TOKEN = r'(?P<line_numbers>(?<!\s)\s*(?:(?:<span class="[^"]*">\s*\d+\s*</span>|(?<=\s)\d+)\s*)+</span>)'
+_INCLUDE_TOKEN = (r'(?P<include>(?P<include_prefix><span class="pp">#include\s*</span>)(?P<include_open><span class="im">)'
+                  r'(?:"|&quot;)(?P<include_file>.*?)(?:"|&quot;)(?P<include_close></span>))')
+DOC_HTML_TOKEN_PATTERN = re.compile(
+    '|'.join([_PRE_CODE_OPEN_TOKEN, _PRE_CODE_CLOSE_TOKEN, _SOURCE_DIV_TOKEN, _DOC_LINK_TOKEN]))
+C_HTML_TOKEN_PATTERN = re.compile(
+    '|'.join([_INCLUDE_TOKEN, _PRE_CODE_OPEN_TOKEN, _PRE_CODE_CLOSE_TOKEN, _SOURCE_DIV_TOKEN, _LINE_NUMBERS_TOKEN]),
+    re.DOTALL)
+PRE_CODE_CLOSE_PATTERN = re.compile(r'</code></pre>', re.IGNORECASE)
+HREF_PATTERN = re.compile(r'href="([^"]+)"')
+DOC_FILE_SUFFIX_PATTERN = re.compile(r'\.(c|h|py|sh|md)$')
+
+# Patterns used to extract the search database records from the rendered pages
+MAIN_CONTENT_PATTERN = re.compile(r'<main[^>]*>(.*?)</main>', re.DOTALL | re.IGNORECASE)
+SEARCH_SKIP_PATTERN = re.compile(
+    r'<(script|style)\b[^>]*>.*?</\1>'  # Scripts and styles
+    r'|<h1 class="page-title">.*?</h1>'  # Page title, already the record title
+    r'|<a id="\d+" href="#\d+">\d+</a>',  # Line-number anchors of C listings
+    re.DOTALL | re.IGNORECASE)
+SECTION_HEADING_PATTERN = re.compile(r'<h([1-3])(?P<attributes>[^>]*)>(?P<text>.*?)</h\1>',
+                                     re.DOTALL | re.IGNORECASE)
+HTML_ID_PATTERN = re.compile(r'\bid="([^"]*)"')
+HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
+SEARCH_TERM_PATTERN = re.compile(r'[a-z0-9_]+')  # Must match the tokenizer in command-palette.js
+
+# Global build profiler, set by DocsBuilder while a --profile build runs
+PROFILER = None
+
+
+class BuildProfiler:
+    """
+    Records where a build spends its time, for --profile.
+    
+    For each stage it records the number of runs and their total wall time and CPU
+    time (of the thread running the stage, so concurrent pages are not counted twice);
+    for each page, the wall time of each of its stages; and for each kind of subprocess
+    (or pandoc server request), the number of runs, their wall time and the bytes
+    written to and read from it. Stages may be nested, e.g. literate-c inside
+    'prepare input', and their times are inclusive. It is safe to use from several threads.
+    """
+    
+    def __init__(self):
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.start_children_cpu = children_cpu_time()
+        self.stages = {}
+        self.files = {}
+        self.subprocesses = {}
+        self._lock = threading.Lock()
+    
+    @contextlib.contextmanager
+    def stage(self, name: str, file_path: Optional[Path] = None):
+        """Context manager recording the time spent in its body as the stage `name`."""
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            with self._lock:
+                stage = self.stages.setdefault(name, {'count': 0, 'wall': 0.0, 'cpu': 0.0})
+                stage['count'] += 1
+                stage['wall'] += wall
+                stage['cpu'] += cpu
+                if file_path is not None:
+                    file_stages = self.files.setdefault(str(file_path), {})
+                    file_stages[name] = file_stages.get(name, 0.0) + wall
+    
+    def record_subprocess(self, name: str, wall: float, bytes_written: int, bytes_read: int) -> None:
+        """Record a run of the subprocess `name` and the bytes sent to and received from it."""
+        with self._lock:
+            process = self.subprocesses.setdefault(name, {'count': 0, 'wall': 0.0,
+                                                          'bytes_written': 0, 'bytes_read': 0})
+            process['count'] += 1
+            process['wall'] += wall
+            process['bytes_written'] += bytes_written
+            process['bytes_read'] += bytes_read
+    
+    def report(self) -> Dict[str, Any]:
+        """Return the recorded times, sorted by decreasing wall time, with the build totals."""
+        with self._lock:
+            files = {path: dict(sorted(stages.items(), key=lambda item: -item[1]))
+                     for path, stages in sorted(self.files.items(), key=lambda item: -sum(item[1].values()))}
+            return {
+                'total': {
+                    'wall': time.perf_counter() - self.start_wall,
+                    'cpu': time.process_time() - self.start_cpu,
+                    'children_cpu': children_cpu_time() - self.start_children_cpu,
+                },
+                'stages': dict(sorted(self.stages.items(), key=lambda item: -item[1]['wall'])),
+                'files': files,
+                'subprocesses': dict(sorted(self.subprocesses.items(), key=lambda item: -item[1]['wall'])),
+            }
+    
+    def write_report(self, report_path: Path, top: int = PROFILE_TOP_N) -> None:
+        """Write the JSON report and print the slowest stages, pages and subprocesses."""
+        report = self.report()
+        try:
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+        except OSError as e:
+            print(f"Error writing profile report: {e}")
+        
+        total = report['total']
+        print(f"\nProfile ({report_path}): {total['wall']:.2f}s wall, {total['cpu']:.2f}s CPU, "
+              f"{total['children_cpu']:.2f}s subprocess CPU")
+        print(f"  {'stage':<28} {'runs':>6} {'wall (s)':>9} {'cpu (s)':>9}")
+        for name, stage in list(report['stages'].items())[:top]:
+            print(f"  {name:<28} {stage['count']:>6} {stage['wall']:>9.3f} {stage['cpu']:>9.3f}")
+        if report['subprocesses']:
+            print(f"  {'subprocess':<28} {'runs':>6} {'wall (s)':>9} {'written':>10} {'read':>10}")
+            for name, process in report['subprocesses'].items():
+                print(f"  {name:<28} {process['count']:>6} {process['wall']:>9.3f} "
+                      f"{process['bytes_written']:>10} {process['bytes_read']:>10}")
+        if report['files']:
+            print("  slowest pages (wall s):")
+            for path, stages in list(report['files'].items())[:top]:
+                print(f"  {sum(stages.values()):>9.3f}  {path}")
+
+
+def children_cpu_time() -> float:
+    """CPU time used by the finished subprocesses of this process, 0 where unavailable."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+@contextlib.contextmanager
+def profile_stage(name: str, file_path: Optional[Path] = None):
+    """Record the time spent in the body as a stage of the build profile, if one is recorded."""
+    profiler = PROFILER
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name, file_path):
+        yield
+
+
+def record_subprocess(name: str, started: float, data_written: Union[str, bytes, None],
+                      data_read: Union[str, bytes, None]) -> None:
+    """
+    Record a subprocess run started at perf_counter() time `started` in the build profile,
+    with the data sent to it and received from it (text is counted in UTF-8 bytes).
+    """
+    profiler = PROFILER
+    if profiler is not None:
+        sizes = [len(data.encode('utf-8')) if isinstance(data, str) else len(data or b'')
+                 for data in (data_written, data_read)]
+        profiler.record_subprocess(name, time.perf_counter() - started, *sizes)
+
+
+def read_base_domain(cname_path: Path) -> str:
+    """
+    Read the domain of the published site from the CNAME file.
+    
+    Returns the domain as an https URL, or DEFAULT_BASE_DOMAIN if the file does
+    not exist or cannot be read.
+    """
+    try:
+        return f"https://{cname_path.read_text().strip()}" if cname_path.exists() else DEFAULT_BASE_DOMAIN
+    except Exception as e:
+        print(f"Warning: Could not read CNAME file: {e}")
+        return DEFAULT_BASE_DOMAIN
 
-# Read domain from CNAME file or use default
-try:
-    CNAME_PATH = REPO_ROOT / 'CNAME'
-    BASE_DOMAIN = f"https://{CNAME_PATH.read_text().strip()}" if CNAME_PATH.exists() else "https://test.comphy-lab.org"
-except Exception as e:
-    print(f"Warning: Could not read CNAME file: {e}")
-    BASE_DOMAIN = "https://test.comphy-lab.org"
 
 def extract_h1_from_readme(readme_path: Path) -> str:
     """
@@ -88,11 +357,114 @@ def extract_h1_from_readme(readme_path: Path) -> str:
         return "Documentation"
 
 
-# Dynamically get the wiki title from README.md
-WIKI_TITLE = extract_h1_from_readme(README_PATH)
-
-
-def process_template_for_assets(template_path: Path) -> str:
+@dataclass(frozen=True)
+class DocsConfig:
+    """
+    Configuration of a documentation build.
+    
+    Holds the command line options and the paths used by the build. Creating it has no
+    side effects and it only holds paths and plain values, so it is cheap to copy and to
+    send to worker processes. Values that require reading files, the wiki title (from
+    README.md) and the site domain (from CNAME), are read on first use.
+    """
+    repo_root: Path = REPO_ROOT
+    source_dirs: Tuple[str, ...] = tuple(SOURCE_DIRS)
+    docs_dir: Path = DOCS_DIR
+    readme_path: Path = README_PATH
+    index_path: Path = INDEX_PATH
+    cname_path: Path = CNAME_PATH
+    assets_dir: Path = REPO_ROOT / '.github' / 'assets'
+    basilisk_dir: Path = BASILISK_DIR
+    darcsit_dir: Path = DARCSIT_DIR
+    template_path: Path = TEMPLATE_PATH
+    literate_c_script: Path = LITERATE_C_SCRIPT
+    css_path: Path = CSS_PATH
+    base_url: str = BASE_URL
+    build_cache_path: Path = BUILD_CACHE_PATH
+    highlight_cache_path: Path = HIGHLIGHT_CACHE_PATH
+    search_db_path: Path = SEARCH_DB_PATH
+    search_index_dir: Path = SEARCH_INDEX_DIR
+    debug: bool = False
+    jobs: int = os.cpu_count() or 1
+    pandoc_batch_size: int = 32
+    awk_anchors: bool = False
+    no_cache: bool = False
+    watch: bool = False
+    port: int = 8000
+    watch_interval: float = 0.3
+    search_max_chars: int = 2000
+    asset_link: str = 'copy'
+    fingerprint_assets: bool = False
+    critical_css: bool = False
+    subset_fonts: bool = False
+    compress: bool = False
+    highlight_cache: bool = False
+    profile: Optional[Path] = None
+    
+    @functools.cached_property
+    def wiki_title(self) -> str:
+        """Title of the documentation, from the first H1 heading of README.md."""
+        return extract_h1_from_readme(self.readme_path)
+    
+    @functools.cached_property
+    def base_domain(self) -> str:
+        """URL of the published site, from the CNAME file."""
+        return read_base_domain(self.cname_path)
+    
+    @classmethod
+    def from_args(cls, argv: Optional[List[str]] = None) -> 'DocsConfig':
+        """
+        Create the configuration from command line arguments.
+        
+        Args:
+            argv: Arguments to parse; defaults to sys.argv[1:].
+        
+        Returns:
+            The configuration, with default paths and the parsed options.
+        """
+        parser = argparse.ArgumentParser(description='Generate documentation from source files.')
+        parser.add_argument('--debug', action='store_true', help='Enable debug output')
+        parser.add_argument('-j', '--jobs', type=int, default=cls.jobs,
+                            help='Number of pages to render concurrently (default: all cores)')
+        parser.add_argument('--pandoc-batch-size', type=int, default=cls.pandoc_batch_size,
+                            help='Maximum pages per pandoc server batch; 0 runs one pandoc process per page')
+        parser.add_argument('--awk-anchors', action='store_true',
+                            help="Add C line/declaration anchors with darcsit's decl_anchors.awk instead of in-process")
+        parser.add_argument('--no-cache', action='store_true',
+                            help='Ignore the incremental build cache and regenerate every page')
+        parser.add_argument('--watch', action='store_true',
+                            help='Rebuild when sources, README.md or assets change, and serve docs/ with live reload')
+        parser.add_argument('--port', type=int, default=cls.port,
+                            help='Port of the local web server in --watch mode (default: 8000)')
+        parser.add_argument('--watch-interval', type=float, default=cls.watch_interval,
+                            help='Seconds between checks for changed files in --watch mode (default: 0.3)')
+        parser.add_argument('--search-max-chars', type=int, default=cls.search_max_chars,
+                            help='Maximum text length of each search database record; 0 for no limit')
+        parser.add_argument('--asset-link', choices=ASSET_LINK_MODES, default=cls.asset_link,
+                            help='Place changed assets in docs/ by copying, hard linking or reflinking them '
+                                 '(default: copy; links fall back to copies)')
+        parser.add_argument('--fingerprint-assets', action='store_true',
+                            help='Minify the stylesheets and scripts referenced by the template and '
+                                 'reference them by content-hashed names')
+        parser.add_argument('--critical-css', action='store_true',
+                            help='Inline the CSS rules used above the fold of each page and load the '
+                                 'site stylesheets without blocking rendering')
+        parser.add_argument('--subset-fonts', action='store_true',
+                            help='Subset the icon fonts to the glyphs used (requires fontTools)')
+        parser.add_argument('--highlight-cache', action='store_true',
+                            help='Highlight each distinct code block once and reuse its HTML across pages '
+                                 'and builds')
+        parser.add_argument('--profile', nargs='?', type=Path, const=PROFILE_REPORT_PATH, metavar='REPORT',
+                            help='Record the time spent in each build stage, page and subprocess, write a JSON '
+                                 f'report (default: {PROFILE_REPORT_PATH.name}) and print the slowest ones')
+        parser.add_argument('--compress', action='store_true',
+                            help='Write precompressed .gz (and, with brotli installed, .br) copies of '
+                                 'the generated pages, assets, sitemap and search database')
+        args = parser.parse_args(argv)
+        return cls(**vars(args))
+
+
+def process_template_for_assets(template_path: Path, critical_css: bool = False) -> str:
     """
     Process the custom template to ensure correct asset paths.
     
@@ -102,6 +474,8 @@ def process_template_for_assets(template_path: Path) -> str:
     
     Args:
         template_path: Path to the custom HTML template
+        critical_css: Whether to load the site stylesheets deferred, after the inlined
+            critical CSS (see defer_site_stylesheets())
         
     Returns:
         The processed template content as a string
@@ -109,6 +483,8 @@ def process_template_for_assets(template_path: Path) -> str:
     try:
         with open(template_path, 'r', encoding='utf-8') as f:
             template_content = f.read()
+        if critical_css:
+            template_content = defer_site_stylesheets(template_content)
         debug_print("Template processed for correct asset paths")
         return template_content
     except Exception as e:
@@ -116,34 +492,33 @@ def process_template_for_assets(template_path: Path) -> str:
         return ""
 
 
-def validate_config() -> bool:
+def validate_config(config: DocsConfig) -> Optional[DocsConfig]:
     """
     Validates that all required configuration paths exist.
     
-    Checks if the necessary directories (BASILISK_DIR and DARCSIT_DIR) and files (TEMPLATE_PATH and the literate-c script)
-    are present. If any path is missing, an error is printed and the function returns False; otherwise, it returns True.
+    Checks if the necessary directories (basilisk_dir and darcsit_dir) and files (template_path and the literate-c script)
+    are present. If any path is missing, an error is printed and the function returns None. Otherwise, the template is
+    processed into a temporary template file, and the configuration to build with, which uses that temporary template,
+    is returned.
     """
-    global TEMPLATE_PATH
-    
     essential_paths = [
-        (BASILISK_DIR, "BASILISK_DIR"),
-        (DARCSIT_DIR, "DARCSIT_DIR"),
-        (TEMPLATE_PATH, "TEMPLATE_PATH"),
-        (LITERATE_C_SCRIPT, "literate-c script")
+        (config.basilisk_dir, "BASILISK_DIR"),
+        (config.darcsit_dir, "DARCSIT_DIR"),
+        (config.template_path, "TEMPLATE_PATH"),
+        (config.literate_c_script, "literate-c script")
     ]
 
     for path, name in essential_paths:
         if not (path.is_dir() if name.endswith("DIR") else path.is_file()):
             print(f"Error: {name} not found at {path}")
-            return False
+            return None
     
     # Process the template to ensure correct asset paths
-    # Process the template to ensure correct asset paths
-    processed_template = process_template_for_assets(TEMPLATE_PATH)
+    processed_template = process_template_for_assets(config.template_path, config.critical_css)
     if not processed_template:
-        return False
+        return None
     # Create a temporary template file with processed content
-    temp_template_path = TEMPLATE_PATH.with_suffix('.temp.html')
+    temp_template_path = config.template_path.with_suffix('.temp.html')
     
     # Clean up any existing temporary file
     if temp_template_path.exists():
@@ -155,13 +530,125 @@ def validate_config() -> bool:
     try:
         with open(temp_template_path, 'w', encoding='utf-8') as f:
             f.write(processed_template)
-        # Replace the template path with the temporary one
-        TEMPLATE_PATH = temp_template_path
     except Exception as e:
         print(f"Error creating temporary template file: {e}")
-        return False
+        return None
     
-    return True
+    # Replace the template path with the temporary one
+    return replace(config, template_path=temp_template_path)
+
+
+def hash_file(path: Path) -> str:
+    """
+    Return the SHA-256 hex digest of a file's contents.
+    
+    Missing or unreadable files hash to an empty string, so that a file appearing
+    or disappearing is still seen as a change by the build cache.
+    """
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def compute_build_fingerprint(config: DocsConfig) -> str:
+    """
+    Compute a fingerprint of every input shared by all generated pages.
+    
+    The fingerprint covers the generator version and source, the HTML template, the
+    custom CSS, the darcsit helpers used for C files, the stylesheets critical CSS is
+    inlined from, and the site-wide template variables. If any of these change, every cached page is considered stale.
+    
+    Args:
+        config: Build configuration, with the HTML template passed to pandoc.
+    
+    Returns:
+        A hex digest identifying the current build configuration.
+    """
+    digest = hashlib.sha256()
+    for part in (GENERATOR_VERSION, config.base_url, config.wiki_title, config.css_path.name,
+                 hash_file(Path(__file__)),
+                 hash_file(config.template_path),
+                 hash_file(config.css_path),
+                 hash_file(config.literate_c_script),
+                 hash_file(config.darcsit_dir / 'decl_anchors.awk'),
+                 *(hash_file(config.assets_dir / stylesheet)
+                   for stylesheet in (CRITICAL_CSS_STYLESHEETS if config.critical_css else ()))):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def compute_page_fingerprint(file_path: Path, repo_root: Path) -> str:
+    """
+    Compute a fingerprint of the inputs specific to a single page.
+    
+    This is the hash of the source file itself and, for C/C++ files, of the `.tags`
+    file read by the declaration-anchor post-processing.
+    """
+    digest = hashlib.sha256(hash_file(file_path).encode('utf-8'))
+    if file_path.suffix.lower() not in ('.md', '.py', '.sh'):
+        relative_tags_path = file_path.relative_to(repo_root).with_suffix(file_path.suffix + '.tags')
+        digest.update(hash_file(repo_root / relative_tags_path).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_build_cache(cache_path: Path, build_fingerprint: str) -> Dict[str, Any]:
+    """
+    Load the incremental build manifest.
+    
+    Returns an empty manifest if the file does not exist, cannot be parsed, or was
+    written for a different build fingerprint (template, CSS or generator change).
+    
+    Args:
+        cache_path: Path to the JSON build manifest.
+        build_fingerprint: Fingerprint of the current build configuration.
+    
+    Returns:
+        The manifest, with a "pages" dictionary keyed by repository-relative source path.
+    """
+    empty_cache = {'build': build_fingerprint, 'pages': {}, 'index': "", 'sitemap': ""}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return empty_cache
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable build cache {cache_path}: {e}")
+        return empty_cache
+    
+    if not isinstance(cache, dict) or cache.get('build') != build_fingerprint:
+        debug_print("Build configuration changed, ignoring build cache")
+        return empty_cache
+    
+    cache.setdefault('pages', {})
+    cache.setdefault('index', "")
+    cache.setdefault('sitemap', "")
+    return cache
+
+
+def save_build_cache(cache_path: Path, cache: Dict[str, Any], label: str = "build cache") -> bool:
+    """
+    Write the incremental build manifest, or another JSON state file, atomically.
+    
+    Args:
+        cache_path: Path to the JSON build manifest.
+        cache: Manifest to write.
+        label: Name of the file in the warning printed if it cannot be written.
+    
+    Returns:
+        True if the manifest was written successfully, False otherwise.
+    """
+    temp_path = cache_path.with_suffix('.tmp')
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(temp_path, cache_path)
+        return True
+    except OSError as e:
+        print(f"Warning: Could not write {label} {cache_path}: {e}")
+        temp_path.unlink(missing_ok=True)
+        return False
 
 
 def find_source_files(root_dir: Path, source_dirs: List[str]) -> List[Path]:
@@ -362,14 +849,17 @@ def process_c_file(file_path: Path, literate_c_script: Path) -> str:
     
     try:
         # Run literate-c, capture its output
-        preproc_proc = subprocess.Popen(
-            literate_c_cmd, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            text=True, 
-            encoding='utf-8'
-        )
-        content, stderr = preproc_proc.communicate()
+        started = time.perf_counter()
+        with profile_stage('literate-c'):
+            preproc_proc = subprocess.Popen(
+                literate_c_cmd, 
+                stdout=subprocess.PIPE, 
+                stderr=subprocess.PIPE, 
+                text=True, 
+                encoding='utf-8'
+            )
+            content, stderr = preproc_proc.communicate()
+        record_subprocess('literate-c', started, None, content)
 
         if preproc_proc.returncode == 0 and content.strip():
             # Replace the specific marker literate-c uses with standard pandoc 'c'
@@ -411,22 +901,360 @@ def prepare_pandoc_input(file_path: Path, literate_c_script: Path) -> str:
         return process_c_file(file_path, literate_c_script)
 
 
-def run_pandoc(pandoc_input: str, output_html_path: Path, template_path: Path, 
-               base_url: str, wiki_title: str, page_url: str, page_title: str,
-               seo_metadata: Dict[str, str] = None) -> str:
-    """Converts Markdown content to a standalone HTML document using Pandoc.
+class PandocConverter:
+    """
+    Converts Markdown documents to standalone HTML with pandoc, many documents at a time.
+    
+    Starting pandoc costs a Haskell runtime startup per call, which dominates the conversion
+    of small pages. When the local pandoc supports server mode (`pandoc server`, pandoc 3.0
+    and later), one server process is started on first use and documents are posted to its
+    /batch endpoint in batches, each with its own template variables. If server mode is
+    unavailable, disabled or fails, each document is converted by its own pandoc process,
+    as is any document of a batch for which the server returns no output.
+    
+    Conversion requests are dictionaries with the keys "text", "from", "variables" and,
+    optionally, "mathjax" and "standalone". All standalone documents, the default, use the
+    template given to the constructor; the others are converted to HTML fragments.
+    """
+    
+    def __init__(self, template_path: Path, use_server: bool = True):
+        self.template_path = template_path
+        self.use_server = use_server
+        self.server_process = None
+        self.server_url = None
+        self._server_stopped = False  # Set by close(), so the server is not started again
+        self._server_lock = threading.Lock()
+    
+    def _start_server(self) -> None:
+        """Start `pandoc server` on a free local port and check that it honours templates."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        
+        try:
+            self.server_process = subprocess.Popen(
+                ['pandoc', 'server', '--port', str(port), '--timeout', str(PANDOC_SERVER_TIMEOUT)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            debug_print(f"  [Debug Pandoc] Could not start pandoc server: {e}")
+            return
+        
+        server_url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and self.server_process.poll() is None:
+            try:
+                with urllib.request.urlopen(f"{server_url}/version", timeout=1) as response:
+                    debug_print(f"  [Debug Pandoc] pandoc server {response.read().decode('utf-8').strip()} on port {port}")
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            debug_print("  [Debug Pandoc] pandoc server mode is not available")
+            self.close()
+            return
+        
+        # Make sure per-document templates and variables are supported before relying on them
+        self.server_url = server_url
+        try:
+            probe = self._post_batch([{'text': 'probe', 'from': 'markdown', 'variables': {'probe': 'ok'}}],
+                                     template='$probe$')
+        except (OSError, ValueError) as e:
+            probe = [str(e)]
+        if probe != ['ok\n'] and probe != ['ok']:
+            debug_print(f"  [Debug Pandoc] pandoc server failed the template probe: {probe}")
+            self.close()
+    
+    def _post_batch(self, requests: List[Dict[str, Any]], template: str) -> List[Optional[str]]:
+        """Post requests to the server's /batch endpoint, returning each output or None where it has none."""
+        payload = []
+        for request in requests:
+            params = {
+                'text': request['text'],
+                'from': request['from'],
+                'to': 'html5',
+                'standalone': request.get('standalone', True),
+                'template': template,
+                'variables': request['variables'],
+            }
+            if request.get('mathjax'):
+                params['html-math-method'] = {'method': 'mathjax'}
+            payload.append(params)
+        
+        http_request = urllib.request.Request(
+            f"{self.server_url}/batch",
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
+        )
+        started = time.perf_counter()
+        with urllib.request.urlopen(http_request, timeout=PANDOC_SERVER_TIMEOUT + 10) as response:
+            response_data = response.read()
+        record_subprocess('pandoc server request', started, http_request.data, response_data)
+        results = json.loads(response_data.decode('utf-8'))
+        
+        if not isinstance(results, list) or len(results) != len(requests):
+            raise ValueError("unexpected pandoc server batch response")
+        
+        outputs = []
+        for result in results:
+            if isinstance(result, str):
+                outputs.append(result)
+            elif isinstance(result, dict) and isinstance(result.get('output'), str) and not result.get('base64'):
+                outputs.append(result['output'])
+            else:
+                error = result.get('error', result) if isinstance(result, dict) else result
+                print(f"Warning: pandoc server could not convert a document ({error}), converting it individually")
+                outputs.append(None)
+        return outputs
+    
+    def _convert_with_subprocess(self, request: Dict[str, Any]) -> Optional[str]:
+        """Convert a single request with its own pandoc process."""
+        pandoc_cmd = [
+            'pandoc',
+            '-f', request['from'],
+            '-t', 'html5',
+        ]
+        if request.get('standalone', True):
+            pandoc_cmd.extend(['--standalone', '--template', str(self.template_path)])  # Create full HTML doc
+        if request.get('mathjax'):
+            pandoc_cmd.append('--mathjax')
+        for name, value in request['variables'].items():
+            pandoc_cmd.extend(['-V', f'{name}={value}'])
+        
+        debug_print(f"  [Debug Pandoc] Command: {' '.join(pandoc_cmd)}")
+        
+        # Run pandoc with input content, reading the HTML from stdout
+        started = time.perf_counter()
+        process = subprocess.run(pandoc_cmd, input=request['text'], text=True, encoding='utf-8', capture_output=True)
+        record_subprocess('pandoc', started, request['text'], process.stdout)
+        
+        debug_print(f"  [Debug Pandoc] Return Code: {process.returncode}")
+        if process.stderr:
+            debug_print(f"  [Debug Pandoc] STDERR:\n{process.stderr}")
+        
+        if process.returncode != 0:
+            print(f"Error running pandoc: {process.stderr}")
+            return None
+        return process.stdout
+    
+    @functools.cached_property
+    def version(self) -> str:
+        """The first line of `pandoc --version`, or an empty string if pandoc cannot be run."""
+        try:
+            process = subprocess.run(['pandoc', '--version'], capture_output=True, text=True, encoding='utf-8')
+            return process.stdout.split('\n', 1)[0].strip()
+        except OSError:
+            return ""
+    
+    def convert(self, requests: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Convert a batch of documents.
+        
+        Args:
+            requests: Conversion requests, see the class documentation.
+        
+        Returns:
+            The generated HTML for each request, in order, or None where conversion failed.
+        """
+        if self.use_server:
+            with self._server_lock:
+                if self.use_server and not self._server_stopped and self.server_process is None:
+                    self._start_server()
+                    self.use_server = self.server_url is not None
+        
+        if self.server_url:
+            try:
+                template = self.template_path.read_text(encoding='utf-8')
+                debug_print(f"  [Debug Pandoc] Converting a batch of {len(requests)} documents")
+                outputs = self._post_batch(requests, template)
+            except (OSError, ValueError) as e:
+                print(f"Warning: pandoc server batch failed ({e}), converting documents individually")
+            else:
+                # Documents the server returned no output for get their own pandoc process
+                return [output if output is not None else self._convert_with_subprocess(request)
+                        for request, output in zip(requests, outputs)]
+        
+        return [self._convert_with_subprocess(request) for request in requests]
+    
+    def close(self) -> None:
+        """Stop the pandoc server, if one was started."""
+        self.server_url = None
+        self._server_stopped = True
+        if self.server_process is not None:
+            if self.server_process.poll() is None:
+                self.server_process.terminate()
+                try:
+                    self.server_process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.server_process.kill()
+            self.server_process = None
+
+
+class HighlightCache:
+    """
+    Caches the HTML that pandoc generates for fenced code blocks, keyed by a hash of the
+    block's fence line and code, the pandoc version and GENERATOR_VERSION.
+    
+    Highlighting large code blocks dominates the conversion of source pages, and many
+    blocks are shared between pages and between builds. Before a page is converted,
+    extract() replaces the code of each top-level fenced block with a one-line
+    placeholder, so pandoc still emits the block's wrapper (and numbers it like the
+    original, e.g. id="cb3"). The blocks of a batch of pages not yet in the cache are
+    highlighted together by highlight(), in a single pandoc conversion, and splice() puts the cached HTML in
+    place of each placeholder block of the converted page, renumbered to its id.
+    
+    The cache is kept in a JSON file between builds, limited to HIGHLIGHT_CACHE_MAX_ENTRIES
+    blocks, the least recently used being dropped. It is safe to use from several threads.
+    """
+    
+    def __init__(self, cache_path: Path, pandoc_version: str):
+        self.cache_path = cache_path
+        self.pandoc_version = pandoc_version
+        self.fragments = {}
+        self.pending = {}
+        self.changed = False
+        self._lock = threading.Lock()
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                fragments = json.load(f)
+            if isinstance(fragments, dict):
+                self.fragments = fragments
+        except (OSError, ValueError):
+            pass
+    
+    @staticmethod
+    def placeholder(index: int) -> str:
+        """Return the placeholder code of the index-th block of a page: a single identifier."""
+        return 'HLCACHE' + ''.join(chr(ord('A') + int(digit)) for digit in str(index)) + 'X'
+    
+    def extract(self, text: str) -> Tuple[str, List[str]]:
+        """
+        Replace the code of the top-level fenced code blocks of a Markdown document.
+        
+        Only blocks with a language or attributes after the opening fence, preceded by a
+        blank line and closed by a matching fence are replaced; pandoc converts the
+        others as usual.
+        
+        Args:
+            text: The Markdown document.
+        
+        Returns:
+            A tuple of the document with placeholder blocks and the cache keys of the
+            replaced blocks, in document order.
+        """
+        lines = text.split('\n')
+        output = []
+        keys = []
+        index = 0
+        while index < len(lines):
+            line = lines[index]
+            fence = HIGHLIGHT_FENCE_PATTERN.match(line)
+            if fence and (index == 0 or not lines[index - 1].strip()):
+                fence_chars = fence.group(1)
+                closing_pattern = re.compile(f'^{re.escape(fence_chars[0])}{{{len(fence_chars)},}}[ \\t]*$')
+                end = next((i for i in range(index + 1, len(lines)) if closing_pattern.match(lines[i])), None)
+                if end is not None:
+                    block = '\n'.join(lines[index:end + 1])
+                    key = hashlib.sha256('\0'.join((GENERATOR_VERSION, self.pandoc_version, PAGE_INPUT_FORMAT,
+                                                    block)).encode('utf-8')).hexdigest()
+                    with self._lock:
+                        if key not in self.fragments:
+                            self.pending[key] = block
+                    output.extend((line, self.placeholder(len(keys)), lines[end]))
+                    keys.append(key)
+                    index = end + 1
+                    continue
+            output.append(line)
+            index += 1
+        return '\n'.join(output), keys
+    
+    def highlight(self, converter: 'PandocConverter', keys: List[str]) -> None:
+        """
+        Convert the given extracted blocks that are not cached yet, all in one document.
+        
+        A block whose HTML cannot be told apart in the output is left out of the cache,
+        so that splice() fails for it and its page is converted without the cache.
+        """
+        with self._lock:
+            pending = {key: self.pending[key] for key in dict.fromkeys(keys)
+                       if key in self.pending and key not in self.fragments}
+        if not pending:
+            return
+        
+        document = f"\n\n{HIGHLIGHT_SEPARATOR}\n\n".join(pending.values())
+        html, = converter.convert([{'text': document, 'from': PAGE_INPUT_FORMAT, 'variables': {},
+                                    'standalone': False}])
+        if html is None:
+            return
+        fragments = html.strip().split(f"<p>{HIGHLIGHT_SEPARATOR}</p>")
+        if len(fragments) != len(pending):
+            debug_print(f"  [Debug Highlight] Could not split {len(pending)} highlighted code blocks")
+            return
+        
+        with self._lock:
+            for key, fragment in zip(pending, fragments):
+                fragment = fragment.strip()
+                # Store pandoc's code block number as 0, replaced by the page's number in splice()
+                number = re.match(r'<div class="sourceCode" id="cb(\d+)"', fragment)
+                if number:
+                    fragment = re.sub(f'((?:id="|href="#)cb){number.group(1)}(?=["-])', r'\g<1>0', fragment)
+                self.fragments[key] = fragment
+                self.pending.pop(key, None)
+            self.changed = True
+    
+    def splice(self, html: str, keys: List[str]) -> Optional[str]:
+        """
+        Replace the placeholder blocks of a converted page with their cached HTML.
+        
+        Args:
+            html: The page converted from the document returned by extract().
+            keys: The cache keys returned by extract().
+        
+        Returns:
+            The page with highlighted code blocks, or None if a placeholder block or its
+            cached HTML could not be found.
+        """
+        with self._lock:
+            fragments = [self.fragments.get(key) for key in keys]
+            for key in keys:
+                # Move used blocks to the end, so the least recently used are dropped first
+                if key in self.fragments:
+                    self.fragments[key] = self.fragments.pop(key)
+        
+        for index, fragment in enumerate(fragments):
+            if fragment is None:
+                return None
+            placeholder = self.placeholder(index)
+            block = re.search(r'<div class="sourceCode" id="([^"]*)">(?:(?!<div class="sourceCode").)*?'
+                              + placeholder + r'.*?</pre></div>', html, re.DOTALL)
+            if block is None:
+                block = re.search(r'<pre[^>]*><code[^>]*>' + placeholder + r'</code></pre>', html)
+                if block is None:
+                    return None
+            elif re.fullmatch(r'cb\d+', block.group(1)):
+                fragment = re.sub(r'((?:id="|href="#)cb)0(?=["-])', lambda match: match.group(1) + block.group(1)[2:],
+                                  fragment)
+            html = html[:block.start()] + fragment + html[block.end():]
+        return html
+    
+    def save(self) -> None:
+        """Write the cache file, if blocks were added, keeping the most recently used blocks."""
+        with self._lock:
+            if not self.changed:
+                return
+            fragments = dict(list(self.fragments.items())[-HIGHLIGHT_CACHE_MAX_ENTRIES:])
+            self.changed = False
+        save_build_cache(self.cache_path, fragments, "highlight cache")
+
+
+def page_template_variables(base_url: str, wiki_title: str, page_url: str, page_title: str,
+                            seo_metadata: Dict[str, str] = None) -> Dict[str, str]:
+    """
+    Build the pandoc template variables of a generated page.
     
-    This function runs Pandoc to transform the provided Markdown input into HTML using a specified
-    template and SEO metadata. It assigns HTML variables for the base URL, wiki title, page URL, and
-    page title, and saves Pandoc's output to the designated file. After conversion, the function checks
-    that the generated HTML contains the proper DOCTYPE and <html> tag, and wraps the content with a
-    complete HTML scaffold if necessary. Returns Pandoc's standard output on success or an empty string
-    when an error occurs.
-      
     Args:
-        pandoc_input: The Markdown content to convert.
-        output_html_path: File path where the generated HTML is saved.
-        template_path: Path to the HTML template file used by Pandoc.
         base_url: Base URL for constructing absolute links.
         wiki_title: Title of the documentation or wiki.
         page_url: URL of the current page.
@@ -434,60 +1262,52 @@ def run_pandoc(pandoc_input: str, output_html_path: Path, template_path: Path,
         seo_metadata: Optional dictionary with SEO metadata (e.g., description, keywords, image).
     
     Returns:
-        The standard output from Pandoc if conversion succeeds; otherwise, an empty string.
+        A dictionary of template variable names and values.
     """
     if seo_metadata is None:
         seo_metadata = {}
     
-    pandoc_cmd = [
-        'pandoc',
-        '-f', 'markdown+smart+raw_html',  # Use markdown input with smart typography extension and raw HTML
-        '-t', 'html5',
-        '--standalone',     # Create full HTML doc
-        '--template', str(template_path),
-        '-V', f'base={base_url}',
-        '-V', f'wikititle={wiki_title}',
-        '-V', f'pageUrl={page_url}',
-        '-V', f'pagetitle={page_title}',
+    return {
+        'base': base_url,
+        'wikititle': wiki_title,
+        'pageUrl': page_url,
+        'pagetitle': page_title,
         # Add SEO metadata variables
-        '-V', f'description={seo_metadata.get("description", "")}',
-        '-V', f'keywords={seo_metadata.get("keywords", "")}',
-        '-V', f'image={seo_metadata.get("image", "")}',
-        '-o', str(output_html_path)
-    ]
-    
-    # Print pandoc command and input for debugging
-    debug_print(f"  [Debug Pandoc] Command: {' '.join(pandoc_cmd)}")
-    debug_print(f"  [Debug Pandoc] Input content length: {len(pandoc_input)} chars")
-    debug_print(f"  [Debug Pandoc] First 200 chars of input: {pandoc_input[:200]}")
+        'description': seo_metadata.get("description", ""),
+        'keywords': seo_metadata.get("keywords", ""),
+        'image': seo_metadata.get("image", ""),
+    }
+
+
+def clean_pandoc_html(content: str, output_html_path: Path, wiki_title: str, page_title: str,
+                      seo_metadata: Dict[str, str] = None) -> str:
+    """
+    Clean up pandoc's HTML output for a page.
     
-    # Run pandoc with input content
-    process = subprocess.run(pandoc_cmd, input=pandoc_input, text=True, capture_output=True)
+    Empty anchor tags are removed, and the content is wrapped with a complete HTML scaffold
+    if it lacks the proper DOCTYPE or <html> tag.
     
-    # Print pandoc output for debugging
-    debug_print(f"  [Debug Pandoc] Return Code: {process.returncode}")
-    if process.stdout:
-        debug_print(f"  [Debug Pandoc] STDOUT:\n{process.stdout}")
-    if process.stderr:
-        debug_print(f"  [Debug Pandoc] STDERR:\n{process.stderr}")
+    Args:
+        content: HTML generated by pandoc.
+        output_html_path: File path the generated HTML is destined for (used in messages).
+        wiki_title: Title of the documentation or wiki.
+        page_title: Title of the current page.
+        seo_metadata: Optional dictionary with SEO metadata (e.g., description, keywords).
     
-    if process.returncode != 0:
-        print(f"Error running pandoc: {process.stderr}")
-        return ""
+    Returns:
+        The cleaned HTML.
+    """
+    if seo_metadata is None:
+        seo_metadata = {}
     
-    # Read the generated HTML and clean up any empty anchor tags
-    try:
-        with open(output_html_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Remove empty anchor tags
-        content = re.sub(r'<a[^>]*>\s*</a>', '', content)
-            
-        # Check if the file has proper HTML structure
-        if '<!DOCTYPE' not in content or '<html' not in content:
-            print(f"Warning: Generated HTML for {output_html_path} is missing DOCTYPE or html tag")
-            # Try to fix by adding proper HTML structure
-            fixed_content = f"""<!DOCTYPE html>
+    # Remove empty anchor tags
+    content = re.sub(r'<a[^>]*>\s*</a>', '', content)
+        
+    # Check if the output has proper HTML structure
+    if '<!DOCTYPE' not in content or '<html' not in content:
+        print(f"Warning: Generated HTML for {output_html_path} is missing DOCTYPE or html tag")
+        # Try to fix by adding proper HTML structure
+        content = f"""<!DOCTYPE html>
 <html xmlns="http://www.w3.org/1999/xhtml">
 <head>
     <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
@@ -499,192 +1319,357 @@ def run_pandoc(pandoc_input: str, output_html_path: Path, template_path: Path,
 {content}
 </body>
 </html>"""
-            content = fixed_content
-            
-        # Write back the cleaned content
-        with open(output_html_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-            
-    except Exception as e:
-        print(f"Error verifying HTML structure: {e}")
     
-    return process.stdout
+    return content
 
 
-def post_process_python_shell_html(html_content: str) -> str:
-    """
-    Enhance HTML for improved code block display and documentation link accuracy.
-    
-    Processes raw HTML generated from Python or shell files by wrapping <pre><code> and Pandoc's
-    source code blocks in a container div for copy button functionality. Additionally, appends ".html"
-    to local links pointing to documentation files to ensure correct navigation.
+def run_pandoc(pandoc_input: str, output_html_path: Path, template_path: Path, 
+               base_url: str, wiki_title: str, page_url: str, page_title: str,
+               seo_metadata: Dict[str, str] = None,
+               converter: Optional[PandocConverter] = None) -> str:
+    """Converts Markdown content to a standalone HTML document using Pandoc.
     
+    This function runs Pandoc to transform the provided Markdown input into HTML using a specified
+    template and SEO metadata. It assigns HTML variables for the base URL, wiki title, page URL, and
+    page title, and captures Pandoc's output instead of writing it to disk, so that the caller can
+    finish post-processing in memory and write the page exactly once. The output is then cleaned
+    with clean_pandoc_html(). Pages converted together should go through
+    PandocConverter.convert() directly, so that pandoc startup is shared between them.
+      
     Args:
-        html_content: Raw HTML content to be processed.
+        pandoc_input: The Markdown content to convert.
+        output_html_path: File path the generated HTML is destined for (used in messages).
+        template_path: Path to the HTML template file used by Pandoc.
+        base_url: Base URL for constructing absolute links.
+        wiki_title: Title of the documentation or wiki.
+        page_url: URL of the current page.
+        page_title: Title of the current page.
+        seo_metadata: Optional dictionary with SEO metadata (e.g., description, keywords, image).
+        converter: Optional converter to reuse; by default a single pandoc process is run.
     
     Returns:
-        Processed HTML content with enhanced code blocks and updated links.
+        The generated HTML if conversion succeeds; otherwise, an empty string.
     """
-    # Fix any <pre><code> blocks by wrapping them in a container div
-    def wrap_pre_code_with_container(match):
-        """
-        Wraps a matched code block in a container div.
-        
-        Extracts the full text from a regex match object and encloses it in a <div> element
-        with the "code-block-container" class, enabling additional HTML styling.
-        
-        Args:
-            match: A regex match object containing the code block text.
-        
-        Returns:
-            A string with the matched content wrapped in a container div.
-        """
-        pre_content = match.group(0)
-        return f'<div class="code-block-container">{pre_content}</div>'
-    
-    # Wrap <pre><code> blocks with a container div
-    processed_html = re.sub(
-        r'<pre[^>]*><code[^>]*>.*?</code></pre>', 
-        wrap_pre_code_with_container, 
-        html_content, 
-        flags=re.DOTALL | re.IGNORECASE
-    )
+    if converter is None:
+        converter = PandocConverter(template_path, use_server=False)
     
-    # Also handle code blocks created by pandoc (with sourceCode class)
-    def wrap_source_code_with_container(match):
-        """
-        Wraps matched source code in an HTML container.
-        
-        Extracts the content from the first capturing group of the regex match object
-        and returns it enclosed within a <div> tag having the "code-block-container" class.
-        
-        Args:
-            match: A regex match object with the source code in its first capturing group.
-        
-        Returns:
-            A string with the source code wrapped in a <div class="code-block-container"> tag.
-        """
-        div_contents = match.group(1)
-        return f'<div class="code-block-container">{div_contents}</div>'
-    
-    processed_html = re.sub(
-        r'<div class="sourceCode" id="cb\d+"[^>]*>(.*?)</div>', 
-        wrap_source_code_with_container, 
-        processed_html, 
-        flags=re.DOTALL | re.IGNORECASE
-    )
+    # Print pandoc input for debugging
+    debug_print(f"  [Debug Pandoc] Input content length: {len(pandoc_input)} chars")
+    debug_print(f"  [Debug Pandoc] First 200 chars of input: {pandoc_input[:200]}")
     
-    # Fix links to documentation files by appending .html
-    def fix_doc_links(match):
-        """
-        Fixes links to documentation files by appending .html to the href.
-        
-        This function identifies links that point to other documentation files
-        and appends .html to the href attribute if it doesn't already have it.
-        
-        Args:
-            match: A regex match object containing the link tag.
-        
-        Returns:
-            A string with the fixed link.
-        """
-        link_tag = match.group(0)
-        href_match = re.search(r'href="([^"]+)"', link_tag)
-        
-        if href_match:
-            href = href_match.group(1)
-            # Skip external links, anchors, and links that already have .html
-            if (href.startswith('http') or href.startswith('https') or 
-                href.startswith('#') or href.endswith('.html')):
-                return link_tag
-                
-            # Check if the link points to a file in the repository
-            if re.search(r'\.(c|h|py|sh|md)$', href):
-                # Replace the href with the one that includes .html
-                return re.sub(r'href="([^"]+)"', f'href="{href}.html"', link_tag)
-        
-        return link_tag
-    
-    # Apply the link fix
-    processed_html = re.sub(
-        r'<a[^>]+href="[^"]+">[^<]+</a>',
-        fix_doc_links,
-        processed_html
-    )
+    html_content, = converter.convert([{
+        'text': pandoc_input,
+        'from': PAGE_INPUT_FORMAT,
+        'variables': page_template_variables(base_url, wiki_title, page_url, page_title, seo_metadata),
+    }])
+    if html_content is None:
+        return ""
     
-    return processed_html
+    return clean_pandoc_html(html_content, output_html_path, wiki_title, page_title, seo_metadata)
 
 
-def run_awk_post_processing(html_content: str, file_path: Path, 
-                            repo_root: Path, darcsit_dir: Path) -> str:
+def fix_doc_link(link_tag: str) -> str:
     """
-    Apply awk post-processing to HTML content from C files.
+    Fixes a link to a documentation file by appending .html to the href.
     
-    This function runs the 'decl_anchors.awk' script from the darcsit directory on the
-    given HTML content. It determines a tags file path relative to the repository root
-    based on the source file, executes the awk script using a temporary file for output,
-    and returns the processed HTML. The temporary file is removed after processing.
+    Links that point to other documentation files (.c, .h, .py, .sh, .md) get .html
+    appended to their href attribute. External links, anchors, and links that already
+    end in .html are returned unchanged.
     
     Args:
-        html_content: HTML content to process.
-        file_path: Path of the original C source file.
-        repo_root: Root directory of the repository for relative path computation.
-        darcsit_dir: Directory containing the 'decl_anchors.awk' script.
+        link_tag: The complete <a ...>...</a> element.
     
     Returns:
-        Processed HTML content.
-    
-    Raises:
-        FileNotFoundError: If the 'decl_anchors.awk' script is not found.
-        RuntimeError: If the awk processing fails.
+        A string with the fixed link.
     """
-    decl_anchors_script = darcsit_dir / 'decl_anchors.awk'
-    if not decl_anchors_script.is_file():
-        raise FileNotFoundError(f"decl_anchors.awk script not found at {decl_anchors_script}")
-    
-    # Construct the expected tags file path relative to the repo root for awk
-    relative_tags_path = file_path.relative_to(repo_root).with_suffix(file_path.suffix + '.tags')
-    
-    # Create a temporary file to store the output
-    temp_output_path = Path(f"{file_path}.temp.html")
+    href_match = HREF_PATTERN.search(link_tag)
+    
+    if href_match:
+        href = href_match.group(1)
+        # Skip external links, anchors, and links that already have .html
+        if (href.startswith('http') or href.startswith('https') or 
+            href.startswith('#') or href.endswith('.html')):
+            return link_tag
+            
+        # Check if the link points to a file in the repository
+        if DOC_FILE_SUFFIX_PATTERN.search(href):
+            # Replace the href with the one that includes .html
+            return HREF_PATTERN.sub(lambda _: f'href="{href}.html"', link_tag)
     
-    try:
-        with open(temp_output_path, 'w', encoding='utf-8') as f_out:
-            postproc_cmd = ['awk', '-v', f'tags={relative_tags_path}', '-f', str(decl_anchors_script)]
-            postproc_proc = subprocess.Popen(
-                postproc_cmd, 
-                stdin=subprocess.PIPE, 
-                stdout=f_out, 
-                stderr=subprocess.PIPE, 
-                text=True, 
-                encoding='utf-8'
-            )
-            _, stderr = postproc_proc.communicate(input=html_content)
-
-            if postproc_proc.returncode != 0:
-                raise RuntimeError(f"Awk post-processing failed: {stderr}")
-        
-        # Read the processed content from the temporary file
-        with open(temp_output_path, 'r', encoding='utf-8') as f:
-            processed_content = f.read()
-        
-        return processed_content
-    finally:
-        # Remove the temporary file
-        if temp_output_path.exists():
-            temp_output_path.unlink()
+    return link_tag
 
 
-def post_process_c_html(html_content: str, file_path: Path, 
-                       repo_root: Path, darcsit_dir: Path, docs_dir: Path) -> str:
+def create_include_link(match: 're.Match[str]', file_path: Path, repo_root: Path, docs_dir: Path,
+                        dependencies: Optional[Set[Path]] = None) -> str:
     """
-    Enhance C/C++ HTML content with code block containers and include-link corrections.
+    Transforms an include directive match into an HTML hyperlink.
+    
+    Converts a match of the "include" token of C_HTML_TOKEN_PATTERN into an HTML anchor element.
+    The function extracts the filename and checks if a corresponding file exists in the local
+    'src-local' directory. If it does, a relative link to the generated local documentation is created;
+    otherwise, a link to the Basilisk source repository is returned. The original span formatting is preserved.
+    
+    Parameters:
+        match: A regex match object with the named groups:
+               include_prefix: The prefix span for the include statement.
+               include_open: The opening tag for the filename.
+               include_file: The filename (which may include a path).
+               include_close: The closing tag for the filename.
+        file_path: Path to the source file containing the include directive.
+        repo_root: Root directory of the repository.
+        docs_dir: Output directory for the generated HTML documentation.
+        dependencies: Set to which the checked 'src-local' file is added, whether it exists or not.
+    
+    Returns:
+        A string containing the HTML hyperlink wrapping the original include directive span.
+    """
+    prefix = match.group('include_prefix')  # e.g., <span class="pp">#include </span>
+    span_tag_open = match.group('include_open')  # e.g., <span class="im">
+    filename = match.group('include_file')  # e.g., filename.h or path/filename.h
+    span_tag_close = match.group('include_close')  # </span>
+    
+    # Reconstruct original full span tag assuming literal quotes
+    original_span_tag = f'{span_tag_open}\"{filename}\"{span_tag_close}'
+    
+    # Split filename by '/' and take the last part for checking in src-local root
+    check_filename = filename.split('/')[-1]
+    local_file_path = repo_root / 'src-local' / check_filename
+    if dependencies is not None:
+        dependencies.add(local_file_path)
+    
+    if local_file_path.is_file():
+        # Link to local generated HTML file
+        # Use the new file naming pattern: file.c -> file.c.html, file.h -> file.h.html
+        target_html_path = (docs_dir / 'src-local' / check_filename).with_suffix(local_file_path.suffix + '.html')
+        # Calculate relative path from the *current* HTML file's directory
+        try:
+            relative_link = os.path.relpath(target_html_path, start=file_path.parent)
+            link_url = relative_link.replace('\\', '/')  # Ensure forward slashes
+            # remove /docs/ with / in link
+            link_url = link_url.replace('/docs/', '/')
+        except ValueError:
+            # Handle cases where paths are on different drives (should not happen here)
+            link_url = target_html_path.as_uri()  # Fallback to absolute URI
+        link_title = f"Link to local documentation for {filename}"
+    else:
+        # Link to basilisk.fr, preserving original path if present
+        link_url = f"http://basilisk.fr/src/{filename}"
+        link_title = f"Link to Basilisk source for {filename}"
+    
+    # Return the prefix span, followed by the link wrapping the filename span
+    return f'{prefix}<a href="{link_url}" title="{link_title}">{original_span_tag}</a>'
+
+
+def post_process_html(html_content: str, token_pattern: 're.Pattern[str]',
+                      include_link: Optional[Callable[['re.Match[str]'], str]] = None,
+                      doc_link: Callable[[str], str] = fix_doc_link) -> str:
+    """
+    Apply the code block, line number and link rewrites to HTML in a single pass.
+    
+    The HTML is scanned once with a precompiled token pattern (DOC_HTML_TOKEN_PATTERN or
+    C_HTML_TOKEN_PATTERN) and each token is rewritten as it is found:
+    
+    - <pre><code> blocks are wrapped in a "code-block-container" div (only when their
+      closing </code></pre> exists, as the block is wrapped as a whole);
+    - pandoc's sourceCode divs become "code-block-container" divs (when closed);
+    - links to .c/.h/.py/.sh/.md files are passed to `doc_link`, by default fix_doc_link();
+    - trailing line numbers added by literate-c are removed;
+    - #include directives are passed to `include_link`.
+    
+    Args:
+        html_content: Raw HTML content to be processed.
+        token_pattern: Precompiled pattern selecting the rewrites to apply.
+        include_link: Callback building the link for an "include" token match.
+        doc_link: Callback rewriting a "doc_link" token.
+    
+    Returns:
+        The processed HTML content.
+    """
+    pieces = []
+    position = 0
+    wrapped_block_end = -1  # Start of the </code></pre> closing the block being wrapped
+    
+    for match in token_pattern.finditer(html_content):
+        pieces.append(html_content[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+        kind = match.lastgroup
+        
+        if kind == 'pre_open':
+            # Wrap the block if it is complete and not itself inside a wrapped block
+            if match.start() > wrapped_block_end:
+                block_end = PRE_CODE_CLOSE_PATTERN.search(html_content, match.end())
+                if block_end:
+                    wrapped_block_end = block_end.start()
+                    token = '<div class="code-block-container">' + token
+        elif kind == 'pre_close':
+            if match.start() == wrapped_block_end:
+                token += '</div>'
+        elif kind == 'source_div':
+            if html_content.find('</div>', match.end()) != -1:
+                token = '<div class="code-block-container">'
+        elif kind == 'doc_link':
+            token = doc_link(token)
+        elif kind == 'line_numbers':
+            token = '</span>'
+        elif kind == 'include' and include_link is not None:
+            token = include_link(match)
+        
+        pieces.append(token)
+    
+    pieces.append(html_content[position:])
+    return ''.join(pieces)
+
+
+def post_process_python_shell_html(html_content: str) -> str:
+    """
+    Enhance HTML for improved code block display and documentation link accuracy.
+    
+    Processes raw HTML generated from Python or shell files by wrapping <pre><code> and Pandoc's
+    source code blocks in a container div for copy button functionality. Additionally, appends ".html"
+    to local links pointing to documentation files to ensure correct navigation. All rewrites are
+    done in one pass by post_process_html().
+    
+    Args:
+        html_content: Raw HTML content to be processed.
+    
+    Returns:
+        Processed HTML content with enhanced code blocks and updated links.
+    """
+    return post_process_html(html_content, DOC_HTML_TOKEN_PATTERN)
+
+
+def load_decl_anchors(tags_path: Path) -> Dict[str, str]:
+    """
+    Read the declaration anchors listed in a `.tags` file.
+    
+    Mirrors the BEGIN block of darcsit's 'decl_anchors.awk': every whitespace-separated
+    record whose first field is "decl" maps its fourth field (the line number) to its
+    second field (the declaration name). A missing or unreadable tags file yields no
+    anchors, exactly as awk's getline does.
+    
+    Args:
+        tags_path: Path to the `.tags` file generated for the C source file.
+    
+    Returns:
+        A dictionary mapping line numbers (as strings) to declaration anchor ids.
+    """
+    decl = {}
+    try:
+        with open(tags_path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+            for line in f:
+                fields = AWK_FIELD_SEPARATOR.split(line.strip(' \t\n'))
+                if fields[0] == 'decl':
+                    fields += [''] * (4 - len(fields))
+                    decl[fields[3]] = fields[1]
+    except OSError:
+        pass
+    return decl
+
+
+def add_decl_anchors(html_content: str, decl: Dict[str, str]) -> str:
+    """
+    Add line-number and declaration anchors to HTML generated from a C file.
+    
+    This is an in-process port of darcsit's 'decl_anchors.awk' and produces identical
+    output: the line ending in "<pre>1" starts the numbered listing, every line made only
+    of spaces and digits becomes a self-referencing line anchor, and a <span id=...>
+    anchor follows each line number that carries a declaration.
+    
+    Args:
+        html_content: HTML content to process.
+        decl: Declaration anchors, as returned by load_decl_anchors().
+    
+    Returns:
+        Processed HTML content.
+    """
+    lines = html_content.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    
+    processed_lines = []
+    for line in lines:
+        if line.endswith('<pre>1'):
+            line = line[:-len('<pre>1')] + '<pre><a id="1" href="#1">1</a>'
+            number = '1'
+        elif AWK_LINE_NUMBER_PATTERN.fullmatch(line):
+            number = line.strip(' ')
+            line = f'<a id="{number}" href="#{number}">{number}</a>'
+        else:
+            processed_lines.append(line)
+            continue
+        
+        if decl.get(number):
+            line += f'<span id="{decl[number]}"/>'
+        processed_lines.append(line)
+    
+    return ''.join(line + '\n' for line in processed_lines)
+
+
+def run_awk_post_processing(html_content: str, file_path: Path, 
+                            repo_root: Path, darcsit_dir: Path, use_awk_script: bool = False) -> str:
+    """
+    Apply the line and declaration anchor post-processing to HTML content from C files.
+    
+    By default this uses add_decl_anchors(), the in-process equivalent of darcsit's
+    'decl_anchors.awk', with the tags file located relative to the repository root
+    based on the source file. With `use_awk_script` (--awk-anchors), the original awk
+    script is run instead, with the HTML piped through it in memory.
+    
+    Args:
+        html_content: HTML content to process.
+        file_path: Path of the original C source file.
+        repo_root: Root directory of the repository for relative path computation.
+        darcsit_dir: Directory containing the 'decl_anchors.awk' script.
+        use_awk_script: Whether to run 'decl_anchors.awk' instead of add_decl_anchors().
+    
+    Returns:
+        Processed HTML content.
+    
+    Raises:
+        FileNotFoundError: If the 'decl_anchors.awk' script is not found.
+        RuntimeError: If the awk processing fails.
+    """
+    # Construct the expected tags file path relative to the repo root
+    relative_tags_path = file_path.relative_to(repo_root).with_suffix(file_path.suffix + '.tags')
+    
+    if not use_awk_script:
+        return add_decl_anchors(html_content, load_decl_anchors(repo_root / relative_tags_path))
+    
+    decl_anchors_script = darcsit_dir / 'decl_anchors.awk'
+    if not decl_anchors_script.is_file():
+        raise FileNotFoundError(f"decl_anchors.awk script not found at {decl_anchors_script}")
+    
+    postproc_cmd = ['awk', '-v', f'tags={relative_tags_path}', '-f', str(decl_anchors_script)]
+    started = time.perf_counter()
+    postproc_proc = subprocess.run(
+        postproc_cmd, 
+        input=html_content, 
+        capture_output=True, 
+        text=True, 
+        encoding='utf-8',
+        cwd=repo_root
+    )
+    record_subprocess('awk', started, html_content, postproc_proc.stdout)
+    
+    if postproc_proc.returncode != 0:
+        raise RuntimeError(f"Awk post-processing failed: {postproc_proc.stderr}")
+    
+    return postproc_proc.stdout
+
+
+def post_process_c_html(html_content: str, file_path: Path, 
+                       repo_root: Path, darcsit_dir: Path, docs_dir: Path,
+                       dependencies: Optional[Set[Path]] = None) -> str:
+    """
+    Enhance C/C++ HTML content with code block containers and include-link corrections.
     
     This function post-processes HTML generated from C/C++ source files to improve its
     presentation in documentation. It removes extraneous trailing line numbers from the
     literate-c output, wraps <pre><code> blocks and sourceCode divs in container divs for
     consistent styling, and converts #include statements into hyperlinks that reference either
-    locally generated documentation or external sources.
+    locally generated documentation or external sources. All rewrites are done in one pass by
+    post_process_html().
     
     Args:
         html_content: The original HTML output from processing a C/C++ file.
@@ -692,146 +1677,79 @@ def post_process_c_html(html_content: str, file_path: Path,
         repo_root: Root directory of the repository.
         darcsit_dir: Directory containing darcsit scripts.
         docs_dir: Output directory for the generated HTML documentation.
+        dependencies: Set to which the local files checked for the #include links are added.
     
     Returns:
         The modified HTML content with enhanced styling and linked #include statements.
     """
-    # Remove trailing line numbers added by literate-c
-    cleaned_html = re.sub(
-        r'(\s*(?:<span class="[^"]*">\s*\d+\s*</span>|\s+\d+)\s*)+(\s*</span>)', 
-        r'\2', 
-        html_content
-    )
-    
-    # Wrap <pre><code> blocks with a container div
-    def wrap_pre_code_with_container(match):
-        """
-        Wrap the matched content in a container div.
-        
-        This function retrieves the entire match from a regex match object and wraps it
-        inside a <div> element with the CSS class "code-block-container". It is used to
-        enclose code block elements within an HTML container for consistent styling.
-        
-        Args:
-            match (Match): A regex match object containing the code block to be wrapped.
-        
-        Returns:
-            str: An HTML string with the wrapped code block.
-        """
-        pre_content = match.group(0)
-        return f'<div class="code-block-container">{pre_content}</div>'
-    
-    cleaned_html = re.sub(
-        r'<pre[^>]*><code[^>]*>.*?</code></pre>', 
-        wrap_pre_code_with_container, 
-        cleaned_html, 
-        flags=re.DOTALL | re.IGNORECASE
+    return post_process_html(
+        html_content,
+        C_HTML_TOKEN_PATTERN,
+        lambda match: create_include_link(match, file_path, repo_root, docs_dir, dependencies)
     )
+
+
+def add_css_link_to_html(content: str, css_path: Path, is_root: bool = True, deferred: bool = False) -> str:
+    """
+    Insert a CSS link tag into the <head> section of an HTML document.
     
-    # Process the sourceCode divs
-    def wrap_source_code_with_container(match):
-        # Get the div's contents (which includes the pre/code)
-        """
-        Wraps a matched code block in a container div.
-        
-        Extracts the content captured by the first group of the provided regex match and
-        returns it enclosed in a <div> element with the "code-block-container" class.
-        
-        Args:
-            match (re.Match): A regex match object with the source code block in its first group.
-        
-        Returns:
-            str: An HTML string with the code block wrapped in a container div.
-        """
-        div_contents = match.group(1)
-        # Return the pre/code wrapped in our container div
-        return f'<div class="code-block-container">{div_contents}</div>'
-    
-    # Replace the standard sourceCode div with our container div
-    cleaned_html = re.sub(
-        r'<div class="sourceCode" id="cb\d+"[^>]*>(.*?)</div>', 
-        wrap_source_code_with_container, 
-        cleaned_html, 
-        flags=re.DOTALL | re.IGNORECASE
-    )
+    Checks whether a <link> tag for the given CSS file already exists. If not, it inserts
+    the tag just before the closing </head> tag. When the HTML file is in a subdirectory
+    (is_root is False), the CSS file name is prefixed with "../" to ensure the link is correct.
     
-    # Add links to #include statements
-    def create_include_link(match):
-        """
-        Transforms an include directive match into an HTML hyperlink.
-        
-        Converts a regex match object capturing parts of an include directive into an HTML anchor element.
-        The function extracts the filename and checks if a corresponding file exists in the local
-        'src-local' directory. If it does, a relative link to the generated local documentation is created;
-        otherwise, a link to the Basilisk source repository is returned. The original span formatting is preserved.
-        
-        Parameters:
-            match: A regex match object with four capture groups:
-                   1. The prefix span for the include statement.
-                   2. The opening tag for the filename.
-                   3. The filename (which may include a path).
-                   4. The closing tag for the filename.
-        
-        Returns:
-            A string containing the HTML hyperlink wrapping the original include directive span.
-        
-        Note:
-            This function relies on the global variables `repo_root`, `docs_dir`, and `file_path` for
-            file path resolution.
-        """
-        prefix = match.group(1)  # e.g., <span class="pp">#include </span>
-        span_tag_open = match.group(2)  # e.g., <span class="im">
-        filename = match.group(3)  # e.g., filename.h or path/filename.h
-        span_tag_close = match.group(4)  # </span>
-        
-        # Reconstruct original full span tag assuming literal quotes
-        original_span_tag = f'{span_tag_open}\"{filename}\"{span_tag_close}'
-        
-        # Split filename by '/' and take the last part for checking in src-local root
-        check_filename = filename.split('/')[-1]
-        local_file_path = repo_root / 'src-local' / check_filename
-        
-        if local_file_path.is_file():
-            # Link to local generated HTML file
-            # Use the new file naming pattern: file.c -> file.c.html, file.h -> file.h.html
-            target_html_path = (docs_dir / 'src-local' / check_filename).with_suffix(local_file_path.suffix + '.html')
-            # Calculate relative path from the *current* HTML file's directory
-            try:
-                relative_link = os.path.relpath(target_html_path, start=file_path.parent)
-                link_url = relative_link.replace('\\', '/')  # Ensure forward slashes
-                # remove /docs/ with / in link
-                link_url = link_url.replace('/docs/', '/')
-                # debug_print(f"  [Debug Include] Relative link: {link_url}")
-                # debug_print(f"  [Debug Include] Link URL: {file_path.parent}")
-                # exit(0)
-            except ValueError:
-                # Handle cases where paths are on different drives (should not happen here)
-                link_url = target_html_path.as_uri()  # Fallback to absolute URI
-            link_title = f"Link to local documentation for {filename}"
-        else:
-            # Link to basilisk.fr, preserving original path if present
-            link_url = f"http://basilisk.fr/src/{filename}"
-            link_title = f"Link to Basilisk source for {filename}"
-        
-        # Return the prefix span, followed by the link wrapping the filename span
-        return f'{prefix}<a href="{link_url}" title="{link_title}">{original_span_tag}</a>'
+    Parameters:
+        content: The HTML document.
+        css_path: The path to the CSS file to be linked.
+        is_root: True if the HTML file is in the root directory; otherwise, False.
+        deferred: Whether the stylesheet is loaded without blocking rendering, for pages
+            with inlined critical CSS.
     
-    # Corrected regex: Find pp span followed by im span, allowing flexible space
-    # and handle potential HTML entity quotes (&quot;)
-    include_pattern = r'(<span class="pp">#include\s*</span>)(<span class=\"im\">)(?:\"|&quot;)(.*?)(?:\"|&quot;)(</span>)'
-    cleaned_html = re.sub(include_pattern, create_include_link, cleaned_html, flags=re.DOTALL)
+    Returns:
+        The HTML document with the CSS link present.
+    """
+    # Define the CSS path - relative to the HTML file
+    media = ' media="print" onload="this.media=\'all\'"' if deferred else ''
+    if is_root:
+        css_link = f'<link href="{Path(css_path).name}" rel="stylesheet" type="text/css"{media} />'
+    else:
+        css_link = f'<link href="../{Path(css_path).name}" rel="stylesheet" type="text/css"{media} />'
+    
+    # Check if the CSS link is already included
+    if 'link href="' + Path(css_path).name + '"' in content or 'link href="../' + Path(css_path).name + '"' in content:
+        # CSS link is already included, no need to add it
+        return content
+    
+    # Find the head section to insert the CSS link
+    head_end_idx = content.find('</head>')
+    if head_end_idx == -1:
+        # If no </head> tag found, check if there's a <head> tag
+        head_start_idx = content.find('<head>')
+        if head_start_idx != -1:
+            # Insert after the <head> tag
+            return content[:head_start_idx + 6] + '\n    ' + css_link + content[head_start_idx + 6:]
+        # No head tag, create a complete HTML structure
+        debug_print("Warning: No head tag found, creating complete HTML structure")
+        return f"""<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head>
+    <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
+    {css_link}
+</head>
+<body>
+{content}
+</body>
+</html>"""
     
-    return cleaned_html
+    # Insert the CSS link tag just before the closing head tag
+    return content[:head_end_idx] + '    ' + css_link + '\n    ' + content[head_end_idx:]
 
 
 def insert_css_link_in_html(html_file_path: Path, css_path: Path, is_root: bool = True) -> bool:
     """
     Insert a CSS link tag into an HTML file's <head> section.
     
-    Reads the specified HTML file and checks whether a <link> tag for the given CSS
-    file already exists. If not, it inserts the tag just before the closing </head> tag.
-    When the HTML file is in a subdirectory (is_root is False), the CSS file name is 
-    prefixed with "../" to ensure the link is correct.
+    File-based wrapper around add_css_link_to_html() for HTML that is already on disk.
+    The page generators apply add_css_link_to_html() in memory instead.
     
     Parameters:
         html_file_path: The path to the target HTML file.
@@ -845,45 +1763,12 @@ def insert_css_link_in_html(html_file_path: Path, css_path: Path, is_root: bool
         with open(html_file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        # Define the CSS path - relative to the HTML file
-        if is_root:
-            css_link = f'<link href="{Path(css_path).name}" rel="stylesheet" type="text/css" />'
-        else:
-            css_link = f'<link href="../{Path(css_path).name}" rel="stylesheet" type="text/css" />'
-        
-        # Check if the CSS link is already included
-        if 'link href="' + Path(css_path).name + '"' in content or 'link href="../' + Path(css_path).name + '"' in content:
-            # CSS link is already included, no need to add it
-            return True
-        
-        # Find the head section to insert the CSS link
-        head_end_idx = content.find('</head>')
-        if head_end_idx == -1:
-            # If no </head> tag found, check if there's a <head> tag
-            head_start_idx = content.find('<head>')
-            if head_start_idx != -1:
-                # Insert after the <head> tag
-                modified_content = content[:head_start_idx + 6] + '\n    ' + css_link + content[head_start_idx + 6:]
-            else:
-                # No head tag, create a complete HTML structure
-                debug_print(f"Warning: No head tag found in {html_file_path}, creating complete HTML structure")
-                modified_content = f"""<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-    <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
-    {css_link}
-</head>
-<body>
-{content}
-</body>
-</html>"""
-        else:
-            # Insert the CSS link tag just before the closing head tag
-            modified_content = content[:head_end_idx] + '    ' + css_link + '\n    ' + content[head_end_idx:]
+        modified_content = add_css_link_to_html(content, css_path, is_root)
         
         # Write back the modified content
-        with open(html_file_path, 'w', encoding='utf-8') as f:
-            f.write(modified_content)
+        if modified_content != content:
+            with open(html_file_path, 'w', encoding='utf-8') as f:
+                f.write(modified_content)
         
         return True
     except Exception as e:
@@ -891,29 +1776,24 @@ def insert_css_link_in_html(html_file_path: Path, css_path: Path, is_root: bool
         return False
 
 
-def insert_javascript_in_html(html_file_path: Path) -> bool:
+def add_javascript_to_html(content: str) -> str:
     """
-    Inserts inline JavaScript for copy-to-clipboard on code blocks.
+    Inserts inline JavaScript for copy-to-clipboard on code blocks into an HTML document.
     
-    Reads the specified HTML file and checks for an existing copy button script by searching
-    for elements with the "copy-button" class. If absent, the function inserts an inline JavaScript
-    snippet that adds copy buttons to code block containers. The snippet is placed just before the
-    closing </body> tag; if no </body> tag is found, it is appended to the content (or wrapped in a
-    basic HTML structure if no <body> tag exists). Returns True if the snippet is inserted or
-    already present, and False if updating the file fails.
+    Checks for an existing copy button script by searching for elements with the "copy-button"
+    class. If absent, the function inserts an inline JavaScript snippet that adds copy buttons to
+    code block containers. The snippet is placed just before the closing </body> tag; if no
+    </body> tag is found, it is appended to the content (or wrapped in a basic HTML structure if
+    no <body> tag exists).
       
     Args:
-        html_file_path: The path to the HTML file to update.
+        content: The HTML document.
     
     Returns:
-        True if the JavaScript snippet is present or successfully inserted; False otherwise.
+        The HTML document with the JavaScript snippet present.
     """
-    try:
-        with open(html_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # JavaScript for copy functionality
-        copy_js = '''
+    # JavaScript for copy functionality
+    copy_js = '''
     <script type="text/javascript">
     document.addEventListener('DOMContentLoaded', function() {
         // Add copy button to each code block container
@@ -965,24 +1845,23 @@ def insert_javascript_in_html(html_file_path: Path) -> bool:
     });
     </script>
         '''
-        
-        # Check if the JavaScript is already included
-        if 'class="copy-button"' in content:
-            # JavaScript is already included, no need to add it
-            return True
-        
-        # Find the body end to insert the JavaScript
-        body_end_idx = content.find('</body>')
-        if body_end_idx == -1:
-            # If no </body> tag found, check if there's a <body> tag
-            body_start_idx = content.find('<body>')
-            if body_start_idx != -1:
-                # Insert at the end of the content
-                modified_content = content + copy_js
-            else:
-                # No body tag, create a complete HTML structure
-                debug_print(f"Warning: No body tag found in {html_file_path}, creating complete HTML structure")
-                modified_content = f"""<!DOCTYPE html>
+
+    # Check if the JavaScript is already included
+    if 'class="copy-button"' in content:
+        # JavaScript is already included, no need to add it
+        return content
+    
+    # Find the body end to insert the JavaScript
+    body_end_idx = content.find('</body>')
+    if body_end_idx == -1:
+        # If no </body> tag found, check if there's a <body> tag
+        body_start_idx = content.find('<body>')
+        if body_start_idx != -1:
+            # Insert at the end of the content
+            return content + copy_js
+        # No body tag, create a complete HTML structure
+        debug_print("Warning: No body tag found, creating complete HTML structure")
+        return f"""<!DOCTYPE html>
 <html xmlns="http://www.w3.org/1999/xhtml">
 <head>
     <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
@@ -992,13 +1871,34 @@ def insert_javascript_in_html(html_file_path: Path) -> bool:
 {copy_js}
 </body>
 </html>"""
-        else:
-            # Insert the JavaScript code just before the closing body tag
-            modified_content = content[:body_end_idx] + copy_js + content[body_end_idx:]
+    
+    # Insert the JavaScript code just before the closing body tag
+    return content[:body_end_idx] + copy_js + content[body_end_idx:]
+
+
+def insert_javascript_in_html(html_file_path: Path) -> bool:
+    """
+    Inserts inline JavaScript for copy-to-clipboard on code blocks into an HTML file.
+    
+    File-based wrapper around add_javascript_to_html() for HTML that is already on disk.
+    The page generators apply add_javascript_to_html() in memory instead.
+      
+    Args:
+        html_file_path: The path to the HTML file to update.
+    
+    Returns:
+        True if the JavaScript snippet is present or successfully inserted; False otherwise.
+    """
+    try:
+        with open(html_file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        modified_content = add_javascript_to_html(content)
         
         # Write back the modified content
-        with open(html_file_path, 'w', encoding='utf-8') as f:
-            f.write(modified_content)
+        if modified_content != content:
+            with open(html_file_path, 'w', encoding='utf-8') as f:
+                f.write(modified_content)
         
         return True
     except Exception as e:
@@ -1006,22 +1906,136 @@ def insert_javascript_in_html(html_file_path: Path) -> bool:
         return False
 
 
-def process_file_with_page2html_logic(file_path: Path, output_html_path: Path, repo_root: Path, 
-                                     basilisk_dir: Path, darcsit_dir: Path, template_path: Path, 
-                                     base_url: str, wiki_title: str, literate_c_script: Path, docs_dir: Path) -> bool:
+def html_to_search_text(html_fragment: str) -> str:
     """
-    Converts a source file to HTML and applies file-type-specific post processing.
+    Convert an HTML fragment to plain text for the search database.
+    
+    Tags are removed, HTML entities are decoded and runs of whitespace are collapsed
+    to a single space.
+    """
+    text = unescape(HTML_TAG_PATTERN.sub(' ', html_fragment))
+    return ' '.join(text.split())
+
+
+def extract_search_records(html_content: str, page_url: str, page_title: str,
+                           category: str, tags: List[str]) -> List[Dict[str, Any]]:
+    """
+    Extract the search database records of a rendered page.
     
-    The function prepares input for Pandoc conversion based on the file type and then
-    applies additional steps tailored to the source file. For Python, shell, and Markdown
-    files, it post-processes the output HTML to enhance code block presentation. For C/C++
-    files, it uses awk-based post processing followed by further cleanup. CSS and JavaScript
-    are then inserted to improve styling and interactive functionality. Any errors during
-    processing are caught, and the function returns a success flag.
+    Only the <main> element of the page is indexed, without scripts, styles, the
+    repeated page title and the line-number anchors of C listings. The content is
+    chunked per section: one record for the page itself (its text up to the first
+    h1-h3 heading, and the list of all headings), then one record per heading,
+    linking to the heading's anchor. The records use the fields expected by the
+    command palette's Fuse index (title, url, content, excerpt, tags, categories,
+    priority).
     
     Args:
-        file_path: Path to the source file.
-        output_html_path: Path where the generated HTML will be saved.
+        html_content: Final HTML of the page.
+        page_url: Site URL of the page.
+        page_title: Title shown for the page.
+        category: Category of the page (its top-level source directory).
+        tags: Extra search terms for the page, e.g. the C declarations it defines.
+    
+    Returns:
+        The search records of the page, page record first.
+    """
+    main_match = MAIN_CONTENT_PATTERN.search(html_content)
+    content = main_match.group(1) if main_match else html_content
+    content = SEARCH_SKIP_PATTERN.sub(' ', content)
+    
+    # Split the content at each section heading
+    chunks = []
+    position = 0
+    heading_title, heading_id = None, None
+    for heading in SECTION_HEADING_PATTERN.finditer(content):
+        chunks.append((heading_title, heading_id, content[position:heading.start()]))
+        heading_title = html_to_search_text(heading.group('text'))
+        id_match = HTML_ID_PATTERN.search(heading.group('attributes'))
+        heading_id = id_match.group(1) if id_match else None
+        position = heading.end()
+    chunks.append((heading_title, heading_id, content[position:]))
+    
+    headings = [title for title, _, _ in chunks[1:] if title]
+    records = []
+    for heading_title, heading_id, chunk in chunks:
+        text = html_to_search_text(chunk)
+        if heading_title is None:
+            records.append({
+                'title': page_title,
+                'url': page_url,
+                'headings': headings,
+                'content': text,
+                'excerpt': text[:SEARCH_EXCERPT_LENGTH],
+                'tags': tags,
+                'categories': [category],
+                'priority': 3,
+            })
+        elif heading_title or text:
+            records.append({
+                'title': f"{page_title} - {heading_title}" if heading_title else page_title,
+                'url': f"{page_url}#{heading_id}" if heading_id else page_url,
+                'content': text,
+                'excerpt': text[:SEARCH_EXCERPT_LENGTH],
+                'tags': [],
+                'categories': [category],
+                'priority': 4,
+            })
+    return records
+
+
+def link_dependency_states(dependencies: Set[Path], repo_root: Path) -> Dict[str, bool]:
+    """
+    Record whether each file a page's links depend on exists.
+    
+    Pages depend on the files that change their HTML: the `src-local` files checked
+    for #include links, which are linked locally only if they exist and to the
+    Basilisk sources otherwise. Documentation links get ".html" appended whether or
+    not their target exists, so they are not dependencies. These edges form the
+    dependency graph kept in the build cache; a page is regenerated when one of its
+    dependencies appears or disappears, even though its own source did not change.
+    
+    Args:
+        dependencies: Absolute paths of the files the page depends on.
+        repo_root: Root directory of the repository.
+    
+    Returns:
+        A dictionary mapping each dependency, relative to the repository root, to
+        whether it exists as a file.
+    """
+    return {
+        Path(os.path.relpath(path, repo_root)).as_posix(): path.is_file()
+        for path in sorted(dependencies)
+    }
+
+
+def process_files_with_page2html_logic(pages: List[Tuple[Path, Path]], repo_root: Path, 
+                                       basilisk_dir: Path, darcsit_dir: Path, template_path: Path, 
+                                       base_url: str, wiki_title: str, literate_c_script: Path, docs_dir: Path,
+                                       converter: Optional[PandocConverter] = None,
+                                       page_info: Optional[Dict[Path, Dict[str, Any]]] = None,
+                                       awk_anchors: bool = False,
+                                       critical_css_rules: Optional[List[Tuple[Optional[str], str, str]]] = None,
+                                       highlight_cache: Optional[HighlightCache] = None,
+                                       css_path: Path = CSS_PATH) -> List[bool]:
+    """
+    Converts a batch of source files to HTML and applies file-type-specific post processing.
+    
+    The function prepares input for Pandoc conversion of every page based on its file type,
+    converts the whole batch with a single PandocConverter call (taking the HTML of code
+    blocks from `highlight_cache`, if given, see HighlightCache), and then applies additional
+    steps tailored to each source file. For Python, shell, and Markdown files, it post-processes
+    the output HTML to enhance code block presentation. For C/C++ files, it uses awk-based post
+    processing followed by further cleanup. CSS and JavaScript are then inserted to improve
+    styling and interactive functionality, and the critical CSS of the page is inlined if
+    `critical_css_rules` is given. All of these steps operate on the HTML in memory,
+    and each finished page is written once. If `page_info` is given, it receives the
+    build cache information of each finished page: its search database records, extracted
+    from the same HTML, and its dependencies, the local files its #include links were
+    resolved against (see link_dependency_states()). Errors are caught per page.
+    
+    Args:
+        pages: Pairs of source file path and the path where its HTML will be saved.
         repo_root: Repository root directory used for computing relative paths.
         basilisk_dir: Directory containing resources for Basilisk.
         darcsit_dir: Directory containing darcsit scripts.
@@ -1030,96 +2044,306 @@ def process_file_with_page2html_logic(file_path: Path, output_html_path: Path, r
         wiki_title: Title for the documentation or wiki.
         literate_c_script: Path to the literate-c script for processing C/C++ files.
         docs_dir: Directory where documentation files are stored.
+        converter: Converter shared between batches; by default one pandoc process is run per page.
+        page_info: Dictionary filled with the 'search' records and 'dependencies' of each generated page.
+        awk_anchors: Whether to add C anchors with darcsit's 'decl_anchors.awk' (see run_awk_post_processing()).
+        critical_css_rules: Style rules to inline critical CSS from (see inline_critical_css()).
+        highlight_cache: Cache of highlighted code blocks shared between batches.
+        css_path: Custom stylesheet linked from every page.
     
     Returns:
-        True if the HTML was generated and post-processed successfully, False otherwise.
+        For each page, True if its HTML was generated and post-processed successfully, False otherwise.
     """
-    print(f"  Processing {file_path.relative_to(repo_root)} -> {output_html_path.relative_to(repo_root / 'docs')}")
-
-    try:
-        # Prepare pandoc input based on file type
-        pandoc_input_content = prepare_pandoc_input(file_path, literate_c_script)
-        
-        # Calculate relative URL path for the page
-        # Ensure URL starts with / and uses forward slashes
-        page_url = (base_url + output_html_path.relative_to(repo_root / 'docs').as_posix()).replace('//', '/')
-        
-        # Clean up the page title - remove leading/trailing dashes and spaces
-        page_title = file_path.relative_to(repo_root).as_posix().strip('- \t')
-        
-        # Run pandoc to convert to HTML
-        pandoc_stdout = run_pandoc(
-            pandoc_input_content, 
-            output_html_path, 
-            template_path, 
-            base_url, 
-            wiki_title, 
-            page_url, 
-            page_title,
-            extract_seo_metadata(file_path, pandoc_input_content)
-        )
+    if converter is None:
+        converter = PandocConverter(template_path, use_server=False)
+    
+    results = [False] * len(pages)
+    prepared_pages = []
+    requests = []
+    for index, (file_path, output_html_path) in enumerate(pages):
+        print(f"  Processing {file_path.relative_to(repo_root)} -> {output_html_path.relative_to(repo_root / 'docs')}")
+        try:
+            # Prepare pandoc input based on file type
+            with profile_stage('prepare input', file_path.relative_to(repo_root)):
+                pandoc_input_content = prepare_pandoc_input(file_path, literate_c_script)
+            
+            # Calculate relative URL path for the page
+            # Ensure URL starts with / and uses forward slashes
+            page_url = (base_url + output_html_path.relative_to(repo_root / 'docs').as_posix()).replace('//', '/')
+            
+            # Clean up the page title - remove leading/trailing dashes and spaces
+            page_title = file_path.relative_to(repo_root).as_posix().strip('- \t')
+            
+            seo_metadata = extract_seo_metadata(file_path, pandoc_input_content)
+        except Exception as e:
+            print(f"  Error processing {file_path}: {e}")
+            continue
+        
+        prepared_pages.append((index, page_url, page_title, seo_metadata))
+        requests.append({
+            'text': pandoc_input_content,
+            'from': PAGE_INPUT_FORMAT,
+            'variables': page_template_variables(base_url, wiki_title, page_url, page_title, seo_metadata),
+        })
+    
+    # Replace the code blocks with placeholders, highlighting the ones not cached yet
+    page_texts = [request['text'] for request in requests]
+    page_block_keys = []
+    if highlight_cache is not None:
+        with profile_stage('highlight cache'):
+            for request in requests:
+                request['text'], block_keys = highlight_cache.extract(request['text'])
+                page_block_keys.append(block_keys)
+            highlight_cache.highlight(converter, [key for block_keys in page_block_keys for key in block_keys])
+    
+    # Run pandoc on the whole batch to convert to HTML
+    with profile_stage('pandoc'):
+        html_outputs = converter.convert(requests) if requests else []
+    
+    if highlight_cache is not None:
+        with profile_stage('highlight cache'):
+            uncached = []
+            for position, block_keys in enumerate(page_block_keys):
+                if html_outputs[position] is not None and block_keys:
+                    html_outputs[position] = highlight_cache.splice(html_outputs[position], block_keys)
+                    if html_outputs[position] is None:
+                        uncached.append(position)
+        if uncached:
+            # Convert pages whose code blocks could not be put back as they are
+            debug_print(f"  [Debug Highlight] Converting {len(uncached)} pages without the highlight cache")
+            with profile_stage('pandoc'):
+                html_outputs_uncached = converter.convert([dict(requests[position], text=page_texts[position])
+                                                           for position in uncached])
+            for position, html_content in zip(uncached, html_outputs_uncached):
+                html_outputs[position] = html_content
+    
+    for (index, page_url, page_title, seo_metadata), html_content in zip(prepared_pages, html_outputs):
+        file_path, output_html_path = pages[index]
+        if html_content is None:
+            continue
         
-        # Determine file type for post-processing
-        is_python_file = file_path.suffix.lower() == '.py'
-        is_shell_file = file_path.suffix.lower() == '.sh'
-        is_markdown_file = file_path.suffix.lower() == '.md'
-        
-        # Apply appropriate post-processing based on file type
-        if is_python_file or is_shell_file or is_markdown_file:
-            # For Python, Shell, and Markdown files
-            # Read the generated HTML file
-            with open(output_html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+        relative_path = file_path.relative_to(repo_root)
+        try:
+            with profile_stage('post-process', relative_path):
+                html_content = clean_pandoc_html(html_content, output_html_path, wiki_title, page_title, seo_metadata)
             
-            # Post-process the HTML
-            processed_html = post_process_python_shell_html(html_content)
+            # Determine file type for post-processing
+            is_python_file = file_path.suffix.lower() == '.py'
+            is_shell_file = file_path.suffix.lower() == '.sh'
+            is_markdown_file = file_path.suffix.lower() == '.md'
             
-            # Write back the processed HTML
-            with open(output_html_path, 'w', encoding='utf-8') as f:
-                f.write(processed_html)
-        else:
-            # For C/C++ files
-            # Read the generated HTML file
-            with open(output_html_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+            # Apply appropriate post-processing based on file type
+            dependencies = set()
+            if is_python_file or is_shell_file or is_markdown_file:
+                # For Python, Shell, and Markdown files
+                with profile_stage('post-process', relative_path):
+                    processed_html = post_process_python_shell_html(html_content)
+            else:
+                # For C/C++ files, use awk for post-processing
+                with profile_stage('declaration anchors', relative_path):
+                    processed_html = run_awk_post_processing(html_content, file_path, repo_root, darcsit_dir,
+                                                             awk_anchors)
+                
+                # Further post-process the HTML
+                with profile_stage('post-process', relative_path):
+                    processed_html = post_process_c_html(processed_html, file_path, repo_root, darcsit_dir,
+                                                         docs_dir, dependencies)
             
-            # Use awk for post-processing
-            processed_html = run_awk_post_processing(html_content, file_path, repo_root, darcsit_dir)
+            # Insert CSS link and JavaScript for all file types
+            with profile_stage('css/js insertion', relative_path):
+                is_root = output_html_path.parent == docs_dir
+                processed_html = add_css_link_to_html(processed_html, css_path, is_root,
+                                                      deferred=critical_css_rules is not None)
+                processed_html = add_javascript_to_html(processed_html)
+            if critical_css_rules is not None:
+                with profile_stage('critical css', relative_path):
+                    processed_html = inline_critical_css(processed_html, critical_css_rules)
             
-            # Further post-process the HTML
-            cleaned_html = post_process_c_html(processed_html, file_path, repo_root, darcsit_dir, docs_dir)
+            # Write the finished page in a single pass
+            with profile_stage('write', relative_path):
+                with open(output_html_path, 'w', encoding='utf-8') as f:
+                    f.write(processed_html)
             
-            # Write back the processed HTML
-            with open(output_html_path, 'w', encoding='utf-8') as f:
-                f.write(cleaned_html)
-        
-        # Insert CSS link and JavaScript for all file types
-        is_root = output_html_path.parent == docs_dir
-        insert_css_link_in_html(output_html_path, CSS_PATH, is_root)
-        insert_javascript_in_html(output_html_path)
-        
-        return True
+            if page_info is not None:
+                tags = []
+                if not (is_python_file or is_shell_file or is_markdown_file):
+                    # Declarations defined in C files, from the same .tags file as their anchors
+                    tags_path = repo_root / relative_path.with_suffix(file_path.suffix + '.tags')
+                    tags = sorted({name for name in load_decl_anchors(tags_path).values() if name})
+                category = relative_path.parts[0] if len(relative_path.parts) > 1 else 'root'
+                with profile_stage('search records', relative_path):
+                    page_info[file_path] = {
+                        'search': extract_search_records(processed_html, page_url, page_title, category, tags),
+                        'dependencies': link_dependency_states(dependencies, repo_root),
+                    }
+            
+            results[index] = True
+        except Exception as e:
+            print(f"  Error processing {file_path}: {e}")
     
-    except Exception as e:
-        print(f"  Error processing {file_path}: {e}")
-        return False
+    return results
 
 
-def convert_directory_tree_to_html(readme_content: str) -> str:
+def process_file_with_page2html_logic(file_path: Path, output_html_path: Path, repo_root: Path, 
+                                     basilisk_dir: Path, darcsit_dir: Path, template_path: Path, 
+                                     base_url: str, wiki_title: str, literate_c_script: Path, docs_dir: Path,
+                                     converter: Optional[PandocConverter] = None) -> bool:
     """
-    Converts a plain text directory tree in README content into an HTML site map.
+    Converts a source file to HTML and applies file-type-specific post processing.
     
-    This function scans the provided README content for a markdown code block that
-    contains a directory tree. If found, it parses the tree structure and transforms it
-    into a nested HTML format wrapped in a <div> element with the class "repository-structure".
-    Directories and files are converted into bullet list items with hyperlinks where appropriate.
-    If no directory tree block is detected, the original content is returned unchanged.
+    Single-page form of process_files_with_page2html_logic().
     
     Args:
-        readme_content: The complete README file content as a string.
-    
-    Returns:
-        A string with the directory tree section replaced by an HTML site map.
+        file_path: Path to the source file.
+        output_html_path: Path where the generated HTML will be saved.
+        repo_root: Repository root directory used for computing relative paths.
+        basilisk_dir: Directory containing resources for Basilisk.
+        darcsit_dir: Directory containing darcsit scripts.
+        template_path: Path to the HTML template for conversion.
+        base_url: Base URL for constructing links within the documentation.
+        wiki_title: Title for the documentation or wiki.
+        literate_c_script: Path to the literate-c script for processing C/C++ files.
+        docs_dir: Directory where documentation files are stored.
+        converter: Optional converter to reuse; by default a single pandoc process is run.
+    
+    Returns:
+        True if the HTML was generated and post-processed successfully, False otherwise.
+    """
+    result, = process_files_with_page2html_logic(
+        [(file_path, output_html_path)], repo_root, basilisk_dir, darcsit_dir, template_path,
+        base_url, wiki_title, literate_c_script, docs_dir, converter
+    )
+    return result
+
+
+def render_pages(config: DocsConfig, source_files: List[Path],
+                 cached_pages: Dict[str, Dict[str, Any]],
+                 converter: PandocConverter,
+                 critical_css_rules: Optional[List[Tuple[Optional[str], str, str]]] = None,
+                 highlight_cache: Optional[HighlightCache] = None
+                 ) -> Tuple[Dict[Path, Path], Dict[str, Dict[str, Any]]]:
+    """
+    Render source files to HTML pages, running up to `config.jobs` batches of pages concurrently.
+    
+    Each page spends nearly all of its time waiting on pandoc, literate-c and awk
+    subprocesses, so a thread pool is enough to overlap them and keeps the build
+    configuration (e.g. the temporary template) shared with the workers.
+    Pages whose fingerprint matches the build cache and whose HTML still exists are
+    not regenerated. The remaining pages are split into batches of at most
+    `config.pandoc_batch_size` pages, spread evenly over the workers, and each batch goes through pandoc at once.
+    A page is also regenerated when a header it includes appeared or disappeared since it
+    was rendered (see link_dependency_states()). The search database records and the
+    dependencies of each rendered page are stored in its cache entry, so that up-to-date
+    pages keep theirs without being read again.
+    Results are collected in the order of `source_files`, so the returned mapping is
+    deterministic regardless of which page finishes first.
+    
+    Args:
+        config: Build configuration.
+        source_files: Source files to render, in the order they should be listed.
+        cached_pages: Build cache entries from the previous run, keyed by
+            repository-relative source path.
+        converter: Pandoc converter shared by all batches.
+        critical_css_rules: Style rules to inline critical CSS from, if `config.critical_css` is set.
+        highlight_cache: Cache of highlighted code blocks, if `config.highlight_cache` is set.
+    
+    Returns:
+        A tuple of the dictionary mapping each available source file to its HTML path,
+        and the build cache entries describing those pages (with their search records
+        and dependencies).
+    """
+    repo_root, docs_dir = config.repo_root, config.docs_dir
+    jobs = max(1, config.jobs)
+    
+    def check_page(file_path: Path) -> Tuple[Path, Dict[str, Any], bool]:
+        # Create output path with file extension preserved in the HTML filename
+        # For example: file.c -> file.c.html, file.h -> file.h.html, file.py -> file.py.html
+        relative_path = file_path.relative_to(repo_root)
+        output_html_path = docs_dir / relative_path.with_suffix(relative_path.suffix + '.html')
+        
+        page_fingerprint = compute_page_fingerprint(file_path, repo_root)
+        cache_entry = {'source': page_fingerprint, 'output': output_html_path.relative_to(docs_dir).as_posix()}
+        cached_entry = cached_pages.get(relative_path.as_posix(), {})
+        up_to_date = (all(cached_entry.get(key) == value for key, value in cache_entry.items())
+                      and 'search' in cached_entry and output_html_path.is_file())
+        if up_to_date:
+            dependencies = cached_entry.get('dependencies')
+            if dependencies is None:
+                up_to_date = False
+            elif link_dependency_states({repo_root / path for path in dependencies}, repo_root) != dependencies:
+                debug_print(f"  Linked files changed: {relative_path}")
+                up_to_date = False
+        if up_to_date:
+            debug_print(f"  Up to date: {relative_path}")
+            cache_entry = cached_entry
+        return output_html_path, cache_entry, up_to_date
+    
+    def render_batch(pages: List[Tuple[Path, Path]]) -> List[bool]:
+        for _, output_html_path in pages:
+            # Create output directory if it doesn't exist
+            output_html_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        return process_files_with_page2html_logic(
+            pages, 
+            repo_root, 
+            config.basilisk_dir, 
+            config.darcsit_dir, 
+            config.template_path, 
+            config.base_url, 
+            config.wiki_title, 
+            config.literate_c_script,
+            docs_dir,
+            converter,
+            page_info,
+            config.awk_anchors,
+            critical_css_rules,
+            highlight_cache,
+            config.css_path
+        )
+    
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        page_checks = list(executor.map(check_page, source_files))
+        
+        stale_pages = [(file_path, output_html_path)
+                       for file_path, (output_html_path, _, up_to_date) in zip(source_files, page_checks)
+                       if not up_to_date]
+        batch_size = max(1, min(config.pandoc_batch_size, -(-len(stale_pages) // jobs)))
+        batches = [stale_pages[i:i + batch_size] for i in range(0, len(stale_pages), batch_size)]
+        
+        rendered = {}
+        page_info = {}
+        for batch, results in zip(batches, executor.map(render_batch, batches)):
+            for (file_path, _), success in zip(batch, results):
+                rendered[file_path] = success
+    
+    generated_files = {}
+    page_cache = {}
+    for file_path, (output_html_path, cache_entry, _) in zip(source_files, page_checks):
+        if rendered.get(file_path, True):
+            if file_path in rendered:
+                cache_entry.update(page_info.get(file_path, {}))
+            generated_files[file_path] = output_html_path
+            page_cache[file_path.relative_to(repo_root).as_posix()] = cache_entry
+    
+    print(f"  {len(rendered)} pages rendered, {len(source_files) - len(rendered)} up to date")
+    return generated_files, page_cache
+
+
+def convert_directory_tree_to_html(readme_content: str) -> str:
+    """
+    Converts a plain text directory tree in README content into an HTML site map.
+    
+    This function scans the provided README content for a markdown code block that
+    contains a directory tree. If found, it parses the tree structure and transforms it
+    into a nested HTML format wrapped in a <div> element with the class "repository-structure".
+    Directories and files are converted into bullet list items with hyperlinks where appropriate.
+    If no directory tree block is detected, the original content is returned unchanged.
+    
+    Args:
+        readme_content: The complete README file content as a string.
+    
+    Returns:
+        A string with the directory tree section replaced by an HTML site map.
     """
     # Find the directory tree section
     tree_pattern = r'```\s*\n(├.*?\n.*?└.*?)\n```'
@@ -1221,15 +2445,19 @@ def convert_directory_tree_to_html(readme_content: str) -> str:
 
 
 def generate_index(readme_path: Path, index_path: Path, generated_files: Dict[Path, Path], 
-                  docs_dir: Path, repo_root: Path) -> bool:
+                  docs_dir: Path, repo_root: Path, converter: Optional[PandocConverter] = None,
+                  template_path: Path = TEMPLATE_PATH, wiki_title: Optional[str] = None,
+                  critical_css_rules: Optional[List[Tuple[Optional[str], str, str]]] = None,
+                  source_dirs: Sequence[str] = tuple(SOURCE_DIRS), base_url: str = BASE_URL,
+                  css_path: Path = CSS_PATH) -> bool:
     """
     Generates an index.html page from README.md by integrating documentation links.
     
     Reads the README file (using a default header if missing) and converts its content to HTML.
     The function appends a section that groups links to generated documentation files based on their
     top-level directory, then uses Pandoc with a specified template and configuration to create
-    the final HTML. After conversion, it post-processes the file to adjust code blocks and injects
-    CSS and JavaScript for enhanced presentation.
+    the final HTML. After conversion, it post-processes the HTML in memory to adjust code blocks
+    and inject CSS and JavaScript for enhanced presentation, then writes index.html once.
     
     Args:
         readme_path: Path to the README.md file.
@@ -1237,10 +2465,20 @@ def generate_index(readme_path: Path, index_path: Path, generated_files: Dict[Pa
         generated_files: Dictionary mapping source file paths to their corresponding generated HTML paths.
         docs_dir: Directory where documentation files are stored.
         repo_root: Root directory of the repository used for computing relative paths.
+        converter: Optional converter to reuse; by default a single pandoc process is run.
+        template_path: HTML template used when no converter is given.
+        wiki_title: Title of the documentation; by default the first H1 heading of the README.
+        critical_css_rules: Style rules to inline critical CSS from (see inline_critical_css()).
+        source_dirs: Source directories whose pages get a section of links.
+        base_url: Base URL for constructing links within the documentation.
+        css_path: Custom stylesheet linked from the page.
     
     Returns:
         True if index.html was generated and processed successfully, otherwise False.
     """
+    if wiki_title is None:
+        wiki_title = extract_h1_from_readme(readme_path)
+    
     if not readme_path.exists():
         print(f"Warning: README.md not found at {readme_path}")
         readme_content = "# Project Documentation\n"
@@ -1281,7 +2519,7 @@ def generate_index(readme_path: Path, index_path: Path, generated_files: Dict[Pa
     
     # Add sections for files in the source directories
     for top_dir in sorted(grouped_links.keys()):
-        if top_dir in SOURCE_DIRS:  # Source dirs
+        if top_dir in source_dirs:  # Source dirs
             links_markdown += f"### {top_dir}\n\n"
             links_markdown += "\n".join(sorted(grouped_links[top_dir]))
             links_markdown += "\n\n"
@@ -1290,74 +2528,71 @@ def generate_index(readme_path: Path, index_path: Path, generated_files: Dict[Pa
     final_readme_content = readme_content + links_markdown
 
     # Convert the combined README + links to HTML for index.html
-    cmd = [
-        'pandoc',
-        '-f', 'markdown+tex_math_dollars+raw_html',  # Add raw_html to preserve HTML
-        '-t', 'html5',
-        '--standalone',
-        '--mathjax',
-        '--template', str(TEMPLATE_PATH),
-        '-V', f'wikititle={WIKI_TITLE}',
-        '-V', f'base={BASE_URL}',
-        '-V', 'notitle=true',  # Add notitle=true to avoid duplicate h1 elements
-        '-V', f'pagetitle={WIKI_TITLE}',  # Set the page title to be the same as wiki title
-        '-o', str(index_path)
-    ]
-
+    if converter is None:
+        converter = PandocConverter(template_path, use_server=False)
+    
     debug_print(f"  [Debug Index] Target path: {index_path}")
-    debug_print(f"  [Debug Index] Command: {' '.join(cmd)}")
 
-    process = subprocess.run(cmd, input=final_readme_content, text=True, capture_output=True, check=False)
-
-    # Print results unconditionally for debugging
-    debug_print(f"  [Debug Index] Pandoc Return Code: {process.returncode}")
-    if process.stdout:
-        debug_print(f"  [Debug Index] Pandoc STDOUT:\n{process.stdout}")
-    if process.stderr:
-        debug_print(f"  [Debug Index] Pandoc STDERR:\n{process.stderr}")
-
-    if process.returncode != 0:
+    index_html_content, = converter.convert([{
+        'text': final_readme_content,
+        'from': 'markdown+tex_math_dollars+raw_html',  # Add raw_html to preserve HTML
+        'mathjax': True,
+        'variables': {
+            'wikititle': wiki_title,
+            'base': base_url,
+            'notitle': 'true',  # Add notitle=true to avoid duplicate h1 elements
+            'pagetitle': wiki_title,  # Set the page title to be the same as wiki title
+        },
+    }])
+
+    if index_html_content is None:
         print("Error generating index.html:")
         return False
     
     # Post-process index.html for code blocks
     try:
-        with open(index_path, 'r', encoding='utf-8') as f_in:
-            index_html_content = f_in.read()
-        
-        processed_html = post_process_python_shell_html(index_html_content)
-        
-        with open(index_path, 'w', encoding='utf-8') as f_out:
-            f_out.write(processed_html)
-            
+        index_html_content = post_process_python_shell_html(index_html_content)
     except Exception as e:
         print(f"Warning: Failed to process code blocks in {index_path}: {e}")
-        # Continue even if processing fails, the base file was generated
+        # Continue even if processing fails, the base HTML was generated
 
     # Insert CSS and JavaScript
-    insert_css_link_in_html(index_path, CSS_PATH, True)
-    insert_javascript_in_html(index_path)
+    index_html_content = add_css_link_to_html(index_html_content, css_path, True,
+                                              deferred=critical_css_rules is not None)
+    index_html_content = add_javascript_to_html(index_html_content)
+    if critical_css_rules is not None:
+        index_html_content = inline_critical_css(index_html_content, critical_css_rules)
+    
+    try:
+        with open(index_path, 'w', encoding='utf-8') as f_out:
+            f_out.write(index_html_content)
+    except Exception as e:
+        print(f"Error writing {index_path}: {e}")
+        return False
     
     return True
 
 
-def generate_robots_txt(docs_dir: Path) -> bool:
+def generate_robots_txt(docs_dir: Path, base_domain: Optional[str] = None) -> bool:
     """
     Generate a robots.txt file to guide search engine crawlers.
     
     Args:
         docs_dir: Directory where documentation files are stored
+        base_domain: URL of the published site; by default read from the CNAME file
         
     Returns:
         True if robots.txt was generated successfully
     """
     robots_path = docs_dir / 'robots.txt'
+    if base_domain is None:
+        base_domain = read_base_domain(CNAME_PATH)
     
     try:
         with open(robots_path, 'w', encoding='utf-8') as f:
             f.write('User-agent: *\n')
             f.write('Allow: /\n\n')
-            f.write(f'Sitemap: {BASE_DOMAIN}/sitemap.xml\n')
+            f.write(f'Sitemap: {base_domain}/sitemap.xml\n')
         
         debug_print(f"Generated robots.txt at {robots_path}")
         return True
@@ -1367,18 +2602,21 @@ def generate_robots_txt(docs_dir: Path) -> bool:
         return False
 
 
-def generate_sitemap(docs_dir: Path, generated_files: Dict[Path, Path]) -> bool:
+def generate_sitemap(docs_dir: Path, generated_files: Dict[Path, Path], base_domain: Optional[str] = None) -> bool:
     """
     Generate a sitemap.xml file for search engines.
     
     Args:
         docs_dir: Directory where documentation files are stored
         generated_files: Dictionary mapping source files to generated HTML files
+        base_domain: URL of the published site; by default read from the CNAME file
         
     Returns:
         True if sitemap was generated successfully
     """
     sitemap_path = docs_dir / 'sitemap.xml'
+    if base_domain is None:
+        base_domain = read_base_domain(CNAME_PATH)
     
     try:
         with open(sitemap_path, 'w', encoding='utf-8') as f:
@@ -1387,7 +2625,7 @@ def generate_sitemap(docs_dir: Path, generated_files: Dict[Path, Path]) -> bool:
             
             # Add the homepage
             f.write('  <url>\n')
-            f.write(f'    <loc>{BASE_DOMAIN}/</loc>\n')
+            f.write(f'    <loc>{base_domain}/</loc>\n')
             f.write('    <changefreq>weekly</changefreq>\n')
             f.write('    <priority>1.0</priority>\n')
             f.write('  </url>\n')
@@ -1398,7 +2636,7 @@ def generate_sitemap(docs_dir: Path, generated_files: Dict[Path, Path]) -> bool:
                 url_path = str(relative_path).replace('\\', '/')
                 
                 f.write('  <url>\n')
-                f.write(f'    <loc>{BASE_DOMAIN}/{url_path}</loc>\n')
+                f.write(f'    <loc>{base_domain}/{url_path}</loc>\n')
                 f.write('    <changefreq>monthly</changefreq>\n')
                 
                 # Higher priority for important files
@@ -1419,6 +2657,242 @@ def generate_sitemap(docs_dir: Path, generated_files: Dict[Path, Path]) -> bool:
         return False
 
 
+def compress_file(path: Path) -> int:
+    """
+    Write the precompressed siblings of a file: `<name>.gz` and, if the brotli module
+    is installed, `<name>.br`.
+    
+    A sibling at least as new as the file is left as it is. The gzip header holds no
+    timestamp, so that unchanged content compresses to identical bytes.
+    
+    Args:
+        path: File to compress.
+    
+    Returns:
+        The number of compressed siblings written.
+    
+    Raises:
+        OSError: If the file cannot be read or a sibling cannot be written.
+    """
+    compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    
+    source_mtime = path.stat().st_mtime_ns
+    data = None
+    written = 0
+    for suffix, compress in compressors:
+        compressed_path = path.with_name(path.name + suffix)
+        try:
+            if compressed_path.stat().st_mtime_ns >= source_mtime:
+                continue
+        except OSError:
+            pass
+        if data is None:
+            data = path.read_bytes()
+        temp_path = compressed_path.with_name(compressed_path.name + '.tmp')
+        temp_path.write_bytes(compress(data))
+        os.replace(temp_path, compressed_path)
+        written += 1
+    return written
+
+
+def compress_outputs(docs_dir: Path) -> bool:
+    """
+    Precompress the generated documentation for static servers that serve `.gz`
+    and `.br` files in place of the originals (e.g. nginx `gzip_static`/`brotli_static`).
+    
+    Every file with a suffix in COMPRESSED_SUFFIXES (pages, stylesheets, scripts, the
+    sitemap and the search database and index) gets gzip and, when the optional
+    brotli module is installed, Brotli siblings, written on a thread pool; zlib and
+    brotli release the GIL while compressing. Siblings newer than their file are
+    kept, and siblings whose file no longer exists are removed; only `.gz` and `.br`
+    files named after a suffix of COMPRESSED_SUFFIXES are treated as siblings, so
+    other archives in the docs directory (e.g. a `data.tar.gz` asset) are left alone.
+    Hidden files, such as the build cache, are skipped.
+    
+    Args:
+        docs_dir: The docs directory.
+    
+    Returns:
+        True if all files were compressed, False otherwise.
+    """
+    files = []
+    orphans = []
+    for path in docs_dir.rglob('*'):
+        if any(part.startswith('.') for part in path.relative_to(docs_dir).parts) or not path.is_file():
+            continue
+        if path.suffix in ('.gz', '.br'):
+            original = path.with_suffix('')
+            if original.suffix in COMPRESSED_SUFFIXES and not original.is_file():
+                orphans.append(path)
+        elif path.suffix in COMPRESSED_SUFFIXES and not path.name.endswith('.temp.html'):
+            files.append(path)
+    
+    for orphan in orphans:
+        orphan.unlink()
+        debug_print(f"Removed {orphan}")
+    
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            written = sum(executor.map(compress_file, files))
+    except OSError as e:
+        print(f"Error compressing documentation: {e}")
+        return False
+    
+    formats = "gzip and Brotli" if brotli is not None else "gzip only; brotli is not installed"
+    print(f"  {written} compressed files written for {len(files)} files ({formats}), {len(orphans)} removed")
+    return True
+
+
+def write_file_if_changed(path: Path, content: str) -> bool:
+    """
+    Atomically write a text file, unless it already has the given content.
+    
+    Leaving unchanged files untouched keeps their modification time, so that later
+    steps and servers see no change on a no-op build.
+    
+    Args:
+        path: Path of the file to write.
+        content: Text content of the file.
+    
+    Returns:
+        True if the file was written, False if it was already up to date.
+    
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    try:
+        if path.read_text(encoding='utf-8') == content:
+            return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+    return True
+
+
+def build_search_index(records: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Build the sharded inverted index searched by the command palette.
+    
+    Every record is split into lowercase ASCII terms (see SEARCH_TERM_PATTERN). Each
+    term gets a posting list of the records containing it, as a flat list of record
+    id and score pairs; the score adds up the SEARCH_FIELD_WEIGHTS of the fields the
+    term appears in, counting at most SEARCH_MAX_TERM_OCCURRENCES occurrences per field.
+    Posting lists are sharded by the first SEARCH_PREFIX_LENGTH characters of the term
+    ('ab.json' holds every term starting with "ab"), so the browser only fetches the
+    shard of the prefix being typed. Records are numbered by priority, so that the
+    manifest can give the priority of any record as a few id ranges; the title, URL and
+    excerpt shown for the results are stored in chunks of SEARCH_DOCS_PER_CHUNK records.
+    
+    Args:
+        records: Search database records, as produced by extract_search_records().
+    
+    Returns:
+        A dictionary mapping the file names of the index to their JSON content.
+    """
+    records = sorted(records, key=lambda record: record.get('priority', 5))
+    
+    shards = {}
+    for doc_id, record in enumerate(records):
+        scores = {}
+        for field, weight in SEARCH_FIELD_WEIGHTS.items():
+            value = record.get(field, '')
+            text = ' '.join(value) if isinstance(value, list) else value
+            occurrences = {}
+            for term in SEARCH_TERM_PATTERN.findall(text.lower()):
+                if len(term) >= SEARCH_PREFIX_LENGTH:
+                    occurrences[term] = occurrences.get(term, 0) + 1
+            for term, count in occurrences.items():
+                scores[term] = scores.get(term, 0) + weight * min(count, SEARCH_MAX_TERM_OCCURRENCES)
+        for term, score in scores.items():
+            shards.setdefault(term[:SEARCH_PREFIX_LENGTH], {}).setdefault(term, []).extend((doc_id, score))
+    
+    priorities = []
+    for doc_id, record in enumerate(records):
+        priority = record.get('priority', 5)
+        if not priorities or priorities[-1][0] != priority:
+            priorities.append([priority, doc_id])
+    
+    manifest = {
+        'version': 1,
+        'prefixLength': SEARCH_PREFIX_LENGTH,
+        'docsPerChunk': SEARCH_DOCS_PER_CHUNK,
+        'docCount': len(records),
+        'priorities': priorities,
+        'shards': sorted(shards),
+    }
+    
+    def to_json(data: Any) -> str:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    
+    index_files = {'manifest.json': to_json(manifest)}
+    for prefix, terms in shards.items():
+        index_files[f'{prefix}.json'] = to_json(terms)
+    for start in range(0, len(records), SEARCH_DOCS_PER_CHUNK):
+        index_files[f'docs-{start // SEARCH_DOCS_PER_CHUNK}.json'] = to_json([
+            {'title': record['title'], 'url': record['url'], 'excerpt': record.get('excerpt', '')}
+            for record in records[start:start + SEARCH_DOCS_PER_CHUNK]
+        ])
+    return index_files
+
+
+def write_search_database(search_db_path: Path, search_index_dir: Path, generated_files: Dict[Path, Path],
+                          page_cache: Dict[str, Dict[str, Any]], max_chars: int,
+                          repo_root: Path = REPO_ROOT) -> bool:
+    """
+    Write the full-text search database and the index searched by the command palette.
+    
+    The records of every generated page are taken from the build cache, where they
+    are stored when the page is rendered, so unchanged pages are not read again. They
+    are written as compact JSON to `search_db_path`, and as the sharded inverted index
+    of build_search_index() to `search_index_dir`. Only files whose contents changed
+    are written, and index files left over from a previous build are removed.
+    
+    Args:
+        search_db_path: Path of the search database (assets/js/search_db.json).
+        search_index_dir: Directory of the search index (assets/js/search).
+        generated_files: Dictionary mapping source files to their generated HTML files.
+        page_cache: Build cache entries of the generated pages.
+        max_chars: Maximum length of the content of each record; 0 for no limit.
+        repo_root: Root directory of the repository, to which the cache keys are relative.
+    
+    Returns:
+        True if the search database and index are up to date, False otherwise.
+    """
+    records = []
+    for file_path in generated_files:
+        cache_entry = page_cache.get(file_path.relative_to(repo_root).as_posix(), {})
+        for record in cache_entry.get('search', []):
+            if max_chars > 0 and len(record['content']) > max_chars:
+                record = dict(record, content=record['content'][:max_chars])
+            records.append(record)
+    
+    output_files = {search_db_path: json.dumps(records, ensure_ascii=False, separators=(',', ':'))}
+    for name, content in build_search_index(records).items():
+        output_files[search_index_dir / name] = content
+    
+    try:
+        updated = sum(write_file_if_changed(path, content) for path, content in output_files.items())
+        
+        # Remove shards and chunks that are no longer part of the index
+        for stale_path in search_index_dir.glob('*.json'):
+            if stale_path not in output_files:
+                stale_path.unlink()
+                debug_print(f"Removed stale search index file {stale_path}")
+        
+        print(f"  {len(records)} search records, {updated} of {len(output_files)} search files updated")
+        return True
+    except OSError as e:
+        print(f"Error writing search database: {e}")
+        return False
+
+
 def copy_css_file(css_path: Path, docs_dir: Path) -> bool:
     """
     Copies a CSS file to the specified documentation directory.
@@ -1449,7 +2923,8 @@ def create_favicon_files(docs_dir: Path, logos_dir: Path) -> bool:
     Create necessary favicon files in the docs/assets/favicon directory.
     
     This function ensures all required favicon files exist in the destination
-    directory, creating them if needed from source logo files.
+    directory, creating them if needed from source logo files. The favicons of
+    .github/assets/favicon are copied by copy_assets().
     
     Args:
         docs_dir: The documentation root directory
@@ -1463,14 +2938,6 @@ def create_favicon_files(docs_dir: Path, logos_dir: Path) -> bool:
         favicon_dir = docs_dir / "assets" / "favicon"
         favicon_dir.mkdir(exist_ok=True)
         
-        # Copy any existing favicon files from .github/assets/favicon if it exists
-        source_favicon_dir = Path(logos_dir.parent, "favicon")
-        if source_favicon_dir.exists() and source_favicon_dir.is_dir():
-            for item in source_favicon_dir.glob('*'):
-                if item.is_file():
-                    shutil.copy2(item, favicon_dir / item.name)
-                    debug_print(f"Copied favicon file: {item.name}")
-        
         # Create essential favicon files if they don't exist
         favicon_files = [
             "favicon.ico",
@@ -1519,90 +2986,187 @@ def create_favicon_files(docs_dir: Path, logos_dir: Path) -> bool:
         return False
 
 
-def copy_assets(assets_dir: Path, docs_dir: Path) -> bool:
+def plan_asset_copies(assets_dir: Path, docs_dir: Path) -> Dict[Path, Path]:
+    """
+    List the asset files to place in the docs directory.
+    
+    Covers every file of the css, js, images and logos subtrees (copied to the same
+    place under docs/assets), the favicons, and custom_styles.css, which is also copied
+    to the docs root to prevent 404s.
+    
+    Args:
+        assets_dir: The source assets directory
+        docs_dir: The destination docs directory
+    
+    Returns:
+        A dictionary mapping each destination path to its source path.
     """
-    Copy assets from source to destination.
+    docs_assets_dir = docs_dir / "assets"
+    copies = {}
+    for subtree in ("css", "js", "images", "logos"):
+        source_dir = assets_dir / subtree
+        if source_dir.exists():
+            for source_file in source_dir.glob("**/*"):
+                if source_file.is_file():
+                    copies[docs_assets_dir / subtree / source_file.relative_to(source_dir)] = source_file
+    
+    favicon_dir = assets_dir / "favicon"
+    if favicon_dir.is_dir():
+        for source_file in favicon_dir.glob("*"):
+            if source_file.is_file():
+                copies[docs_assets_dir / "favicon" / source_file.name] = source_file
+    
+    custom_styles_path = assets_dir / "css" / "custom_styles.css"
+    if custom_styles_path.exists():
+        copies[docs_dir / "custom_styles.css"] = custom_styles_path
+    
+    return copies
+
+
+def place_asset_file(source_path: Path, dest_path: Path, link_mode: str) -> None:
+    """
+    Place a copy of an asset file at its destination, replacing any existing file.
+    
+    With link_mode 'hardlink' the destination is a hard link to the source, and with
+    'reflink' a copy-on-write clone of it (FICLONE, e.g. on Btrfs or XFS). Either falls
+    back to a regular copy when the filesystem does not allow it.
+    
+    Args:
+        source_path: Asset file to place.
+        dest_path: Destination of the file.
+        link_mode: One of 'copy', 'hardlink' or 'reflink'.
+    
+    Raises:
+        OSError: If the file cannot be copied.
+    """
+    if dest_path.is_symlink() or dest_path.exists():
+        dest_path.unlink()
+    
+    if link_mode == 'hardlink':
+        try:
+            os.link(source_path, dest_path)
+            return
+        except OSError as e:
+            debug_print(f"Hard link failed for {dest_path}, copying instead: {e}")
+    elif link_mode == 'reflink' and fcntl is not None:
+        try:
+            with open(source_path, 'rb') as source, open(dest_path, 'wb') as dest:
+                fcntl.ioctl(dest.fileno(), FICLONE, source.fileno())
+            shutil.copystat(source_path, dest_path)
+            return
+        except OSError as e:
+            debug_print(f"Reflink failed for {dest_path}, copying instead: {e}")
+            dest_path.unlink(missing_ok=True)
+    
+    shutil.copy2(source_path, dest_path)
+
+
+def sync_asset_file(source_path: Path, dest_path: Path, source_key: str,
+                    synced_state: Optional[List[Any]], link_mode: str) -> Tuple[List[Any], bool]:
+    """
+    Place one asset file in the docs directory unless it is already up to date.
+    
+    The destination is up to date if the source and destination sizes and modification
+    times match the state recorded when it was last placed, or if it already has the
+    same content as the source. Its directory must exist.
+    
+    Args:
+        source_path: Asset file to place.
+        dest_path: Destination of the file.
+        source_key: Path of the source file relative to the assets directory.
+        synced_state: State recorded for the destination by the previous sync, if any.
+        link_mode: How the file is placed (see place_asset_file()).
+    
+    Returns:
+        A tuple of the state to record for the destination and whether it was copied.
+    
+    Raises:
+        OSError: If the file cannot be copied.
+    """
+    source_stat = source_path.stat()
+    try:
+        dest_stat = dest_path.stat()
+    except OSError:
+        dest_stat = None
+    
+    if dest_stat is not None:
+        state = [source_key, source_stat.st_size, source_stat.st_mtime_ns,
+                 dest_stat.st_size, dest_stat.st_mtime_ns]
+        if synced_state == state:
+            return state, False
+        if dest_stat.st_size == source_stat.st_size and hash_file(dest_path) == hash_file(source_path):
+            debug_print(f"Unchanged {dest_path}")
+            return state, False
+    
+    place_asset_file(source_path, dest_path, link_mode)
+    debug_print(f"Copied {source_path} to {dest_path}")
+    dest_stat = dest_path.stat()
+    return [source_key, source_stat.st_size, source_stat.st_mtime_ns,
+            dest_stat.st_size, dest_stat.st_mtime_ns], True
+
+
+def copy_assets(assets_dir: Path, docs_dir: Path, link_mode: str = 'copy') -> bool:
+    """
+    Synchronize assets from source to destination.
     
     This function copies assets such as CSS, JavaScript, images, etc. from the
-    source assets directory to the destination docs directory.
+    source assets directory to the destination docs directory, like rsync: files
+    whose source and destination are unchanged since they were last placed (same
+    size and modification time, recorded in ASSET_SYNC_MANIFEST), or whose existing
+    destination already has the same content, are skipped. Files placed by a previous
+    sync whose source no longer exists are removed; other files in the docs directory
+    are left alone.
+    
+    All destinations are planned up front, their directories are created once, and
+    the files are checked and copied on up to ASSET_COPY_JOBS threads.
     
     Args:
         assets_dir: The source assets directory
         docs_dir: The destination docs directory
+        link_mode: How files are placed; 'copy', 'hardlink' or 'reflink' (see place_asset_file())
         
     Returns:
         True if successful, False otherwise
     """
+    manifest_path = docs_dir / ASSET_SYNC_MANIFEST
     try:
         debug_print(f"Copying assets from {assets_dir} to {docs_dir}")
         
-        # Create the assets directory in docs if it doesn't exist
-        docs_assets_dir = docs_dir / "assets"
-        docs_assets_dir.mkdir(exist_ok=True)
-        
-        # Copy CSS files
-        css_dir = assets_dir / "css"
-        docs_css_dir = docs_assets_dir / "css"
-        docs_css_dir.mkdir(exist_ok=True, parents=True)
-        
-        if css_dir.exists():
-            for css_file in css_dir.glob("**/*"):
-                if css_file.is_file():
-                    rel_path = css_file.relative_to(css_dir)
-                    dest_path = docs_css_dir / rel_path
-                    dest_path.parent.mkdir(exist_ok=True, parents=True)
-                    shutil.copy2(css_file, dest_path)
-                    debug_print(f"Copied {css_file} to {dest_path}")
-        
-        # Copy JS files
-        js_dir = assets_dir / "js"
-        docs_js_dir = docs_assets_dir / "js"
-        docs_js_dir.mkdir(exist_ok=True, parents=True)
-        
-        if js_dir.exists():
-            for js_file in js_dir.glob("**/*"):
-                if js_file.is_file():
-                    rel_path = js_file.relative_to(js_dir)
-                    dest_path = docs_js_dir / rel_path
-                    dest_path.parent.mkdir(exist_ok=True, parents=True)
-                    shutil.copy2(js_file, dest_path)
-                    debug_print(f"Copied {js_file} to {dest_path}")
-        
-        # Copy images
-        img_dir = assets_dir / "images"
-        docs_img_dir = docs_assets_dir / "images"
-        
-        if img_dir.exists():
-            docs_img_dir.mkdir(exist_ok=True, parents=True)
-            for img_file in img_dir.glob("**/*"):
-                if img_file.is_file():
-                    rel_path = img_file.relative_to(img_dir)
-                    dest_path = docs_img_dir / rel_path
-                    dest_path.parent.mkdir(exist_ok=True, parents=True)
-                    shutil.copy2(img_file, dest_path)
-                    debug_print(f"Copied {img_file} to {dest_path}")
-                    
-        # Copy logo files
-        logos_dir = assets_dir / "logos"
-        docs_logos_dir = docs_assets_dir / "logos"
-        
-        if logos_dir.exists():
-            docs_logos_dir.mkdir(exist_ok=True, parents=True)
-            for logo_file in logos_dir.glob("**/*"):
-                if logo_file.is_file():
-                    rel_path = logo_file.relative_to(logos_dir)
-                    dest_path = docs_logos_dir / rel_path
-                    dest_path.parent.mkdir(exist_ok=True, parents=True)
-                    shutil.copy2(logo_file, dest_path)
-                    debug_print(f"Copied {logo_file} to {dest_path}")
-        
-        # Copy custom CSS to root directory
-        if css_dir.exists():
-            custom_styles_path = css_dir / "custom_styles.css"
-            if custom_styles_path.exists():
-                # Also copy to root directory to prevent 404s
-                shutil.copy2(custom_styles_path, docs_dir / "custom_styles.css")
-                debug_print(f"Copied custom_styles.css to root directory")
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous_manifest = json.load(f)
+        except (OSError, ValueError):
+            previous_manifest = {}
+        
+        copies = plan_asset_copies(assets_dir, docs_dir)
+        for directory in sorted({dest_path.parent for dest_path in copies}):
+            directory.mkdir(exist_ok=True, parents=True)
+        
+        dest_keys = {dest_path: dest_path.relative_to(docs_dir).as_posix() for dest_path in copies}
+        with ThreadPoolExecutor(max_workers=ASSET_COPY_JOBS) as executor:
+            results = executor.map(
+                lambda dest_path: sync_asset_file(copies[dest_path], dest_path,
+                                                  copies[dest_path].relative_to(assets_dir).as_posix(),
+                                                  previous_manifest.get(dest_keys[dest_path]), link_mode),
+                copies)
+            manifest = {}
+            copied = 0
+            for dest_path, (state, was_copied) in zip(copies, results):
+                manifest[dest_keys[dest_path]] = state
+                copied += was_copied
+        
+        # Remove files placed by a previous sync whose source is gone
+        removed = 0
+        for dest_key in previous_manifest.keys() - manifest.keys():
+            stale_path = docs_dir / dest_key
+            if stale_path.is_file():
+                stale_path.unlink()
+                debug_print(f"Removed stale asset {stale_path}")
+                removed += 1
+        
+        if manifest != previous_manifest:
+            save_build_cache(manifest_path, manifest, "asset sync manifest")
+        print(f"  {copied} assets copied, {len(copies) - copied} up to date, {removed} removed")
         
         # Create favicon files as needed
         logos_dir = assets_dir / "logos"
@@ -1615,99 +3179,840 @@ def copy_assets(assets_dir: Path, docs_dir: Path) -> bool:
         return False
 
 
-def main():
+class LiveReloadServer:
     """
-    Generate HTML documentation for the project.
+    Local web server for the docs directory that reloads open pages after each rebuild.
     
-    This function orchestrates the documentation generation process by validating
-    configuration, setting up the output directories, and copying required CSS files.
-    It finds source files in the repository, converts them to HTML using type-specific
-    processing logic, and collects the results into a generated files dictionary.
-    Finally, it creates an index page and produces SEO-compliant files such as robots.txt
-    and sitemap.xml, with all output written to the documentation directory.
+    Files are served as by `python3 -m http.server`, except that a small script is
+    added to every HTML page as it is sent. The script listens to the server-sent
+    events of LIVE_RELOAD_PATH and reloads the page when notify() is called. Generated
+    files on disk are left untouched.
     """
-    if not validate_config():
-        return
     
-    try:
-        # Create docs directory if it doesn't exist
-        DOCS_DIR.mkdir(exist_ok=True)
+    def __init__(self, docs_dir: Path, port: int):
+        self.generation = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        handler = functools.partial(LiveReloadRequestHandler, directory=str(docs_dir), live_reload=self)
+        self.httpd = ThreadingHTTPServer(('', port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+    
+    def notify(self) -> None:
+        """Tell every open page to reload."""
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+    
+    def wait(self, generation: int, timeout: float) -> int:
+        """Wait up to `timeout` seconds for a rebuild after `generation`, returning the current generation."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation or self.closed, timeout)
+            return self.generation
+    
+    def close(self) -> None:
+        """Stop the server and end the pending event streams."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LiveReloadRequestHandler(SimpleHTTPRequestHandler):
+    """Request handler of LiveReloadServer."""
+    
+    def __init__(self, *handler_args, live_reload: LiveReloadServer, **kwargs):
+        self.live_reload = live_reload
+        super().__init__(*handler_args, **kwargs)
+    
+    def do_GET(self) -> None:
+        request_path = self.path.split('?', 1)[0].split('#', 1)[0]
+        if request_path == LIVE_RELOAD_PATH:
+            self.send_reload_events()
+            return
         
-        # Copy all assets (CSS, JS, logos, fonts, etc.) to docs directory
-        print("\nCopying assets...")
-        assets_dir = REPO_ROOT / '.github' / 'assets'
-        if not copy_assets(assets_dir, DOCS_DIR):
-            print("Failed to copy assets.")
+        file_path = self.translate_path(self.path)
+        if os.path.isdir(file_path) and request_path.endswith('/'):
+            file_path = os.path.join(file_path, 'index.html')
+        if not (file_path.endswith('.html') and os.path.isfile(file_path)):
+            super().do_GET()
             return
         
-        # Find all source files
-        source_files = find_source_files(REPO_ROOT, SOURCE_DIRS)
+        # Serve HTML pages with the live reload script
+        content = Path(file_path).read_bytes()
+        body_end = content.rfind(b'</body>')
+        if body_end == -1:
+            body_end = len(content)
+        content = content[:body_end] + LIVE_RELOAD_SCRIPT.encode('utf-8') + content[body_end:]
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(content)
+    
+    def send_reload_events(self) -> None:
+        """Stream a "reload" event after each rebuild, with keep-alive comments in between."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        
+        generation = self.live_reload.generation
+        try:
+            while not self.live_reload.closed:
+                current_generation = self.live_reload.wait(generation, timeout=15)
+                if current_generation != generation:
+                    generation = current_generation
+                    self.wfile.write(b'data: reload\n\n')
+                else:
+                    self.wfile.write(b': keep-alive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def log_message(self, format: str, *log_args: Any) -> None:
+        debug_print(f"  {self.address_string()} - {format % log_args}")
+
+
+def minify_css(css: str) -> str:
+    """
+    Minify a stylesheet.
+    
+    Uses rcssmin when it is installed. Otherwise comments are removed and whitespace
+    is collapsed, dropping it entirely around braces, semicolons and commas; quoted
+    strings are left untouched.
+    """
+    if rcssmin is not None:
+        return rcssmin.cssmin(css)
+    
+    def replace_token(match: re.Match) -> str:
+        if match.group('string') is not None:
+            return match.group('string')
+        if match.group('punctuation') is not None:
+            return match.group('punctuation')
+        if match.group('comment') is not None:
+            return ""
+        return " "
+    
+    return CSS_MINIFY_TOKEN_PATTERN.sub(replace_token, css).strip() + "\n"
+
+
+def minify_js(script: str) -> str:
+    """
+    Minify a script with rjsmin when it is installed.
+    
+    Without rjsmin the script is returned unchanged: stripping JavaScript safely
+    needs a real tokenizer (regular expression literals, template strings,
+    automatic semicolon insertion).
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(script)
+    return script
+
+
+def fingerprint_assets(assets_dir: Path, docs_dir: Path) -> Optional[Dict[str, str]]:
+    """
+    Write minified, content-hashed copies of the assets referenced by the template.
+    
+    Each file of FINGERPRINTED_ASSETS is minified and written next to its plain copy
+    as e.g. `assets/js/main.<hash>.js`, where the hash is derived from the minified
+    content, so that the name changes exactly when the content does and the files
+    can be served with long-lived immutable cache headers. The mapping from plain to
+    hashed names is written to ASSET_MANIFEST_PATH, and the hashed files of the
+    previous build that are no longer current are removed.
+    
+    Args:
+        assets_dir: The source assets directory
+        docs_dir: The destination docs directory
+    
+    Returns:
+        The mapping from each asset path (relative to the assets directory) to its
+        hashed path, or None if the assets could not be written.
+    """
+    manifest_path = docs_dir / ASSET_MANIFEST_PATH
+    try:
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous_manifest = json.load(f)
+        except (OSError, ValueError):
+            previous_manifest = {}
+        
+        manifest = {}
+        for asset in FINGERPRINTED_ASSETS:
+            source_path = assets_dir / asset
+            if not source_path.is_file():
+                debug_print(f"Asset not found, not fingerprinted: {source_path}")
+                continue
+            content = source_path.read_text(encoding='utf-8')
+            content = minify_css(content) if source_path.suffix == '.css' else minify_js(content)
+            content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:ASSET_HASH_LENGTH]
+            hashed_asset = Path(asset).with_name(f"{source_path.stem}.{content_hash}{source_path.suffix}").as_posix()
+            hashed_path = docs_dir / "assets" / hashed_asset
+            hashed_path.parent.mkdir(exist_ok=True, parents=True)
+            if write_file_if_changed(hashed_path, content):
+                debug_print(f"Wrote {hashed_path}")
+            manifest[asset] = hashed_asset
+        
+        for asset, hashed_asset in previous_manifest.items():
+            if manifest.get(asset) != hashed_asset:
+                (docs_dir / "assets" / hashed_asset).unlink(missing_ok=True)
+                debug_print(f"Removed stale asset {hashed_asset}")
+        
+        if manifest != previous_manifest:
+            write_file_if_changed(manifest_path, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+        print(f"  {len(manifest)} assets minified and fingerprinted")
+        return manifest
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Error fingerprinting assets: {e}")
+        return None
+
+
+def rewrite_asset_references(template_content: str, asset_names: Dict[str, str]) -> str:
+    """
+    Point the template's references to assets at their fingerprinted names.
+    
+    Args:
+        template_content: The HTML template.
+        asset_names: Mapping from asset paths to hashed paths, from fingerprint_assets().
+    
+    Returns:
+        The template with every `assets/<path>` reference of a fingerprinted asset
+        replaced by its hashed path.
+    """
+    if not asset_names:
+        return template_content
+    pattern = re.compile(r'(?<=assets/)(' + '|'.join(map(re.escape, asset_names)) + r')(?=["\'?#])')
+    return pattern.sub(lambda match: asset_names[match.group(1)], template_content)
+
+
+def find_css_block_end(css: str, open_index: int) -> int:
+    """
+    Return the index of the brace closing the block opened at `open_index`.
+    
+    Braces inside quoted strings are ignored. Returns the length of the stylesheet
+    if the block is not closed.
+    """
+    depth = 0
+    quote = None
+    index = open_index
+    while index < len(css):
+        char = css[index]
+        if quote:
+            if char == '\\':
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return index
+        index += 1
+    return len(css)
+
+
+def parse_css_rules(css: str, media: Optional[str] = None) -> List[Tuple[Optional[str], str, str]]:
+    """
+    Split a stylesheet into its style rules.
+    
+    Rules inside @media blocks are returned with their media query; other at-rules
+    (@font-face, @keyframes, @import, @supports, ...) are skipped, since they do not
+    apply to the elements of a page by themselves.
+    
+    Args:
+        css: The stylesheet, without comments (see minify_css()).
+        media: Media query of the block the stylesheet is nested in.
+    
+    Returns:
+        A list of (media query or None, selector list, declarations) tuples, in
+        stylesheet order.
+    """
+    rules = []
+    position = 0
+    while True:
+        open_index = css.find('{', position)
+        if open_index == -1:
+            return rules
+        close_index = find_css_block_end(css, open_index)
+        # Statements such as @charset or @import end with a semicolon before the prelude
+        prelude = css[position:open_index].rsplit(';', 1)[-1].strip()
+        block = css[open_index + 1:close_index]
+        if prelude.startswith('@media'):
+            rules.extend(parse_css_rules(block, prelude[len('@media'):].strip()))
+        elif prelude and not prelude.startswith('@'):
+            rules.append((media, prelude, block.strip()))
+        position = close_index + 1
+
+
+def load_critical_css_rules(assets_dir: Path) -> List[Tuple[Optional[str], str, str]]:
+    """
+    Load the style rules that critical CSS is selected from.
+    
+    These are the rules of CRITICAL_CSS_STYLESHEETS, in the order the template links
+    them. Rules whose declarations reference a url() are left out, since the relative
+    URL would not resolve from the page they are inlined into.
+    """
+    rules = []
+    for stylesheet in CRITICAL_CSS_STYLESHEETS:
+        try:
+            css = (assets_dir / stylesheet).read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Warning: Could not read {stylesheet} for critical CSS: {e}")
+            continue
+        rules.extend(rule for rule in parse_css_rules(minify_css(css)) if 'url(' not in rule[2])
+    return rules
+
+
+def selector_is_used(selectors: str, tags: Set[str], classes: Set[str], ids: Set[str]) -> bool:
+    """
+    Check whether a selector list may match an element of a page.
+    
+    A selector is considered used if every tag name, class and id it mentions
+    occurs in the page. Pseudo-classes, pseudo-elements and attribute selectors are
+    ignored, so the check errs on the side of keeping rules.
+    """
+    for selector in re.split(r',(?![^(]*\))', selectors):
+        selector = CSS_SELECTOR_IGNORED_PATTERN.sub('', selector)
+        if (all(name in classes for name in re.findall(r'\.([\w-]+)', selector))
+                and all(name in ids for name in re.findall(r'#([\w-]+)', selector))
+                and all(name.lower() in tags for name in re.findall(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)', selector))):
+            return True
+    return False
+
+
+def inline_critical_css(html: str, rules: List[Tuple[Optional[str], str, str]]) -> str:
+    """
+    Inline the critical CSS of a page at the template's CRITICAL_CSS_PLACEHOLDER.
+    
+    The critical CSS consists of the rules (from load_critical_css_rules()) that may
+    match an element of the page's first CRITICAL_CSS_FOLD_CHARS characters of body
+    markup, the part shown before the user scrolls. The complete stylesheets are
+    loaded without blocking rendering (see defer_site_stylesheets()). Pages without
+    the placeholder are returned unchanged.
+    
+    Args:
+        html: The generated page.
+        rules: Style rules to select the critical CSS from.
+    
+    Returns:
+        The page with its critical CSS in a <style> element.
+    """
+    if CRITICAL_CSS_PLACEHOLDER not in html:
+        return html
+    
+    body_index = html.find('<body')
+    above_fold = html[:html.find('<head')] + html[body_index:body_index + CRITICAL_CSS_FOLD_CHARS]
+    tags = {'html', 'body'} | {tag.lower() for tag in re.findall(r'<([a-zA-Z][\w-]*)', above_fold)}
+    classes = {name for value in re.findall(r'\sclass="([^"]*)"', above_fold) for name in value.split()}
+    ids = set(re.findall(r'\sid="([^"]*)"', above_fold))
+    
+    critical_css = []
+    open_media = None
+    for media, selectors, declarations in rules:
+        if not selector_is_used(selectors, tags, classes, ids):
+            continue
+        if media != open_media:
+            if open_media is not None:
+                critical_css.append('}')
+            if media is not None:
+                critical_css.append(f'@media {media}{{')
+            open_media = media
+        critical_css.append(f'{selectors}{{{declarations}}}')
+    if open_media is not None:
+        critical_css.append('}')
+    
+    return html.replace(CRITICAL_CSS_PLACEHOLDER, f"<style>{''.join(critical_css)}</style>", 1)
+
+
+def defer_site_stylesheets(template_content: str) -> str:
+    """
+    Load the site stylesheets of the template without blocking rendering.
+    
+    The links to CRITICAL_CSS_STYLESHEETS are turned into `media="print"` links that
+    switch to `all` once loaded, like the icon font stylesheets, with a <noscript>
+    fallback. CRITICAL_CSS_PLACEHOLDER is put before them, for inline_critical_css().
+    """
+    pattern = re.compile(r'<link rel="stylesheet" href="([^"]*assets/(?:'
+                         + '|'.join(map(re.escape, CRITICAL_CSS_STYLESHEETS)) + r'))">')
+    matches = list(pattern.finditer(template_content))
+    if not matches:
+        return template_content
+    
+    start, end = matches[0].start(), matches[-1].end()
+    deferred_links = pattern.sub(r'''<link rel="stylesheet" href="\1" media="print" onload="this.media='all'">''',
+                                 template_content[start:end])
+    noscript_links = '\n'.join(f'        {match.group(0)}' for match in matches)
+    return (template_content[:start] + CRITICAL_CSS_PLACEHOLDER + '\n    ' + deferred_links
+            + f'\n    <noscript>\n{noscript_links}\n    </noscript>' + template_content[end:])
+
+
+def subset_icon_fonts(assets_dir: Path, docs_dir: Path, text_paths: List[Path]) -> Dict[str, str]:
+    """
+    Subset the icon fonts to the glyphs the documentation uses.
+    
+    For each stylesheet of ICON_FONT_STYLESHEETS, the glyphs are those of the icon
+    classes (e.g. `.ai-orcid:before { content: "\\e906" }`) named in the given files.
+    Its WOFF, WOFF2 and TrueType fonts are subset with fontTools into
+    `<name>.subset.<ext>` files, and a `<name>.subset.css` copy of the stylesheet
+    referencing them is written next to the stylesheet in the docs directory. A
+    subset font is only regenerated when the font or its glyph set changed.
+    
+    Icon classes that scripts build at runtime (e.g. `'icon-' + name`) are not
+    detected; such icons would render as missing glyphs.
+    
+    Args:
+        assets_dir: The source assets directory
+        docs_dir: The destination docs directory
+        text_paths: Files naming the icon classes in use: the template, scripts and page sources.
+    
+    Returns:
+        The mapping from each subset stylesheet path (relative to the assets directory)
+        to the path of its subset copy, empty if fontTools is not installed.
+    """
+    if font_subset is None:
+        print("  fontTools is not installed; fonts are not subset")
+        return {}
+    
+    words = set()
+    for path in text_paths:
+        try:
+            words.update(re.findall(r'[\w-]+', path.read_text(encoding='utf-8')))
+        except (OSError, UnicodeDecodeError):
+            continue
+    
+    state_path = docs_dir / FONT_SUBSET_STATE_PATH
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            previous_state = json.load(f)
+    except (OSError, ValueError):
+        previous_state = {}
+    
+    state = {}
+    stylesheet_names = {}
+    for stylesheet in ICON_FONT_STYLESHEETS:
+        stylesheet_path = assets_dir / stylesheet
+        try:
+            css = stylesheet_path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            debug_print(f"Icon font stylesheet not found: {stylesheet_path}")
+            continue
+        codepoints = sorted({int(codepoint, 16) for name, codepoint in ICON_GLYPH_PATTERN.findall(css)
+                             if name in words})
+        
+        def subset_font_url(match: re.Match) -> str:
+            font_url = match.group(1)
+            font_path = (stylesheet_path.parent / font_url).resolve()
+            subset_url = str(Path(font_url).with_name(f"{font_path.stem}.subset{font_path.suffix}").as_posix())
+            subset_path = docs_dir / "assets" / (stylesheet_path.parent / subset_url).resolve().relative_to(
+                assets_dir.resolve())
+            key = hashlib.sha256((hash_file(font_path) + repr(codepoints)).encode('utf-8')).hexdigest()
+            state_key = subset_path.relative_to(docs_dir).as_posix()
+            
+            if previous_state.get(state_key) != key or not subset_path.is_file():
+                options = font_subset.Options()
+                options.flavor = {'.woff': 'woff', '.woff2': 'woff2'}.get(font_path.suffix)
+                font = font_subset.load_font(str(font_path), options)
+                subsetter = font_subset.Subsetter(options)
+                subsetter.populate(unicodes=codepoints)
+                subsetter.subset(font)
+                subset_path.parent.mkdir(exist_ok=True, parents=True)
+                font_subset.save_font(font, str(subset_path), options)
+                font.close()
+                debug_print(f"Subset {font_path.name} to {len(codepoints)} glyphs")
+            state[state_key] = key
+            return match.group(0).replace(font_url, subset_url)
+        
+        try:
+            subset_css = ICON_FONT_URL_PATTERN.sub(subset_font_url, css)
+        except Exception as e:
+            print(f"Warning: Could not subset the fonts of {stylesheet}: {e}")
+            continue
+        subset_stylesheet = Path(stylesheet).with_name(
+            f"{Path(stylesheet).name.split('.')[0]}.subset.css").as_posix()
+        write_file_if_changed(docs_dir / "assets" / subset_stylesheet, subset_css)
+        stylesheet_names[stylesheet] = subset_stylesheet
+        print(f"  {stylesheet}: {len(codepoints)} glyphs used")
+    
+    if state != previous_state:
+        write_file_if_changed(state_path, json.dumps(state, indent=2, sort_keys=True) + "\n")
+    return stylesheet_names
+
+
+def snapshot_watched_files(watched_paths: List[Path]) -> Dict[Path, Tuple[int, int]]:
+    """
+    Record the modification time and size of every file under the watched paths.
+    
+    The temporary template written next to the real one and the `.tmp` files of
+    atomic writes are ignored, as they are outputs of the build.
+    
+    Args:
+        watched_paths: Files and directories to watch.
+    
+    Returns:
+        A dictionary mapping each existing file to its (mtime in ns, size) pair.
+    """
+    snapshot = {}
+    for watched_path in watched_paths:
+        if watched_path.is_dir():
+            files = (Path(root) / name for root, _, names in os.walk(watched_path) for name in names)
+        else:
+            files = [watched_path]
+        for file_path in files:
+            if file_path.name.endswith(('.temp.html', '.tmp')):
+                continue
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class DocsBuilder:
+    """
+    Documentation builder for a DocsConfig.
+    
+    Validates the configuration, prepares the processed template and owns the pandoc
+    converter shared by every build, so that repeated builds (see watch()) reuse them.
+    Use it as a context manager, which stops the converter and removes the temporary
+    template on exit:
+    
+        with DocsBuilder(DocsConfig.from_args()) as builder:
+            builder.build()
+    """
+    
+    def __init__(self, config: DocsConfig):
+        global DEBUG
+        DEBUG = config.debug
+        self.source_config = config
+        self.config = config
+        self.converter = None
+    
+    def __enter__(self) -> 'DocsBuilder':
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def start(self) -> bool:
+        """
+        Validate the configuration and start the shared pandoc converter.
+        
+        Returns:
+            True if the configuration is valid, False otherwise.
+        """
+        config = validate_config(self.source_config)
+        if config is None:
+            return False
+        self.config = config
+        
+        # Shared pandoc converter; uses pandoc server mode when available
+        self.converter = PandocConverter(config.template_path, use_server=config.pandoc_batch_size > 0)
+        return True
+    
+    def close(self) -> None:
+        """Stop the pandoc converter and remove the temporary template file."""
+        if self.converter is not None:
+            self.converter.close()
+            self.converter = None
+        
+        # Clean up temporary template file
+        temp_template_path = self.config.template_path
+        if temp_template_path != self.source_config.template_path and temp_template_path.exists():
+            try:
+                temp_template_path.unlink()
+                debug_print(f"Cleaned up temporary template file: {temp_template_path}")
+            except Exception as e:
+                print(f"Warning: Could not delete temporary template file: {e}")
+    
+    def build(self, copy_asset_files: bool = True) -> bool:
+        """
+        Run one documentation build.
+        
+        Subsets the icon fonts and fingerprints the assets if `subset_fonts` and
+        `fingerprint_assets` are set (see subset_icon_fonts() and fingerprint_assets()),
+        copies the assets in the background while rendering the source files that
+        changed since the last build (up to `jobs` pages concurrently, see
+        render_pages()), regenerates the index page, the search database, robots.txt
+        and sitemap.xml, and precompresses the output if `compress` is set. The index is
+        regenerated only when README.md or the set of pages changed, and robots.txt and
+        sitemap.xml only when the set of pages changed.
+        
+        If `profile` is set, the time spent in each stage, page and subprocess is
+        recorded, and the report is written there (see BuildProfiler).
+        
+        Args:
+            copy_asset_files: Whether to copy the assets to the docs directory.
+        
+        Returns:
+            True if the documentation was generated successfully, False otherwise.
+        """
+        global PROFILER
+        if self.config.profile is None:
+            return self._build(copy_asset_files)
+        
+        PROFILER = BuildProfiler()
+        try:
+            with profile_stage('build'):
+                return self._build(copy_asset_files)
+        finally:
+            profiler, PROFILER = PROFILER, None
+            profiler.write_report(self.config.profile)
+    
+    def _build(self, copy_asset_files: bool) -> bool:
+        """Run one documentation build, see build()."""
+        config = self.config
+        if self.converter is None:
+            print("Error: The documentation builder was not started.")
+            return False
+        
+        # Create docs directory if it doesn't exist
+        config.docs_dir.mkdir(exist_ok=True)
+        
+        # Find all source files (sorted so the build output is deterministic)
+        with profile_stage('find sources'):
+            source_files = sorted(find_source_files(config.repo_root, list(config.source_dirs)))
         if not source_files:
             print("No source files found.")
-            return
-        
-        # Dictionary to store generated HTML files
-        generated_files = {}
+            return False
         
-        # Process each source file
-        for file_path in source_files:
-            # Determine output path
-            relative_path = file_path.relative_to(REPO_ROOT)
+        # Subset the icon fonts, minify and fingerprint the assets referenced by the
+        # template, and point the template at the resulting files before any page is
+        # rendered with it. The fonts are subset on every build, as a source change can
+        # use new icons (an unchanged glyph set is not subset again); the assets are
+        # fingerprinted when they are copied.
+        if config.subset_fonts or (config.fingerprint_assets and copy_asset_files):
+            asset_names = {}
+            if config.subset_fonts:
+                print("\nSubsetting fonts...")
+                text_paths = [self.source_config.template_path, config.readme_path, *source_files,
+                              *(config.assets_dir / "js").glob("**/*.js")]
+                with profile_stage('subset fonts'):
+                    asset_names.update(subset_icon_fonts(config.assets_dir, config.docs_dir, text_paths))
+            if config.fingerprint_assets:
+                print("\nFingerprinting assets...")
+                with profile_stage('fingerprint assets'):
+                    fingerprinted_names = fingerprint_assets(config.assets_dir, config.docs_dir)
+                if fingerprinted_names is None:
+                    print("Failed to fingerprint assets.")
+                    return False
+                asset_names.update(fingerprinted_names)
+            template_content = process_template_for_assets(self.source_config.template_path, config.critical_css)
+            if not template_content:
+                return False
+            write_file_if_changed(config.template_path, rewrite_asset_references(template_content, asset_names))
+        with profile_stage('critical css'):
+            critical_css_rules = load_critical_css_rules(config.assets_dir) if config.critical_css else None
+        
+        # Copy all assets (CSS, JS, logos, fonts, etc.) to docs directory, overlapping
+        # with page rendering: pages neither read nor write the synchronized files
+        def sync_assets() -> bool:
+            with profile_stage('copy assets'):
+                return copy_assets(config.assets_dir, config.docs_dir, config.asset_link)
+        
+        with ThreadPoolExecutor(max_workers=1) as asset_executor:
+            if copy_asset_files:
+                print("\nCopying assets...")
+                assets_copied = asset_executor.submit(sync_assets)
             
-            # Create output path with file extension preserved in the HTML filename
-            # For example: file.c -> file.c.html, file.h -> file.h.html, file.py -> file.py.html
-            output_html_path = DOCS_DIR / relative_path.with_suffix(relative_path.suffix + '.html')
+            # Load the build cache so unchanged pages are not regenerated
+            build_fingerprint = compute_build_fingerprint(config)
+            if config.no_cache:
+                build_cache = {'build': build_fingerprint, 'pages': {}, 'index': "", 'sitemap': ""}
+            else:
+                build_cache = load_build_cache(config.build_cache_path, build_fingerprint)
             
-            # Create output directory if it doesn't exist
-            output_html_path.parent.mkdir(parents=True, exist_ok=True)
+            # Process each source file, rendering pages concurrently
+            print(f"\nRendering {len(source_files)} pages with {max(1, config.jobs)} jobs...")
+            highlight_cache = (HighlightCache(config.highlight_cache_path, self.converter.version)
+                               if config.highlight_cache else None)
+            with profile_stage('render pages'):
+                generated_files, build_cache['pages'] = render_pages(config, source_files, build_cache['pages'],
+                                                                     self.converter, critical_css_rules,
+                                                                     highlight_cache)
+            if highlight_cache is not None:
+                highlight_cache.save()
             
-            # Process file and generate HTML
-            if process_file_with_page2html_logic(
-                file_path, 
-                output_html_path, 
-                REPO_ROOT, 
-                BASILISK_DIR, 
-                DARCSIT_DIR, 
-                TEMPLATE_PATH, 
-                BASE_URL, 
-                WIKI_TITLE, 
-                LITERATE_C_SCRIPT,
-                DOCS_DIR
-            ):
-                generated_files[file_path] = output_html_path
-        
-        # Generate index.html
-        print("\nGenerating index.html...")
-        if not generate_index(README_PATH, INDEX_PATH, generated_files, DOCS_DIR, REPO_ROOT):
-            print("Failed to generate index.html.")
-            return
+            if copy_asset_files and not assets_copied.result():
+                print("Failed to copy assets.")
+                save_build_cache(config.build_cache_path, build_cache)
+                return False
+        
+        # Generate index.html, unless neither README.md nor the set of pages changed
+        pages_digest = hashlib.sha256()
+        for html_path in generated_files.values():
+            pages_digest.update(html_path.relative_to(config.docs_dir).as_posix().encode('utf-8') + b'\0')
+        pages_key = pages_digest.hexdigest()
+        index_key = hashlib.sha256((hash_file(config.readme_path) + pages_key).encode('utf-8')).hexdigest()
+        if build_cache['index'] == index_key and config.index_path.is_file():
+            print("\nindex.html is up to date.")
+        else:
+            print("\nGenerating index.html...")
+            build_cache['index'] = ""
+            with profile_stage('index'):
+                index_generated = generate_index(config.readme_path, config.index_path, generated_files,
+                                                 config.docs_dir, config.repo_root, self.converter,
+                                                 config.template_path, config.wiki_title, critical_css_rules,
+                                                 config.source_dirs, config.base_url, config.css_path)
+            if not index_generated:
+                print("Failed to generate index.html.")
+                save_build_cache(config.build_cache_path, build_cache)
+                return False
+            build_cache['index'] = index_key
+        save_build_cache(config.build_cache_path, build_cache)
+        
+        # Generate the search database from the records stored with each page
+        print("\nGenerating search database...")
+        with profile_stage('search database'):
+            search_database_written = write_search_database(config.search_db_path, config.search_index_dir,
+                                                            generated_files, build_cache['pages'],
+                                                            config.search_max_chars, config.repo_root)
+        if not search_database_written:
+            print("Failed to generate search database.")
+            return False
+        
+        # Generate robots.txt and the sitemap, unless the set of pages did not change
+        if (build_cache['sitemap'] == pages_key and (config.docs_dir / 'robots.txt').is_file()
+                and (config.docs_dir / 'sitemap.xml').is_file()):
+            print("\nrobots.txt and sitemap.xml are up to date.")
+        else:
+            # Generate robots.txt
+            print("\nGenerating robots.txt...")
+            if not generate_robots_txt(config.docs_dir, config.base_domain):
+                print("Failed to generate robots.txt.")
+                return False
+            
+            # Generate sitemap
+            print("\nGenerating sitemap...")
+            with profile_stage('sitemap'):
+                sitemap_generated = generate_sitemap(config.docs_dir, generated_files, config.base_domain)
+            if not sitemap_generated:
+                print("Failed to generate sitemap.")
+                return False
+            
+            build_cache['sitemap'] = pages_key
+            save_build_cache(config.build_cache_path, build_cache)
+        
+        # Precompress the output for static servers
+        if config.compress:
+            print("\nCompressing documentation...")
+            with profile_stage('compress'):
+                outputs_compressed = compress_outputs(config.docs_dir)
+            if not outputs_compressed:
+                print("Failed to compress documentation.")
+                return False
+        
+        print("\nDocumentation generation complete.")
+        print(f"Output generated in: {config.docs_dir}")
+        return True
+    
+    def watch(self) -> None:
+        """
+        Rebuild the documentation whenever its inputs change, and serve it with live reload.
+        
+        The source directories, README.md and the assets (template, CSS, JavaScript...)
+        are polled every `watch_interval` seconds. Once a change has settled (no further
+        change for one interval), build() is run again with the same pandoc converter;
+        the build cache limits the work to the pages whose inputs changed. Assets are
+        copied again only when one of them changed, and a changed template is processed
+        again, which invalidates every page. With --subset-fonts, the icon fonts are
+        subset again for the glyphs of icons that new sources use. Pages open in a browser are then reloaded.
+        Runs until interrupted with Ctrl+C.
+        """
+        config = self.config
+        template_source_path = self.source_config.template_path
+        watched_paths = ([config.repo_root / source_dir for source_dir in config.source_dirs]
+                         + [config.readme_path, config.assets_dir])
         
-        # Generate robots.txt
-        print("\nGenerating robots.txt...")
-        if not generate_robots_txt(DOCS_DIR):
-            print("Failed to generate robots.txt.")
+        try:
+            live_reload = LiveReloadServer(config.docs_dir, config.port)
+        except OSError as e:
+            print(f"Error starting the local web server on port {config.port}: {e}")
             return
         
-        # Generate sitemap
-        print("\nGenerating sitemap...")
-        if not generate_sitemap(DOCS_DIR, generated_files):
-            print("Failed to generate sitemap.")
+        print(f"\nServing {config.docs_dir} at http://localhost:{config.port} with live reload.")
+        print("Watching for changes. Press Ctrl+C to stop.")
+        
+        snapshot = snapshot_watched_files(watched_paths)
+        try:
+            while True:
+                time.sleep(config.watch_interval)
+                current_snapshot = snapshot_watched_files(watched_paths)
+                if current_snapshot == snapshot:
+                    continue
+                
+                # Wait for the change to settle, e.g. an editor writing several files
+                while True:
+                    time.sleep(config.watch_interval)
+                    settled_snapshot = snapshot_watched_files(watched_paths)
+                    if settled_snapshot == current_snapshot:
+                        break
+                    current_snapshot = settled_snapshot
+                
+                changed_files = [path for path in current_snapshot.keys() | snapshot.keys()
+                                 if current_snapshot.get(path) != snapshot.get(path)]
+                snapshot = current_snapshot
+                for path in sorted(changed_files):
+                    debug_print(f"  Changed: {path.relative_to(config.repo_root)}")
+                
+                start_time = time.perf_counter()
+                print(f"\n{len(changed_files)} changed files, rebuilding...")
+                
+                if template_source_path in changed_files:
+                    processed_template = process_template_for_assets(template_source_path, config.critical_css)
+                    if processed_template:
+                        config.template_path.write_text(processed_template, encoding='utf-8')
+                
+                assets_changed = any(config.assets_dir in path.parents for path in changed_files)
+                if self.build(copy_asset_files=assets_changed):
+                    live_reload.notify()
+                print(f"Rebuilt in {time.perf_counter() - start_time:.2f}s")
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        finally:
+            live_reload.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Generate HTML documentation for the project.
+    
+    This function parses the command line into a DocsConfig and runs a DocsBuilder,
+    which validates the configuration, copies the assets, converts the source files to
+    HTML using type-specific processing logic (rendering up to --jobs pages concurrently
+    and skipping pages whose inputs are unchanged since the last build), and creates the
+    index page, the search database used by the command palette, and SEO-compliant
+    files such as robots.txt and sitemap.xml, with all output written to the
+    documentation directory.
+    With --watch, it then keeps rebuilding the documentation as its inputs change
+    and serves it locally with live reload (see DocsBuilder.watch()).
+    
+    Args:
+        argv: Command line arguments; defaults to sys.argv[1:].
+    """
+    config = DocsConfig.from_args(argv)
+    builder = DocsBuilder(config)
+    
+    try:
+        if not builder.start():
             return
         
-        print("\nDocumentation generation complete.")
-        print(f"Output generated in: {DOCS_DIR}")
+        builder.build()
+        
+        if config.watch:
+            builder.watch()
         
     finally:
-        # Clean up temporary template file
-        temp_template_path = TEMPLATE_PATH.parent / (TEMPLATE_PATH.stem.replace('.temp', '') + '.temp.html')
-        if temp_template_path.exists():
-            try:
-                temp_template_path.unlink()
-                debug_print(f"Cleaned up temporary template file: {temp_template_path}")
-            except Exception as e:
-                print(f"Warning: Could not delete temporary template file: {e}")
+        builder.close()
 
 
 if __name__ == "__main__":
     main()
-        
\ No newline at end of file
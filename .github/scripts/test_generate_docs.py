@@ -0,0 +1,320 @@
+import gzip
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+import pytest
+
+import generate_docs
+from conftest import REPO_ROOT, create_repository, install_stub_tools, run_build, synthetic_config
+
+AWK_SCRIPT = REPO_ROOT / 'basilisk' / 'src' / 'darcsit' / 'decl_anchors.awk'
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """
+    A small repository built with stand-ins for pandoc, literate-c and awk: a header,
+    two test cases that include it (one through a subdirectory path), one that
+    includes a header that does not exist yet, and one without includes.
+    """
+    bin_dir = tmp_path / 'bin'
+    install_stub_tools(bin_dir)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+
+    root = tmp_path / 'repo'
+    create_repository(root, {
+        'src-local/module.h': '/**\n# Module\n*/\nint module;\n',
+        'testCases/first.c': '/**\n# First\n*/\n#include "module.h"\nint first;\n',
+        'testCases/second.c': '/**\n# Second\n*/\n#include "src-local/module.h"\nint second;\n',
+        'testCases/future.c': '/**\n# Future\n*/\n#include "future.h"\nint future;\n',
+        'testCases/plain.c': '/**\n# Plain\n*/\nint plain;\n',
+    })
+    config = synthetic_config(root, jobs=1)
+    run_build(config)
+    return root, config
+
+
+def rendered_pages(config):
+    """Run a build and return the source files whose pages were rendered."""
+    return set(re.findall(r'Processing (\S+) ->', run_build(config)))
+
+
+def test_noop_rebuild_renders_nothing(repository):
+    root, config = repository
+    assert rendered_pages(config) == set()
+
+
+def test_editing_a_header_renders_only_its_page(repository):
+    root, config = repository
+    with open(root / 'src-local' / 'module.h', 'a', encoding='utf-8') as f:
+        f.write('int edited;\n')
+
+    assert rendered_pages(config) == {'src-local/module.h'}
+
+
+def test_adding_a_header_renders_only_its_includers(repository):
+    root, config = repository
+    (root / 'src-local' / 'future.h').write_text('/**\n# Future header\n*/\nint later;\n', encoding='utf-8')
+
+    assert rendered_pages(config) == {'src-local/future.h', 'testCases/future.c'}
+    assert 'future.h.html' in (root / 'docs' / 'testCases' / 'future.c.html').read_text(encoding='utf-8')
+
+
+def test_removing_a_header_renders_only_its_includers(repository):
+    root, config = repository
+    (root / 'src-local' / 'module.h').unlink()
+
+    assert rendered_pages(config) == {'testCases/first.c', 'testCases/second.c'}
+    assert 'basilisk.fr' in (root / 'docs' / 'testCases' / 'first.c.html').read_text(encoding='utf-8')
+
+
+@pytest.mark.skipif(shutil.which('awk') is None or not AWK_SCRIPT.is_file(),
+                    reason="needs awk and darcsit's decl_anchors.awk")
+@pytest.mark.parametrize('tags', [
+    None,
+    # "decl short 12" has no fourth field, so it maps the empty line number of blank lines
+    'decl main 12 1\ndecl\ndecl helper 12 3\nref main 12 5\n  decl\tspaced  12   4  extra\ndecl short 12\n',
+], ids=['missing tags', 'tags'])
+@pytest.mark.parametrize('html', [
+    '<div class="numbers"><pre>1\n2\n   3\n4\n5\n\n   \n  12x\n10</pre></div>\n<p>text <pre>1 trailing</p>\n',
+    '<pre>1\n2\n3\n4',
+    'no listing\n\n',
+], ids=['listing', 'no trailing newline', 'no listing'])
+def test_decl_anchors_match_the_awk_script(tmp_path, html, tags):
+    source = tmp_path / 'src-local' / 'module.h'
+    source.parent.mkdir()
+    if tags is not None:
+        source.with_suffix('.h.tags').write_text(tags, encoding='utf-8')
+    darcsit_dir = AWK_SCRIPT.parent
+
+    native = generate_docs.run_awk_post_processing(html, source, tmp_path, darcsit_dir)
+    awk = generate_docs.run_awk_post_processing(html, source, tmp_path, darcsit_dir, use_awk_script=True)
+
+    assert native == awk
+
+
+# Pages as pandoc renders them, and their post-processed HTML as produced by the
+# one-regex-pass-per-rewrite post-processing that post_process_html() replaced
+C_PAGE_HTML = (
+    '<p>Intro</p>\n<div class="sourceCode" id="cb1"><pre\nclass="sourceCode c"><code class="sourceCode c">'
+    '<span id="cb1-1"><a href="#cb1-1"></a><span class="pp">#include </span><span class="im">&quot;module.h&quot;</span></span>\n'
+    '<span id="cb1-2"><a href="#cb1-2"></a><span class="pp">#include </span><span class="im">"navier-stokes/centered.h"</span></span>\n'
+    '<span id="cb1-3"><a href="#cb1-3"></a><span class="dt">int</span> n <span class="op">=</span> '
+    '<span class="dv">2</span><span class="op">;</span>   12</span>\n'
+    '<span id="cb1-4"><a href="#cb1-4"></a>u<span class="op">.</span>x   <span class="dv">13</span> </span>\n'
+    '</code></pre></div>\n<pre><code>plain   block</code></pre>\n<p>See <a href="module.h">the header</a>.</p>\n'
+)
+C_PAGE_EXPECTED = (
+    '<p>Intro</p>\n<div class="code-block-container"><div class="code-block-container"><pre\nclass="sourceCode c">'
+    '<code class="sourceCode c"><span id="cb1-1"><a href="#cb1-1"></a><span class="pp">#include </span>'
+    '<a href="../src-local/module.h.html" title="Link to local documentation for module.h">'
+    '<span class="im">"module.h"</span></a></span>\n'
+    '<span id="cb1-2"><a href="#cb1-2"></a><span class="pp">#include </span>'
+    '<a href="http://basilisk.fr/src/navier-stokes/centered.h" title="Link to Basilisk source for navier-stokes/centered.h">'
+    '<span class="im">"navier-stokes/centered.h"</span></a></span>\n'
+    '<span id="cb1-3"><a href="#cb1-3"></a><span class="dt">int</span> n <span class="op">=</span> '
+    '<span class="dv">2</span><span class="op">;</span></span>\n'
+    '<span id="cb1-4"><a href="#cb1-4"></a>u<span class="op">.</span>x</span>\n'
+    '</code></pre></div></div>\n<div class="code-block-container"><pre><code>plain   block</code></pre></div>\n'
+    '<p>See <a href="module.h">the header</a>.</p>\n'
+)
+PYTHON_PAGE_HTML = (
+    '<p>See <a href="other.py">other</a>, <a href="../README.md">the readme</a>, <a href="page.html">a page</a>, '
+    '<a href="#top">the top</a> and <a href="https://example.org/x.py">x</a>.</p>\n'
+    '<div class="sourceCode" id="cb2"><pre class="sourceCode python"><code class="sourceCode python">'
+    '<span id="cb2-1"><a href="#cb2-1"></a>x <span class="op">=</span> <span class="dv">1</span></span>'
+    '</code></pre></div>\n<pre><code>$ ./run.sh\n</code></pre>\n<pre><code>unclosed\n'
+)
+PYTHON_PAGE_EXPECTED = (
+    '<p>See <a href="other.py.html">other</a>, <a href="../README.md.html">the readme</a>, <a href="page.html">a page</a>, '
+    '<a href="#top">the top</a> and <a href="https://example.org/x.py">x</a>.</p>\n'
+    '<div class="code-block-container"><div class="code-block-container"><pre class="sourceCode python">'
+    '<code class="sourceCode python"><span id="cb2-1"><a href="#cb2-1"></a>x <span class="op">=</span> '
+    '<span class="dv">1</span></span></code></pre></div></div>\n'
+    '<div class="code-block-container"><pre><code>$ ./run.sh\n</code></pre></div>\n<pre><code>unclosed\n'
+)
+
+
+def test_post_process_c_html_matches_golden_output(tmp_path):
+    (tmp_path / 'src-local').mkdir()
+    (tmp_path / 'src-local' / 'module.h').write_text('int module;\n', encoding='utf-8')
+    dependencies = set()
+
+    html = generate_docs.post_process_c_html(C_PAGE_HTML, tmp_path / 'testCases' / 'case.c', tmp_path,
+                                             tmp_path / 'basilisk' / 'src' / 'darcsit', tmp_path / 'docs',
+                                             dependencies)
+
+    assert html == C_PAGE_EXPECTED
+    assert dependencies == {tmp_path / 'src-local' / 'module.h', tmp_path / 'src-local' / 'centered.h'}
+
+
+def test_post_process_python_shell_html_matches_golden_output():
+    assert generate_docs.post_process_python_shell_html(PYTHON_PAGE_HTML) == PYTHON_PAGE_EXPECTED
+
+
+PANDOC_REQUESTS = [{'text': f'# Page {name}\n\nText of {name}.', 'from': 'markdown', 'variables': {'title': name}}
+                   for name in ('one', 'FAIL', 'three')]
+PANDOC_OUTPUTS = [f'<title>{name}</title>\n<h1 id="page-{name.lower()}">Page {name}</h1>\n<p>Text of {name}.</p>\n'
+                  for name in ('one', 'FAIL', 'three')]
+
+
+@pytest.mark.parametrize('fault, individually_converted', [
+    ('', []),
+    ('unavailable', ['one', 'FAIL', 'three']),
+    ('ignore-template', ['one', 'FAIL', 'three']),
+    ('truncated', ['one', 'FAIL', 'three']),
+    ('error', ['FAIL']),
+])
+def test_pandoc_server_falls_back_to_pandoc_processes(tmp_path, monkeypatch, fault, individually_converted):
+    bin_dir = tmp_path / 'bin'
+    install_stub_tools(bin_dir)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv('STUB_PANDOC_SERVER_FAULT', fault)
+    converted = []
+    convert_with_subprocess = generate_docs.PandocConverter._convert_with_subprocess
+
+    def record_conversion(self, request):
+        converted.append(request['variables']['title'])
+        return convert_with_subprocess(self, request)
+
+    monkeypatch.setattr(generate_docs.PandocConverter, '_convert_with_subprocess', record_conversion)
+    template_path = tmp_path / 'template.html'
+    template_path.write_text('<title>$title$</title>\n$body$', encoding='utf-8')
+
+    converter = generate_docs.PandocConverter(template_path)
+    try:
+        outputs = converter.convert(PANDOC_REQUESTS)
+    finally:
+        converter.close()
+
+    assert outputs == PANDOC_OUTPUTS
+    assert converted == individually_converted
+
+
+SEARCH_RECORDS = [
+    {'title': 'Console output', 'url': '/a.html', 'content': 'aux null printer COM1 lpt1 naïve café', 'priority': 2},
+    {'title': 'Café', 'url': '/b.html', 'content': 'Console of the printer', 'priority': 1},
+]
+WINDOWS_RESERVED_NAMES = {'con', 'prn', 'aux', 'nul'} | {f'{port}{n}' for port in ('com', 'lpt') for n in range(10)}
+
+
+def test_search_index_shards_terms_by_prefix():
+    index_files = generate_docs.build_search_index(SEARCH_RECORDS)
+    manifest = json.loads(index_files['manifest.json'])
+    shards = {name[:-len('.json')]: json.loads(content) for name, content in index_files.items()
+              if name != 'manifest.json' and not name.startswith('docs-')}
+
+    assert sorted(shards) == manifest['shards'] == ['au', 'ca', 'co', 'lp', 'na', 'nu', 'of', 'ou', 'pr', 'th', 've']
+    assert shards['co'] == {'com1': [1, 2], 'console': [0, 2, 1, 7]}
+    assert shards['ca'] == {'caf': [0, 7, 1, 2]}
+    assert generate_docs.build_search_index(SEARCH_RECORDS) == index_files
+    for prefix, terms in shards.items():
+        assert re.fullmatch(r'[a-z0-9_]+', prefix) and prefix not in WINDOWS_RESERVED_NAMES
+        assert all(term[:manifest['prefixLength']] == prefix for term in terms)
+
+    # Every word of the records is found in the shard command-palette.js fetches for it
+    for record in SEARCH_RECORDS:
+        for word in re.findall(r'[a-z0-9_]+', f"{record['title']} {record['content']}".lower()):
+            if len(word) >= manifest['prefixLength']:
+                assert word in shards[word[:manifest['prefixLength']]]
+
+
+def test_compress_outputs_keeps_siblings_in_step_with_their_files(tmp_path):
+    suffixes = ['.gz'] + (['.br'] if generate_docs.brotli is not None else [])
+    page = tmp_path / 'page.html'
+    page.write_text('<p>first</p>', encoding='utf-8')
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'assets' / 'data.tar.gz').write_bytes(b'archive')
+    (tmp_path / 'assets' / 'photo.png').write_bytes(b'png')
+    (tmp_path / 'assets' / 'photo.png.gz').write_bytes(b'not a sibling')
+    (tmp_path / 'removed.js.gz').write_bytes(b'orphan')
+    (tmp_path / '.build-cache.json').write_text('{}', encoding='utf-8')
+
+    assert generate_docs.compress_outputs(tmp_path)
+    assert gzip.decompress((tmp_path / 'page.html.gz').read_bytes()) == b'<p>first</p>'
+    assert all((tmp_path / f'page.html{suffix}').is_file() for suffix in suffixes)
+    assert not (tmp_path / 'removed.js.gz').exists()
+    assert not (tmp_path / 'assets' / 'photo.png.br').exists()
+    assert not (tmp_path / '.build-cache.json.gz').exists()
+
+    page.write_text('<p>second</p>', encoding='utf-8')
+    later = (tmp_path / 'page.html.gz').stat().st_mtime_ns + 10**9
+    os.utime(page, ns=(later, later))
+    assert generate_docs.compress_outputs(tmp_path)
+    assert gzip.decompress((tmp_path / 'page.html.gz').read_bytes()) == b'<p>second</p>'
+
+    page.unlink()
+    assert generate_docs.compress_outputs(tmp_path)
+    assert not any((tmp_path / f'page.html{suffix}').exists() for suffix in suffixes)
+    # Only siblings of COMPRESSED_SUFFIXES files are swept, not other archives
+    assert (tmp_path / 'assets' / 'data.tar.gz').read_bytes() == b'archive'
+    assert (tmp_path / 'assets' / 'photo.png.gz').read_bytes() == b'not a sibling'
+
+
+def test_fingerprinted_assets_replace_template_references(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    install_stub_tools(bin_dir)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    root = tmp_path / 'repo'
+    create_repository(root, {'testCases/plain.c': '/**\n# Plain\n*/\nint plain;\n'})
+    assets_dir = root / '.github' / 'assets'
+    sources = {path: path.read_bytes() for path in assets_dir.rglob('*') if path.is_file()}
+    config = synthetic_config(root, jobs=1, fingerprint_assets=True, asset_link='hardlink')
+    page = root / 'docs' / 'testCases' / 'plain.c.html'
+
+    run_build(config)
+    manifest = json.loads((root / 'docs' / 'assets' / 'manifest.json').read_text(encoding='utf-8'))
+    first_name = manifest['js/main.js']
+    assert re.fullmatch(r'js/main\.[0-9a-f]{8}\.js', first_name)
+    assert f'src="../assets/{first_name}"' in page.read_text(encoding='utf-8')
+    assert 'assets/js/main.js"' not in page.read_text(encoding='utf-8')
+    assert (root / 'docs' / 'assets' / first_name).is_file()
+
+    with open(assets_dir / 'js' / 'main.js', 'a', encoding='utf-8') as f:
+        f.write('\nconsole.log("edited");\n')
+    sources[assets_dir / 'js' / 'main.js'] = (assets_dir / 'js' / 'main.js').read_bytes()
+    run_build(config)
+    manifest = json.loads((root / 'docs' / 'assets' / 'manifest.json').read_text(encoding='utf-8'))
+    second_name = manifest['js/main.js']
+    assert second_name != first_name
+    assert f'src="../assets/{second_name}"' in page.read_text(encoding='utf-8')
+    assert 'console.log("edited")' in (root / 'docs' / 'assets' / second_name).read_text(encoding='utf-8')
+    assert not (root / 'docs' / 'assets' / first_name).exists()
+
+    # The template and the hard-linked assets are rewritten through new files, never in place
+    assert {path: path.read_bytes() for path in sources} == sources
+
+
+def test_critical_css_is_inlined_and_stylesheets_deferred_with_noscript_fallback(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    install_stub_tools(bin_dir)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    root = tmp_path / 'repo'
+    create_repository(root, {'testCases/plain.c': '/**\n# Used rule\n*/\nint plain;\n'})
+    with open(root / '.github' / 'assets' / 'css' / 'custom_styles.css', 'a', encoding='utf-8') as f:
+        f.write('\n#used-rule{color:#123456}\n#unused-rule{color:#654321}\n')
+    run_build(synthetic_config(root, jobs=1, critical_css=True, fingerprint_assets=True))
+    page_path = root / 'docs' / 'testCases' / 'plain.c.html'
+    page = page_path.read_text(encoding='utf-8')
+
+    critical_css = re.search(r'<style>([^<]*)</style>\s*<link rel="stylesheet" href="[^"]*vendor', page).group(1)
+    assert '#used-rule{color:#123456}' in critical_css
+    assert '#unused-rule' not in critical_css
+
+    # Outside <noscript>, the site stylesheets only load without blocking rendering
+    noscript_links = re.findall(r'<link rel="stylesheet" href="([^"]*)">',
+                                ''.join(re.findall(r'<noscript>(.*?)</noscript>', page, re.DOTALL)))
+    scripted_page = re.sub(r'<noscript>.*?</noscript>', '', page, flags=re.DOTALL)
+    deferred_links = re.findall(r'''<link rel="stylesheet" href="([^"]*)" media="print" onload="this.media='all'">''',
+                                scripted_page)
+    blocking_links = re.findall(r'<link rel="stylesheet" href="([^"]*)">', scripted_page)
+    for stylesheet in generate_docs.CRITICAL_CSS_STYLESHEETS:
+        stem = Path(stylesheet).stem
+        site_links = [link for link in noscript_links if re.search(rf'/{re.escape(stem)}\.[0-9a-f]{{8}}\.css$', link)]
+        assert len(site_links) == 1
+        assert site_links[0] in deferred_links
+        assert site_links[0] not in blocking_links
+        assert (page_path.parent / site_links[0]).resolve().is_file()
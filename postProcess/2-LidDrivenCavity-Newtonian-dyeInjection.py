@@ -1,8 +1,10 @@
 import numpy as np
+import io
 import os
 import subprocess as sp
 import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
 from matplotlib.collections import LineCollection
 from matplotlib.ticker import StrMethodFormatter
 from mpl_toolkits.axes_grid1 import make_axes_locatable
@@ -14,17 +16,40 @@ matplotlib.rcParams['font.family'] = 'serif'
 matplotlib.rcParams['text.usetex'] = True
 matplotlib.rcParams['text.latex.preamble'] = r'\usepackage{amsmath}'
 
-def gettingfield(filename, zmin, zmax, rmin, rmax, nr):
+# Figure of this process, kept across timesteps by plotting_figure()
+FIGURE_CACHE = {}
+
+def settextrendering(fastText):
+    """
+    Selects how the text of the figures is rendered, in the calling process.
+    
+    By default, text is typeset with LaTeX (text.usetex), which runs latex and dvipng for
+    the labels. With fastText, matplotlib's built-in mathtext renders the labels instead,
+    with Computer Modern fonts, so no TeX subprocess is started; this is meant for preview
+    runs, LaTeX being kept for publication figures. It is used as the initializer of the
+    worker pool, so it applies to every worker whatever the start method of the platform.
+    
+    Args:
+        fastText: Render text with mathtext instead of LaTeX.
+    """
+    matplotlib.rcParams['text.usetex'] = not fastText
+    if fastText:
+        matplotlib.rcParams['mathtext.fontset'] = 'cm'
+
+def gettingfield(filename, zmin, zmax, rmin, rmax, nr, binary=False):
     """
     Extract simulation field data from a simulation file.
     
     This function executes the external program "getData-LidDriven" with the given simulation file and
     boundary parameters to extract numerical data for axial and radial coordinates, temperature, velocity,
-    and stream function. The output is parsed into NumPy arrays, reshaped to a (nz, nr) grid based on the
-    number of radial grid points (nr), rotated 90° counterclockwise, and flipped vertically to ensure the
-    correct orientation for further processing. It returns the processed field arrays along with the total
+    and stream function. The output is parsed into a single NumPy array of the five fields on an (nr, nz)
+    grid, the orientation used for plotting. The grid is obtained with one reshape and a transpose, which
+    are views of the parsed data, so no field is copied. It returns the stacked fields along with the total
     number of axial grid points (nz).
     
+    In binary mode, "getData-LidDriven" writes the fields to stdout as a header and float64 arrays
+    (see getData-LidDriven.c), which are used in place with np.frombuffer instead of parsing text.
+    
     Args:
         filename: Path to the simulation data file.
         zmin: Minimum axial coordinate.
@@ -32,68 +57,102 @@ def gettingfield(filename, zmin, zmax, rmin, rmax, nr):
         rmin: Minimum radial coordinate.
         rmax: Maximum radial coordinate.
         nr: Number of grid points in the radial direction.
+        binary: Read the binary output of "getData-LidDriven" instead of its text output.
     
     Returns:
         tuple: A tuple containing:
-            - R (numpy.ndarray): 2D array of radial coordinate values.
-            - Z (numpy.ndarray): 2D array of axial coordinate values.
-            - T (numpy.ndarray): 2D array of temperature values.
-            - vel (numpy.ndarray): 2D array of velocity values.
-            - psi (numpy.ndarray): 2D array of stream function values.
+            - fields (numpy.ndarray): (5, nr, nz) array of the axial coordinate (Z), radial
+              coordinate (R), temperature (T), velocity (vel) and stream function (psi) values.
             - nz (int): Number of grid points in the axial direction.
     """
     exe = ["./getData-LidDriven", filename, str(zmin), str(rmin), str(zmax), str(rmax), str(nr)]
+    if binary:
+        exe.append("binary")
     p = sp.Popen(exe, stdout=sp.PIPE, stderr=sp.PIPE)
     stdout, stderr = p.communicate()
-    temp1 = stderr.decode("utf-8")
-    temp2 = temp1.split("\n")
-    # print(temp2) #debugging
-    Rtemp, Ztemp, Ttemp, veltemp, Psitemp  = [],[],[],[], []
-
-    for n1 in range(len(temp2)):
-        temp3 = temp2[n1].split(" ")
-        if temp3 == ['']:
-            pass
-        else:
-            Ztemp.append(float(temp3[0]))
-            Rtemp.append(float(temp3[1]))
-            Ttemp.append(float(temp3[2]))
-            veltemp.append(float(temp3[3]))
-            Psitemp.append(float(temp3[4]))
-    R = np.asarray(Rtemp)
-    Z = np.asarray(Ztemp)
-    T = np.asarray(Ttemp)
-    vel = np.asarray(veltemp)
-    psi = np.asarray(Psitemp)
-    nz = int(len(Z)/nr)
-
-    # print("nr is %d %d" % (nr, len(R))) # debugging
+    if p.returncode != 0:
+        raise RuntimeError(f"getData-LidDriven failed for {filename} with exit status {p.returncode}")
+
+    if binary:
+        fields, nz = binaryfield(stdout, stderr, filename)
+    else:
+        fields, nz = textfield(stderr, nr, filename)
+
     print("nz is %d" % nz)
 
-    R.resize((nz, nr))
-    Z.resize((nz, nr))
-    T.resize((nz, nr))
-    vel.resize((nz, nr))
-    psi.resize((nz, nr))
-
-    # rotate the arrays by 90 degrees
-    R = np.rot90(R, k=1)
-    Z = np.rot90(Z, k=1)
-    T = np.rot90(T, k=1)
-    vel = np.rot90(vel, k=1)
-    psi = np.rot90(psi, k=1)
-
-    # flip the array
-    R = np.flip(R, axis=0)
-    Z = np.flip(Z, axis=0)
-    T = np.flip(T, axis=0)
-    vel = np.flip(vel, axis=0)
-    psi = np.flip(psi, axis=0)
-
-    return R, Z, T, vel, psi, nz
+    return fields[:5], nz
+
+def textfield(stderr, nr, filename):
+    """
+    Read the fields from the text output of "getData-LidDriven".
+    
+    The whole output, one line of Z, R, T, vel and psi per grid point, is parsed in one call
+    into an (N, 5) array. It is then viewed as (5, nr, nz) without copying, so each field is
+    a view of one column.
+    
+    Args:
+        stderr: Text output of "getData-LidDriven".
+        nr: Number of grid points in the radial direction.
+        filename: Path to the simulation data file, for error messages.
+    
+    Returns:
+        tuple: The (5, nr, nz) array of the fields, in the order Z, R, T, vel, psi, and nz.
+    
+    Raises:
+        ValueError: If the output cannot be parsed (e.g. it ends in a truncated line), does not
+        have five columns or its rows do not fill whole lines of nr points.
+    """
+    try:
+        data = np.loadtxt(io.BytesIO(stderr), dtype=np.float64, ndmin=2)
+    except ValueError as e:
+        raise ValueError(f"Unexpected output from getData-LidDriven for {filename}: {e}") from e
+    if data.shape[0] == 0 or data.shape[1] != 5 or data.shape[0] % nr:
+        raise ValueError(f"Unexpected output from getData-LidDriven for {filename}: {data.shape[0]} "
+                         f"rows of {data.shape[1]} values for {nr} radial points")
+    nz = data.shape[0] // nr
+    return data.reshape(nz, nr, 5).transpose(2, 1, 0), nz
+
+def binaryfield(stdout, stderr, filename):
+    """
+    Read the fields from the binary output of "getData-LidDriven".
+    
+    The output starts with four int32 values: the number of axial points (nz), of radial points
+    (nr), of fields, and padding. The fields follow as float64 arrays of nz*nr values, in the order
+    Z, R, T, vel, psi. They are wrapped with np.frombuffer, reshaped and transposed to (nr, nz)
+    without copying.
+    
+    Args:
+        stdout: Binary output of "getData-LidDriven".
+        stderr: Error output of "getData-LidDriven", reported if the output is incomplete.
+        filename: Path to the simulation data file, for error messages.
+    
+    Returns:
+        tuple: The (nfields, nr, nz) array of the fields and nz.
+    
+    Raises:
+        RuntimeError: If the output is shorter than its header, the header is not valid (at
+        least five fields, padding 0), or the output size is not 16 + 8*nfields*nz*nr bytes,
+        e.g. because getData-LidDriven stopped while writing it.
+    """
+    message = stderr.decode('utf-8', errors='replace').strip()
+    details = f" ({message})" if message else ""
+    if len(stdout) < 16:
+        raise RuntimeError(f"Incomplete output from getData-LidDriven for {filename}: "
+                           f"{len(stdout)} bytes, shorter than its header{details}")
+    nz, nr, nfields, padding = (int(n) for n in np.frombuffer(stdout, dtype=np.int32, count=4))
+    if nz <= 0 or nr <= 0 or nfields < 5 or padding != 0:
+        raise RuntimeError(f"Invalid output header from getData-LidDriven for {filename}: "
+                           f"nz={nz}, nr={nr}, nfields={nfields}, padding={padding}{details}")
+    expected = 16 + 8 * nfields * nz * nr
+    if len(stdout) != expected:
+        raise RuntimeError(f"Incomplete output from getData-LidDriven for {filename}: {len(stdout)} bytes "
+                           f"instead of {expected} for {nfields} fields of {nz}x{nr} points{details}")
+
+    # Zero-copy (nfields, nr, nz) view of the (nfields, nz, nr) block after the header
+    return np.frombuffer(stdout, dtype=np.float64, offset=16).reshape(nfields, nz, nr).transpose(0, 2, 1), nz
 # ----------------------------------------------------------------------------------------------------------------------
 
-def process_timestep(ti, caseToProcess, folder, tsnap, GridsPerR, rmin, rmax, zmin, zmax, lw):
+def process_timestep(ti, caseToProcess, folder, tsnap, GridsPerR, rmin, rmax, zmin, zmax, lw, binary=False):
     """
     Generates and saves a two-panel plot for a simulation timestep.
     
@@ -101,8 +160,11 @@ def process_timestep(ti, caseToProcess, folder, tsnap, GridsPerR, rmin, rmax, zm
     retrieves field data from an intermediate snapshot file. Creates a figure with two
     subplots—one displaying the dye color (with a coolwarm heat map) and
     the other showing velocity magnitude (with a viridis heat map). Both panels include
-    domain boundaries and streamlines for the stream function. If the snapshot file is
-    missing or the output image already exists, the function prints a warning and exits.
+    domain boundaries and streamlines for the stream function. The figure is built once
+    per worker process (see plotting_figure()) and only its data is replaced for each
+    timestep. If the snapshot file is missing or the output image already exists, the
+    function prints a warning and exits.
+    With binary set, the field data is read from the binary output of getData-LidDriven.
     """
     t = tsnap * ti
     place = f"{caseToProcess}/intermediate/snapshot-{t:.4f}"
@@ -124,11 +186,58 @@ def process_timestep(ti, caseToProcess, folder, tsnap, GridsPerR, rmin, rmax, zm
     nr = int(GridsPerR * rmax)
     
     # Extract field data from the simulation file
-    R, Z, T, vel, psi, nz = gettingfield(place, zmin, zmax, rmin, rmax, nr)
+    fields, nz = gettingfield(place, zmin, zmax, rmin, rmax, nr, binary)
+    Z, R, T, vel, psi = fields
     
     # Get actual domain bounds from the data
     zminp, zmaxp, rminp, rmaxp = Z.min(), Z.max(), R.min(), R.max()
 
+    # Reuse this worker's figure, replacing only the heat map data and the streamlines
+    figure = plotting_figure(Z, R, rmin, rmax, zmin, zmax, lw)
+    figure['cntrl1'].set_array(T)
+    figure['cntrl2'].set_array(vel)
+    for contour in figure['contours']:
+        # ContourSet is an Artist from matplotlib 3.8 on; before, each of its levels is a
+        # separate collection of the axes
+        if isinstance(contour, Artist):
+            contour.remove()
+        else:
+            for collection in contour.collections:
+                collection.remove()
+
+    # Add streamlines using the stream function
+    figure['contours'] = [ax.contour(Z, R, psi, 20, colors='black', linewidths=2) for ax in figure['axes']]
+
+    figure['fig'].savefig(name, bbox_inches='tight')
+
+def plotting_figure(Z, R, rmin, rmax, zmin, zmax, lw):
+    """
+    Returns the two-panel figure of this worker process, creating it on first use.
+    
+    Building the 24x11 figure, its domain boundaries, titles and colorbars (with their
+    LaTeX-rendered labels) takes most of the time of a frame, so each worker process keeps
+    one figure and process_timestep() only replaces the heat map data and the streamlines.
+    The figure is built again if the grid (Z, R) or the domain changes.
+    
+    Args:
+        Z: 2D array of axial coordinate values of the grid.
+        R: 2D array of radial coordinate values of the grid.
+        rmin, rmax, zmin, zmax: Bounds of the domain.
+        lw: Line width of the domain boundaries.
+    
+    Returns:
+        dict: The figure ('fig'), its two axes ('axes'), the heat maps of the dye ('cntrl1')
+        and of the velocity magnitude ('cntrl2'), and the streamlines drawn for the last
+        timestep ('contours').
+    """
+    key = (rmin, rmax, zmin, zmax, lw)
+    figure = FIGURE_CACHE.get(key)
+    if figure is not None and np.array_equal(figure['Z'], Z) and np.array_equal(figure['R'], R):
+        return figure
+    for oldFigure in FIGURE_CACHE.values():
+        plt.close(oldFigure['fig'])
+    FIGURE_CACHE.clear()
+
     # Set up the figure with two subplots
     AxesLabel, TickLabel = 50, 20
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(24, 11), constrained_layout=True)
@@ -140,11 +249,8 @@ def process_timestep(ti, caseToProcess, folder, tsnap, GridsPerR, rmin, rmax, zm
     ax1.plot([rmin, rmax], [zmax, zmax], '-', color='black', linewidth=lw)
     ax1.plot([rmax, rmax], [zmin, zmax], '-', color='black', linewidth=lw)
 
-    # Plot the dye with a heat map
-    cntrl1 = ax1.pcolormesh(Z, R, T, cmap="coolwarm", edgecolor='face', vmax=1, vmin=0)
-    
-    # Add streamlines using the stream function
-    ax1.contour(Z, R, psi, 20, colors='black', linewidths=2)
+    # Plot the dye with a heat map; its data is set for each timestep
+    cntrl1 = ax1.pcolormesh(Z, R, np.zeros_like(Z), cmap="coolwarm", edgecolor='face', vmax=1, vmin=0)
 
     # Configure the first subplot
     ax1.set_aspect('equal')
@@ -166,11 +272,8 @@ def process_timestep(ti, caseToProcess, folder, tsnap, GridsPerR, rmin, rmax, zm
     ax2.plot([rmin, rmax], [zmax, zmax], '-', color='black', linewidth=lw)
     ax2.plot([rmax, rmax], [zmin, zmax], '-', color='black', linewidth=lw)
 
-    # Plot velocity magnitude with viridis colormap
-    cntrl2 = ax2.pcolormesh(Z, R, vel, cmap="viridis", edgecolor='face', vmax = 1, vmin = 0)
-    
-    # Add streamlines using the stream function
-    ax2.contour(Z, R, psi, 20, colors='black', linewidths=2)
+    # Plot velocity magnitude with viridis colormap; its data is set for each timestep
+    cntrl2 = ax2.pcolormesh(Z, R, np.zeros_like(Z), cmap="viridis", edgecolor='face', vmax = 1, vmin = 0)
 
     # Configure the second subplot
     ax2.set_aspect('equal')
@@ -188,9 +291,11 @@ def process_timestep(ti, caseToProcess, folder, tsnap, GridsPerR, rmin, rmax, zm
     # Turn off axes for cleaner visualization
     ax1.axis('off')
     ax2.axis('off')
-    plt.savefig(name, bbox_inches='tight')
-    # Display the figure
-    plt.close()
+
+    figure = {'fig': fig, 'axes': (ax1, ax2), 'cntrl1': cntrl1, 'cntrl2': cntrl2, 'contours': [],
+              'Z': np.array(Z), 'R': np.array(R)}
+    FIGURE_CACHE[key] = figure
+    return figure
 
 def main():
     # Get number of CPUs from command line argument, or use all available
@@ -210,6 +315,8 @@ def main():
     parser.add_argument('--tsnap', type=float, default=0.01, help='Time snap')
     parser.add_argument('--caseToProcess', type=str, default='../testCases/2-LidDrivenCavity-Newtonian-dyeInjection', help='Case to process')  
     parser.add_argument('--folderToSave', type=str, default='2-LidDrivenCavity-Newtonian-dyeInjection', help='Folder to save')
+    parser.add_argument('--binary', action='store_true', help='Read binary field data from getData-LidDriven instead of text')
+    parser.add_argument('--fast-text', action='store_true', help='Render labels with mathtext instead of LaTeX, for previews')
     args = parser.parse_args()
 
     num_processes = args.CPUs
@@ -230,12 +337,12 @@ def main():
         os.makedirs(folder)
 
     # Create a pool of worker processes
-    with mp.Pool(processes=num_processes) as pool:
+    with mp.Pool(processes=num_processes, initializer=settextrendering, initargs=(args.fast_text,)) as pool:
         # Create partial function with fixed arguments
         process_func = partial(process_timestep, caseToProcess=caseToProcess,
                              folder=folder, tsnap=tsnap,
                              GridsPerR=GridsPerR, rmin=rmin, rmax=rmax, 
-                             zmin=zmin, zmax=zmax, lw=lw)
+                             zmin=zmin, zmax=zmax, lw=lw, binary=args.binary)
         # Map the process_func to all timesteps
         pool.map(process_func, range(nGFS))
 
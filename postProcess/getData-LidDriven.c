@@ -39,6 +39,15 @@ and vorticity, and then solves the Poisson equation to update the streamfunction
 - arguments[4]: Upper bound (xmax) of the x-domain.
 - arguments[5]: Upper bound (ymax) of the y-domain.
 - arguments[6]: Number of grid points along the y-direction (ny).
+- arguments[7] (optional): "binary" to write the fields to stdout in binary instead of as text on stderr.
+
+## Output
+By default, one line per grid point is written to stderr: x, y, T, vel and psi, separated by spaces.
+
+In binary mode, stdout gets a header of four int32 values (nx, ny, the number of fields, and 0 so
+the doubles that follow stay 8-byte aligned), then each field (x, y, T, vel, psi) as nx*ny float64
+values in native byte order, x index major. A field can be read with `np.frombuffer` and reshaped to
+(nx, ny) without copying or parsing.
 
 ## Return
 Returns 1 if the argument validation fails; otherwise, the program proceeds with simulation processing.
@@ -46,11 +55,12 @@ Returns 1 if the argument validation fails; otherwise, the program proceeds with
 
 int main(int a, char const *arguments[])
 {
-  if (a != 7) {
+  if (a != 7 && !(a == 8 && !strcmp(arguments[7], "binary"))) {
     fprintf(ferr, "Error: Expected 6 arguments\n");
-    fprintf(ferr, "Usage: %s <filename> <xmin> <ymin> <xmax> <ymax> <ny>\n", arguments[0]);
+    fprintf(ferr, "Usage: %s <filename> <xmin> <ymin> <xmax> <ymax> <ny> [binary]\n", arguments[0]);
     return 1;
   }
+  bool binary = (a == 8);
 
   sprintf (filename, "%s", arguments[1]);
   xmin = atof(arguments[2]); ymin = atof(arguments[3]);
@@ -110,6 +120,27 @@ int main(int a, char const *arguments[])
     }
   }
 
+  if (binary) {
+    /**
+    Binary mode: the header, then each field as a contiguous block, written one row of ny values at
+    a time. */
+    int header[4] = {nx, ny, len + 2, 0};
+    fwrite (header, sizeof(int), 4, fout);
+    double * row = (double *) malloc (ny*sizeof(double));
+    for (int k = -2; k < len; k++) {
+      for (int i = 0; i < nx; i++) {
+        for (int j = 0; j < ny; j++)
+          row[j] = k == -2 ? Deltax*(i+1./2) + xmin :
+                   k == -1 ? Deltay*(j+1./2) + ymin : field[i][len*j + k];
+        fwrite (row, sizeof(double), ny, fout);
+      }
+    }
+    free (row);
+    fflush (fout);
+    matrix_free (field);
+    return 0;
+  }
+
   for (int i = 0; i < nx; i++) {
     double x = Deltax*(i+1./2) + xmin;
     for (int j = 0; j < ny; j++) {